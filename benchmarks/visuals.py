@@ -0,0 +1,203 @@
+"""
+Offscreen benchmarks for the visual widgets.
+
+Drives CatDrawing and SpectrumDrawing (src/drawing.py), the animation and
+drawing code VectorCat and SpectrumVisualizer are built on, against cairo
+image surfaces. Only cairo and NumPy are needed: no GTK, no display.
+
+    python3 -m benchmarks.visuals                   # run, compare to baseline
+    python3 -m benchmarks.visuals --save-baseline   # record a new baseline
+    python3 -m benchmarks.visuals --frames 1000 --widths 480 1920
+"""
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+import cairo
+import numpy as np
+
+from src.drawing import CatDrawing, SpectrumDrawing
+
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+WIDTHS = [320, 640, 1280, 1920]
+STATES = ["playing", "playing-simulated", "idle", "paused"]
+BAR_COUNTS = [28, 128, 512]
+CAT_HEIGHT = 160
+SPECTRUM_HEIGHT = 50
+# Fail the run when a case's p50 or p99 grows beyond this factor of its baseline
+REGRESSION_FACTOR = 1.25
+# ...and by more than this much, so timer noise on tiny cases doesn't count
+MIN_REGRESSION_MS = 0.05
+
+
+def _fake_bands(rng, n=28):
+    # Louder lows than highs, roughly like music
+    return np.clip(rng.random(n) * np.linspace(1.0, 0.3, n), 0, 1).astype(np.float32)
+
+
+def _clear(cr):
+    cr.save()
+    cr.set_operator(cairo.OPERATOR_CLEAR)
+    cr.paint()
+    cr.restore()
+
+
+def _cat_frame(cat, surface, w, h, state, bands):
+    cr = cairo.Context(surface)
+    _clear(cr)
+    cat.update("playing" if state.startswith("playing") else state, bands)
+    cat.draw_cat(None, cr, w, h)
+    surface.flush()
+
+
+def _spectrum_frame(spectrum, surface, w, h, state, bands):
+    cr = cairo.Context(surface)
+    _clear(cr)
+    spectrum.update(state.startswith("playing"), bands)
+    spectrum.draw_bars(None, cr, w, h)
+    surface.flush()
+
+
+def measure(frame, frames, warmup, rng, state):
+    """Returns per-frame timing percentiles (ms) and allocation figures."""
+    def bands():
+        return _fake_bands(rng) if state == "playing" else None
+
+    for _ in range(warmup):
+        frame(bands())
+
+    times = np.empty(frames)
+    for i in range(frames):
+        b = bands()
+        start = time.perf_counter()
+        frame(b)
+        times[i] = time.perf_counter() - start
+
+    # Allocations in a separate pass; tracing would skew the timings above
+    alloc_frames = min(frames, 200)
+    tracemalloc.start()
+    peaks = np.zeros(alloc_frames)
+    before_blocks = sys.getallocatedblocks()
+    for i in range(alloc_frames):
+        b = bands()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        frame(b)
+        peaks[i] = tracemalloc.get_traced_memory()[1] - current
+    retained = sys.getallocatedblocks() - before_blocks
+    tracemalloc.stop()
+
+    ms = times * 1000
+    return {
+        'p50_ms': round(float(np.percentile(ms, 50)), 4),
+        'p90_ms': round(float(np.percentile(ms, 90)), 4),
+        'p99_ms': round(float(np.percentile(ms, 99)), 4),
+        'max_ms': round(float(ms.max()), 4),
+        'peak_alloc_kib': round(float(np.median(peaks)) / 1024, 2),
+        'retained_blocks_per_frame': round(retained / alloc_frames, 2),
+    }
+
+
+def layer_build_ms(w, h, repeats=20):
+    """Cost of the first frame after a resize (VectorCat rebuilding its layers)."""
+    cat = CatDrawing()
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, w, h)
+    times = []
+    for _ in range(repeats):
+        cat._invalidate_layers()
+        start = time.perf_counter()
+        cat._build_layers(w, h)
+        times.append(time.perf_counter() - start)
+    _cat_frame(cat, surface, w, h, "idle", None)
+    return round(float(np.median(times)) * 1000, 4)
+
+
+def run(widths, frames, warmup, seed=0):
+    results = {}
+    for w in widths:
+        for state in STATES:
+            rng = np.random.default_rng(seed)
+            cat = CatDrawing()
+            surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, w, CAT_HEIGHT)
+            key = f"cat/{state}/{w}"
+            results[key] = measure(lambda b: _cat_frame(cat, surface, w, CAT_HEIGHT, state, b),
+                                   frames, warmup, rng, state)
+            print_case(key, results[key])
+        results[f"cat/layers/{w}"] = {'p50_ms': layer_build_ms(w, CAT_HEIGHT)}
+        print_case(f"cat/layers/{w}", results[f"cat/layers/{w}"])
+
+        for bars in BAR_COUNTS:
+            for state in ("playing", "playing-simulated", "idle"):
+                rng = np.random.default_rng(seed)
+                spectrum = SpectrumDrawing(bars)
+                surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, w, SPECTRUM_HEIGHT)
+                key = f"spectrum/{bars}/{state}/{w}"
+                results[key] = measure(lambda b: _spectrum_frame(spectrum, surface, w, SPECTRUM_HEIGHT, state, b),
+                                       frames, warmup, rng, state)
+                print_case(key, results[key])
+    return results
+
+
+def print_case(key, result):
+    fields = "  ".join(f"{k}={v}" for k, v in result.items())
+    print(f"{key:<38} {fields}")
+
+
+def compare(results, baseline):
+    """Returns a list of human-readable regressions against baseline."""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get('results', {}).get(key)
+        if not base:
+            continue
+        for metric in ('p50_ms', 'p99_ms'):
+            old, new = base.get(metric), result.get(metric)
+            if old and new and new > old * REGRESSION_FACTOR and new - old > MIN_REGRESSION_MS:
+                regressions.append(f"{key} {metric}: {old} -> {new}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offscreen benchmarks for the cat and spectrum drawing code")
+    parser.add_argument("--frames", type=int, default=300, help="Timed frames per case")
+    parser.add_argument("--warmup", type=int, default=30, help="Untimed frames before each case")
+    parser.add_argument("--widths", type=int, nargs="+", default=WIDTHS)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.widths, args.frames, args.warmup)
+    report = {'frames': args.frames, 'cairo': cairo.cairo_version_string(), 'results': results}
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    regressions = compare(results, baseline)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {REGRESSION_FACTOR}x baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,11 +7,29 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.append(current_dir)
 
-from src.app import main
+from src import startup
 
 if __name__ == "__main__":
+    if "--profile-startup" in sys.argv:
+        # GApplication rejects options it doesn't know
+        sys.argv.remove("--profile-startup")
+        startup.enable()
+    if "--profile-mainloop" in sys.argv:
+        sys.argv.remove("--profile-mainloop")
+        # Read by src.config, which isn't imported yet
+        os.environ["CYBER_MAINLOOP_PROFILE"] = "1"
+
     try:
-        main()
+        if "--daemon" in sys.argv:
+            # Headless: never touches GTK/Adw
+            from src.daemon import main
+            main()
+        elif "--ctl" in sys.argv:
+            from src.daemon import ctl
+            sys.exit(ctl(sys.argv[sys.argv.index("--ctl") + 1:]))
+        else:
+            from src.app import main
+            main()
     except KeyboardInterrupt:
         print("\nExiting...")
-        sys.exit(0)
\ No newline at end of file
+        sys.exit(0)
@@ -1,15 +1,61 @@
 import sys
 import os
 import logging
-from gi.repository import Adw, Gio, Gtk, Gdk
 
-from src.ui.main_window import MainWindow
+from src import startup
+import src.ui  # Pins the Gtk/Adw versions before gi.repository imports them
+from gi.repository import Adw, Gio, Gtk, Gdk, GLib
+startup.mark("gtk import")
+
+from src.config import RESUME_LAST, MAINLOOP_PROFILE
 
 logger = logging.getLogger(__name__)
 
+
+class _Relay:
+    """Player callback that holds the latest call until the window takes over."""
+    def __init__(self):
+        self.target = None
+        self.pending = None
+
+    def __call__(self, *args):
+        if self.target:
+            self.target(*args)
+        else:
+            self.pending = args
+
+
+def start_resume():
+    """
+    CYBER_RESUME=1: creates the player and connects to the last station on a
+    job worker, so audio buffers while the UI is imported and built.
+    Returns a future of (station, player, relays), or None.
+    """
+    from src.core.resume import load_last_station
+    last = load_last_station()
+    if not last:
+        return None
+
+    def start():
+        from src.core.player import AudioPlayer
+        from src.core.favorites import station_key
+        station = last['station']
+        url = station_key(station)
+        relays = (_Relay(), _Relay())
+        player = AudioPlayer(*relays)
+        alternates = [u for u in (station.get('url'), station.get('url_resolved')) if u and u != url]
+        player.play(url, station.get('name'), alternates, stream=last.get('stream_url'))
+        startup.mark("resume playing")
+        return station, player, relays
+
+    from src.core.jobs import get_runner
+    logger.info(f"Resuming {last['station'].get('name')}")
+    return get_runner(GLib.idle_add).submit(start, subsystem='resume')
+
 class CyberRadioApp(Adw.Application):
-    def __init__(self, **kwargs):
+    def __init__(self, resume=None, **kwargs):
         super().__init__(**kwargs)
+        self.resume = resume
         self.set_application_id("com.example.CyberRadio")
         action = Gio.SimpleAction.new("toggle_play", None)
         action.connect("activate", self.on_toggle_play_action)
@@ -35,12 +81,24 @@ class CyberRadioApp(Adw.Application):
             Gtk.StyleContext.add_provider_for_display(Gdk.Display.get_default(), provider, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
         except Exception as e:
             logger.error(f"Failed to load CSS from {css_path}: {e}")
+        startup.mark("css")
 
         win = self.props.active_window
-        if not win: win = MainWindow(application=self)
+        if not win:
+            # Imported here so a resumed station starts connecting first
+            from src.ui.main_window import MainWindow
+            startup.mark("window import")
+            win = MainWindow(application=self, resume=self.resume)
+            self.resume = None
+            startup.mark("window built")
         win.present()
 
 def main():
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    app = CyberRadioApp()
+    if MAINLOOP_PROFILE:
+        # Before anything connects a handler or queues a callback
+        from src.ui import watchdog
+        watchdog.install()
+    resume = start_resume() if RESUME_LAST else None
+    app = CyberRadioApp(resume=resume)
     app.run(sys.argv)
@@ -17,6 +17,79 @@ if not os.path.exists(os.path.dirname(FAVORITES_FILE)):
     # Let's keep it simple for now but allow override.
     FAVORITES_FILE = "cyber_favorites.json"
 
+# Unix socket of the headless daemon (native_radio.py --daemon)
+CONTROL_SOCKET = os.getenv(
+    "CYBER_CONTROL_SOCKET",
+    os.path.join(os.getenv("XDG_RUNTIME_DIR") or "/tmp", f"cyberradio-{os.getuid()}.sock")
+)
+
+# Local fingerprint index (see src/core/fingerprint.py). Matched before any
+# remote songrec/Shazam lookup.
+FINGERPRINT_DB = os.getenv("CYBER_FINGERPRINT_DB", os.path.expanduser("~/.config/CyberRadio/fingerprints"))
+
+# Worker threads for blocking background jobs (see src/core/jobs.py)
+JOB_WORKERS = int(os.getenv("CYBER_JOB_WORKERS", "6"))
+
+# Start the last played station on launch, connecting while the window is built
+RESUME_LAST = os.getenv("CYBER_RESUME", "0") == "1"
+LAST_STATION_FILE = os.getenv("CYBER_LAST_STATION_FILE", os.path.expanduser("~/.config/CyberRadio/last_station.json"))
+
+# Opt-in background stream health checks of favorites and search results, cached
+# for HEALTH_TTL seconds (see src/core/health.py)
+HEALTH_CHECKS = os.getenv("CYBER_HEALTH_CHECKS", "0") == "1"
+HEALTH_TTL = int(os.getenv("CYBER_HEALTH_TTL", "900"))
+
+# Main loop profiling (see src/ui/watchdog.py): callbacks slower than
+# FRAME_BUDGET_MS are logged with a stack; per-callback timings go to MAINLOOP_PROFILE_FILE
+MAINLOOP_PROFILE = os.getenv("CYBER_MAINLOOP_PROFILE", "0") == "1"
+FRAME_BUDGET_MS = float(os.getenv("CYBER_FRAME_BUDGET_MS", "16"))
+MAINLOOP_PROFILE_FILE = os.getenv("CYBER_MAINLOOP_PROFILE_FILE", os.path.expanduser("~/.config/CyberRadio/mainloop.json"))
+
+# Identified songs (SQLite, see src/core/history.py)
+HISTORY_DB = os.getenv("CYBER_HISTORY_DB", os.path.expanduser("~/.config/CyberRadio/history.db"))
+
+# Resolved playlist/redirect targets per station URL, valid for RESOLVE_TTL seconds
+RESOLVE_CACHE_FILE = os.getenv("CYBER_RESOLVE_CACHE", os.path.expanduser("~/.config/CyberRadio/resolved.json"))
+RESOLVE_TTL = int(os.getenv("CYBER_RESOLVE_TTL", str(6 * 3600)))
+
+# Playback QoS metrics are written to <METRICS_FILE>.json and <METRICS_FILE>.prom
+METRICS_FILE = os.getenv("CYBER_METRICS_FILE", os.path.expanduser("~/.config/CyberRadio/metrics"))
+
+# Recorded streams are saved here, one folder per station
+RECORDINGS_DIR = os.getenv("CYBER_RECORDINGS_DIR", os.path.expanduser("~/Music/CyberRadio"))
+
+# "embedded" runs libmpv inside this process (python-mpv); "ipc" runs mpv as a
+# child process controlled over its JSON IPC socket.
+MPV_BACKEND = os.getenv("CYBER_MPV_BACKEND", "embedded")
+
+# Switch between a station's mounts (e.g. FLAC/MP3/AAC on AzuraCast) based on
+# measured throughput and underruns. MAX_BITRATE (kbps, 0 = no limit) caps the
+# mount chosen, e.g. on metered links.
+AUTO_BITRATE = os.getenv("CYBER_AUTO_BITRATE", "1") != "0"
+MAX_BITRATE = int(os.getenv("CYBER_MAX_BITRATE", "0"))
+
+# Animation frame-rate cap while playing, and the low-power rate used when
+# idle or paused. Animations stop entirely while the window is hidden.
+ANIMATION_FPS = int(os.getenv("CYBER_ANIMATION_FPS", "30"))
+IDLE_ANIMATION_FPS = int(os.getenv("CYBER_IDLE_FPS", "4"))
+
+# Buffering profile: "low-latency", "balanced", "resilient" or, opt-in,
+# "adaptive" (grows the cache after underruns and shrinks it again on a
+# healthy link).
+BUFFER_PROFILE = os.getenv("CYBER_BUFFER_PROFILE", "balanced")
+
+# Timeshift ring file for pause/rewind of live radio (0 disables). 256 MB
+# holds roughly 4.5 hours of a 128 kbps stream.
+TIMESHIFT_MB = int(os.getenv("CYBER_TIMESHIFT_MB", "0"))
+TIMESHIFT_FILE = os.getenv("CYBER_TIMESHIFT_FILE", os.path.expanduser("~/.cache/CyberRadio/timeshift.ring"))
+
+# Warm-standby: number of extra pre-buffered streams kept ready for instant
+# switching (0 disables), the demuxer cache each may hold, and how long a warm
+# stream may sit before it is reconnected so it does not drift behind live.
+STANDBY_SLOTS = int(os.getenv("CYBER_STANDBY_SLOTS", "0"))
+STANDBY_CACHE_MB = int(os.getenv("CYBER_STANDBY_CACHE_MB", "4"))
+STANDBY_MAX_AGE = int(os.getenv("CYBER_STANDBY_MAX_AGE", "120"))
+
 DEFAULT_STATIONS = [
     {
         "name": "Nostalgia OST",
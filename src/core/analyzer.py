@@ -0,0 +1,163 @@
+import os
+import re
+import shutil
+import logging
+import threading
+import subprocess
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 11025
+FFT_SIZE = 1024
+# ~30 analysis frames per second
+HOP_SIZE = SAMPLE_RATE // 30
+MIN_FREQ = 40
+# Band levels are mapped from this dB range onto 0..1
+DB_FLOOR = -70.0
+DB_RANGE = 60.0
+# Per-frame fall-off so bars sink smoothly instead of flickering
+DECAY = 0.85
+
+
+class SpectrumAnalyzer:
+    """Turns mono int16 PCM into log-spaced band levels (0..1) with NumPy."""
+    def __init__(self, bands=28, sample_rate=SAMPLE_RATE, fft_size=FFT_SIZE):
+        self.bands = bands
+        self.fft_size = fft_size
+        self.window = np.hanning(fft_size).astype(np.float32)
+        self.levels = np.zeros(bands, np.float32)
+
+        # Log-spaced band edges as rfft bin indices, each band at least one bin wide
+        n_bins = fft_size // 2 + 1
+        edges = np.geomspace(MIN_FREQ, sample_rate / 2, bands + 1) * fft_size / sample_rate
+        edges = np.round(edges).astype(np.int64)
+        for i in range(1, len(edges)):
+            edges[i] = max(edges[i], edges[i - 1] + 1)
+        self.edges = np.minimum(edges, n_bins - 1)
+        self.starts = self.edges[:-1]
+        self.widths = np.maximum(np.diff(self.edges), 1)
+        # Normalize a full-scale sine to ~0 dB
+        self.scale = (self.window.sum() / 2) ** 2
+
+    def process(self, samples):
+        """samples: float32 array of the latest fft_size samples in -1..1."""
+        spectrum = np.fft.rfft(samples * self.window)
+        power = (spectrum.real ** 2 + spectrum.imag ** 2) / self.scale
+        energy = np.add.reduceat(power, self.starts)[:self.bands] / self.widths
+        db = 10 * np.log10(energy + 1e-12)
+        current = np.clip((db - DB_FLOOR) / DB_RANGE, 0.0, 1.0).astype(np.float32)
+        self.levels = np.maximum(current, self.levels * DECAY)
+        return self.levels
+
+
+def _find_sink_input(pid=None):
+    """
+    Finds the PulseAudio/PipeWire sink input that mpv plays into (from this
+    process unless another pid is given). Muted or corked inputs (e.g.
+    warm-standby streams) are skipped.
+    """
+    try:
+        res = subprocess.run(["pactl", "list", "sink-inputs"], capture_output=True, text=True, timeout=3)
+    except Exception as e:
+        logger.debug(f"pactl failed: {e}")
+        return None
+
+    pid = str(pid or os.getpid())
+    for block in res.stdout.split("Sink Input #")[1:]:
+        index = block.split("\n", 1)[0].strip()
+        if not re.search(rf'application\.process\.id = "{pid}"', block):
+            continue
+        if "Mute: yes" in block or "Corked: yes" in block:
+            continue
+        return index
+    return None
+
+
+class PcmTap:
+    """
+    Captures the decoded PCM mpv is playing (via `parec --monitor-stream`)
+    and runs the FFT in a worker thread. Only the small per-frame band array
+    is handed to on_bands, through `dispatch` (GLib.idle_add for the UI).
+    """
+    def __init__(self, on_bands, bands=28, dispatch=None):
+        self.on_bands = on_bands
+        self.dispatch = dispatch or (lambda fn, *args: fn(*args))
+        self.analyzer = SpectrumAnalyzer(bands)
+        self.available = shutil.which("parec") is not None and shutil.which("pactl") is not None
+        if not self.available:
+            logger.warning("'parec'/'pactl' not found. Visuals will not follow the audio.")
+
+        self._proc = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._pending = False
+
+    def start(self, pid=None):
+        """(Re)attaches to the current mpv output. Safe to call on every station change."""
+        if not self.available:
+            return
+        self.stop()
+        # Each run gets its own event so a late-finishing old worker stays stopped
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop, pid), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._proc:
+            try:
+                self._proc.terminate()
+            except Exception:
+                pass
+            self._proc = None
+
+    def _run(self, stop, pid):
+        # mpv creates its sink input only once audio output starts
+        index = None
+        for _ in range(20):
+            if stop.is_set():
+                return
+            index = _find_sink_input(pid)
+            if index:
+                break
+            stop.wait(0.5)
+        if not index:
+            logger.info("No audio stream found to analyze")
+            return
+
+        cmd = [
+            "parec", f"--monitor-stream={index}", "--raw",
+            "--format=s16le", f"--rate={SAMPLE_RATE}", "--channels=1",
+            "--latency-msec=30"
+        ]
+        try:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        except Exception as e:
+            logger.error(f"Failed to start parec: {e}")
+            return
+        if stop.is_set():
+            proc.terminate()
+            return
+        self._proc = proc
+        ring = np.zeros(self.analyzer.fft_size, np.float32)
+        chunk_bytes = HOP_SIZE * 2
+        while not stop.is_set():
+            data = proc.stdout.read(chunk_bytes)
+            if not data or len(data) < 2:
+                break
+            hop = np.frombuffer(data[:len(data) // 2 * 2], dtype=np.int16).astype(np.float32) / 32768.0
+            ring = np.concatenate((ring[len(hop):], hop))
+            bands = self.analyzer.process(ring)
+
+            # Never queue more than one pending frame on the receiving loop
+            if not self._pending:
+                self._pending = True
+                self.dispatch(self._deliver, bands.copy())
+
+        proc.stdout.close()
+
+    def _deliver(self, bands):
+        self._pending = False
+        self.on_bands(bands)
+        return False
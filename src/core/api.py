@@ -26,3 +26,22 @@ def fetch_azuracast_nowplaying():
     except Exception as e:
         logger.error(f"Azuracast fetch failed: {e}")
         return []
+
+def find_azuracast_station(nowplaying, station_id):
+    """Returns the nowplaying entry for the given AzuraCast station id, or None."""
+    for entry in nowplaying:
+        if entry.get('station', {}).get('id') == station_id:
+            return entry
+    return None
+
+def get_azuracast_mounts(np_entry):
+    """
+    Returns the stream mounts listed in an AzuraCast nowplaying entry as
+    [{'url', 'bitrate', 'format'}], default mount first.
+    """
+    mounts = np_entry.get('station', {}).get('mounts') or []
+    mounts = sorted(mounts, key=lambda m: not m.get('is_default'))
+    return [
+        {'url': m.get('url'), 'bitrate': m.get('bitrate'), 'format': m.get('format')}
+        for m in mounts if m.get('url')
+    ]
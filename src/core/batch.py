@@ -0,0 +1,164 @@
+import os
+import sys
+import csv
+import json
+import logging
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.core.recognition import SongRecognizer
+
+logger = logging.getLogger(__name__)
+
+# Each worker process owns its own recognizer (and memory-mapped index)
+_recognizer = None
+
+
+def _init_worker():
+    global _recognizer
+    _recognizer = SongRecognizer()
+
+
+def _identify_window(path, offset, duration):
+    """Cuts one window out of the recording and identifies it. Runs in a worker process."""
+    fd, temp_file = tempfile.mkstemp(suffix=".mp3")
+    os.close(fd)
+    try:
+        cmd = [
+            "ffmpeg", "-v", "quiet", "-y",
+            "-ss", str(offset),
+            "-t", str(duration),
+            "-i", path,
+            "-vn",
+            "-f", "mp3",
+            temp_file
+        ]
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        return offset, _recognizer.identify_file(temp_file)
+    except Exception as e:
+        logger.error(f"Window at {offset}s failed: {e}")
+        return offset, None
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+def get_duration(path):
+    """Returns the recording length in seconds using ffprobe."""
+    res = subprocess.run(
+        ["ffprobe", "-v", "quiet", "-print_format", "json", "-show_format", path],
+        capture_output=True, text=True, check=True
+    )
+    return float(json.loads(res.stdout)['format']['duration'])
+
+
+def format_timestamp(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def merge_matches(results, window, max_gap):
+    """
+    Collapses per-window results into a tracklist. Consecutive windows that
+    identify the same song (allowing up to max_gap seconds of unidentified
+    audio in between) become one entry.
+    """
+    tracklist = []
+    current = None
+
+    for offset, result in sorted(results, key=lambda r: r[0]):
+        if not result:
+            continue
+
+        key = (result.get('artist'), result.get('title'))
+        if current and current['key'] == key and offset - current['end'] <= max_gap:
+            current['end'] = offset + window
+            current['windows'] += 1
+            continue
+
+        current = {
+            'key': key,
+            'start': offset,
+            'end': offset + window,
+            'windows': 1,
+            'artist': result.get('artist'),
+            'title': result.get('title'),
+            'shazam_url': result.get('shazam_url')
+        }
+        tracklist.append(current)
+
+    for entry in tracklist:
+        del entry['key']
+        entry['timestamp'] = format_timestamp(entry['start'])
+    return tracklist
+
+
+def identify_recording(path, window=12, step=30, workers=None, max_gap=None):
+    """
+    Slides a window across a long recording, identifying every window in a
+    process pool, and returns the merged, timestamped tracklist.
+    """
+    duration = get_duration(path)
+    offsets = [o for o in range(0, int(duration), step) if duration - o >= window / 2]
+    logger.info(f"Identifying {len(offsets)} windows of {path} ({format_timestamp(duration)})")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(_identify_window, path, o, window) for o in offsets]
+        for done, future in enumerate(as_completed(futures), 1):
+            offset, result = future.result()
+            results.append((offset, result))
+            if result:
+                logger.info(f"[{done}/{len(offsets)}] {format_timestamp(offset)} {result.get('artist')} - {result.get('title')}")
+
+    return merge_matches(results, window, max_gap if max_gap is not None else 2 * step)
+
+
+def write_tracklist(tracklist, out, fmt):
+    fields = ['timestamp', 'start', 'end', 'artist', 'title', 'windows', 'shazam_url']
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(tracklist)
+    else:
+        json.dump(tracklist, out, indent=2)
+        out.write("\n")
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Build a timestamped tracklist from a recorded stream.")
+    parser.add_argument("recording", help="Audio file of the recorded show")
+    parser.add_argument("-o", "--output", help="Output file (.json or .csv); defaults to JSON on stdout")
+    parser.add_argument("--format", choices=["json", "csv"], help="Output format (default: from extension)")
+    parser.add_argument("--window", type=int, default=12, help="Seconds of audio per identification (default: 12)")
+    parser.add_argument("--step", type=int, default=30, help="Seconds between window starts (default: 30)")
+    parser.add_argument("--max-gap", type=int, default=None,
+                        help="Seconds of unidentified audio allowed inside one track (default: 2 x step)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    recognizer = SongRecognizer()
+    if not recognizer.has_songrec and not recognizer.local_index:
+        logger.error("Nothing can identify audio: install 'songrec' or build a local fingerprint index.")
+        return 1
+
+    fmt = args.format
+    if not fmt:
+        fmt = "csv" if args.output and args.output.lower().endswith(".csv") else "json"
+
+    tracklist = identify_recording(args.recording, args.window, args.step, args.workers, args.max_gap)
+
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            write_tracklist(tracklist, f, fmt)
+        logger.info(f"Wrote {len(tracklist)} tracks to {args.output}")
+    else:
+        write_tracklist(tracklist, sys.stdout, fmt)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
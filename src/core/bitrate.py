@@ -0,0 +1,165 @@
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Underruns right after (re)connecting are just the initial fill
+UNDERRUN_GRACE = 5
+# Step down after this many underruns within UNDERRUN_WINDOW seconds
+STEP_DOWN_UNDERRUNS = 2
+UNDERRUN_WINDOW = 120
+# Only use mounts that fit into this share of the measured throughput
+THROUGHPUT_MARGIN = 0.8
+# Healthy time required before trying the next higher mount. Doubles every
+# time a step up has to be undone, so a link that can't carry the better
+# mount isn't probed over and over.
+RECOVERY_PERIOD = 180
+MAX_RECOVERY_PERIOD = 1800
+# Smoothing of the cache-speed samples
+EWMA_ALPHA = 0.2
+
+# Assumed kbps when a mount doesn't report its bitrate
+FORMAT_KBPS = {'flac': 1000, 'opus': 96, 'ogg': 128, 'aac': 128, 'mp3': 128}
+
+
+def mount_kbps(mount):
+    if mount.get('bitrate'):
+        return int(mount['bitrate'])
+    fmt = (mount.get('format') or mount['url'].rsplit('.', 1)[-1]).lower()
+    return FORMAT_KBPS.get(fmt, 128)
+
+
+class BitrateSelector:
+    """
+    Picks which of a station's mounts to play from the measured download
+    throughput (mpv's cache-speed) and buffer underruns. Steps down after
+    repeated underruns, and back up after a healthy RECOVERY_PERIOD once
+    the throughput fits the next mount with THROUGHPUT_MARGIN to spare.
+    Stations with a single known URL are left alone.
+    """
+    def __init__(self, on_switch, max_kbps=0):
+        self.on_switch = on_switch
+        self.max_kbps = max_kbps
+        self.station = None
+        self.current = None
+        self.mounts = []  # [(url, kbps)], lowest bitrate first
+        self.throughput = None  # kbps
+        self._chosen = {}  # station -> mount that last worked
+        self._underruns = []
+        self._recovery = RECOVERY_PERIOD
+        self._last_switch = 0
+        self._last_step_up = None
+        self._lock = threading.Lock()
+
+    def reset(self, station, remembered=True):
+        """
+        Starts tracking a new station. Returns the mount to start with: the
+        one that last worked for it this session, unless remembered is False.
+        """
+        with self._lock:
+            self.station = station
+            self.current = self._chosen.get(station, station) if remembered else station
+            self.mounts = []
+            self.throughput = None
+            self._underruns = []
+            self._recovery = RECOVERY_PERIOD
+            self._last_switch = time.monotonic()
+            self._last_step_up = None
+            return self.current
+
+    def set_mounts(self, station, mounts):
+        """mounts: [{'url', 'bitrate', 'format'}] as from get_azuracast_mounts."""
+        with self._lock:
+            if station != self.station:
+                return
+            kbps = {m['url']: mount_kbps(m) for m in mounts if m.get('url')}
+            kbps.setdefault(self.current, mount_kbps({'url': self.current}))
+            first = not self.mounts
+            self.mounts = sorted(kbps.items(), key=lambda m: m[1])
+            target = self._capped() if first else None
+        if target:
+            self._switch(target, "bitrate cap")
+
+    def _index(self):
+        return next((i for i, (url, _) in enumerate(self.mounts) if url == self.current), 0)
+
+    def _capped(self):
+        """Best mount within max_kbps if the current one exceeds it."""
+        if not self.max_kbps or self.mounts[self._index()][1] <= self.max_kbps:
+            return None
+        fitting = [url for url, kbps in self.mounts if kbps <= self.max_kbps]
+        return fitting[-1] if fitting else self.mounts[0][0]
+
+    def on_cache_speed(self, bytes_per_sec):
+        if not bytes_per_sec:
+            return
+        kbps = bytes_per_sec * 8 / 1000
+        with self._lock:
+            self.throughput = kbps if self.throughput is None else \
+                EWMA_ALPHA * kbps + (1 - EWMA_ALPHA) * self.throughput
+            target = self._step_up_target()
+        if target:
+            self._switch(target, "link recovered")
+
+    def on_paused_for_cache(self, paused):
+        if not paused:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if len(self.mounts) < 2 or now - self._last_switch < UNDERRUN_GRACE:
+                return
+            self._underruns = [t for t in self._underruns if now - t < UNDERRUN_WINDOW] + [now]
+            if len(self._underruns) < STEP_DOWN_UNDERRUNS:
+                return
+            target = self._step_down_target()
+            # The last step up didn't hold; wait longer before the next one
+            if target and self._last_step_up and now - self._last_step_up < self._recovery:
+                self._recovery = min(self._recovery * 2, MAX_RECOVERY_PERIOD)
+        if target:
+            self._switch(target, f"{len(self._underruns)} underruns")
+
+    def _step_down_target(self):
+        index = self._index()
+        if index == 0:
+            return None
+        lower = self.mounts[:index]
+        if self.throughput:
+            fitting = [url for url, kbps in lower if kbps <= self.throughput * THROUGHPUT_MARGIN]
+            if fitting:
+                return fitting[-1]
+        return lower[-1][0]
+
+    def _step_up_target(self):
+        now = time.monotonic()
+        index = self._index()
+        if index + 1 >= len(self.mounts) or now - self._last_switch < self._recovery:
+            return None
+        if any(now - t < self._recovery for t in self._underruns):
+            return None
+        url, kbps = self.mounts[index + 1]
+        if self.max_kbps and kbps > self.max_kbps:
+            return None
+        # A healthy buffer alone isn't enough: the link must be measured to
+        # carry the higher mount, or the switch just oscillates back down
+        if self.throughput is None or self.throughput * THROUGHPUT_MARGIN < kbps:
+            return None
+        self._last_step_up = now
+        return url
+
+    def _switch(self, url, reason):
+        with self._lock:
+            if url == self.current:
+                return
+            previous = self.current
+            self.current = url
+            self._underruns = []
+            self._last_switch = time.monotonic()
+        throughput = f"{self.throughput:.0f} kbps" if self.throughput else "unknown"
+        logger.info(f"Switching mount {previous} -> {url} ({reason}, throughput {throughput})")
+        ok = self.on_switch(url)
+        with self._lock:
+            if not ok:
+                self.current = previous
+            else:
+                self._chosen[self.station] = url
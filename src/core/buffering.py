@@ -0,0 +1,113 @@
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# mpv cache/demuxer options per profile. Sizes are in MiB, times in seconds.
+BUFFER_PROFILES = {
+    # Stay close to live; accepts an occasional stall on a bad link
+    "low-latency": {
+        "readahead": 2,
+        "max_mb": 2,
+        "back_mb": 1,
+        "pause_wait": 0.5,
+    },
+    "balanced": {
+        "readahead": 10,
+        "max_mb": 16,
+        "back_mb": 4,
+        "pause_wait": 1,
+    },
+    # Mobile/hotel links: big cushion, rebuffer for longer before resuming
+    "resilient": {
+        "readahead": 60,
+        "max_mb": 64,
+        "back_mb": 8,
+        "pause_wait": 5,
+    },
+}
+
+# Limits for the adaptive mode
+ADAPTIVE_START = "low-latency"
+ADAPTIVE_MAX = BUFFER_PROFILES["resilient"]
+# Underruns right after tuning in are just the initial fill
+UNDERRUN_GRACE = 5
+# Shrink back one step after this long without an underrun
+HEALTHY_PERIOD = 300
+
+
+def apply_settings(instance, settings):
+    """Writes a settings dict (see BUFFER_PROFILES) to an mpv instance."""
+    instance['cache-secs'] = str(round(settings['readahead']))
+    instance['demuxer-readahead-secs'] = str(round(settings['readahead']))
+    instance['demuxer-max-bytes'] = f"{round(settings['max_mb'])}MiB"
+    instance['demuxer-max-back-bytes'] = f"{round(settings['back_mb'])}MiB"
+    instance['cache-pause-wait'] = str(settings['pause_wait'])
+
+
+class BufferController:
+    """
+    Applies a buffering profile to the active mpv instance. In "adaptive"
+    mode it starts small and grows readahead and memory caps after every
+    underrun, then shrinks them again once the link has been healthy for
+    HEALTHY_PERIOD seconds.
+    """
+    def __init__(self, profile="balanced"):
+        if profile != "adaptive" and profile not in BUFFER_PROFILES:
+            logger.warning(f"Unknown buffer profile '{profile}', using 'balanced'")
+            profile = "balanced"
+
+        self.profile = profile
+        self.adaptive = profile == "adaptive"
+        self.settings = dict(BUFFER_PROFILES[ADAPTIVE_START if self.adaptive else profile])
+        self.underruns = 0
+        self._buffering = False
+        self._started_at = 0
+        self._last_change = time.monotonic()
+        self._instance = None
+
+    def attach(self, instance):
+        """Makes instance the one being tuned and applies the current settings."""
+        self._instance = instance
+        self._buffering = False
+        self._started_at = time.monotonic()
+        try:
+            apply_settings(instance, self.settings)
+        except Exception as e:
+            logger.warning(f"Failed to apply buffer settings: {e}")
+
+    def on_paused_for_cache(self, paused):
+        if paused and not self._buffering:
+            if time.monotonic() - self._started_at > UNDERRUN_GRACE:
+                self.underruns += 1
+                logger.info(f"Buffer underrun #{self.underruns} ({self.settings['readahead']}s readahead)")
+                if self.adaptive:
+                    self._grow()
+        self._buffering = bool(paused)
+
+    def on_cache_state(self, state):
+        if not self.adaptive or not state or self._buffering:
+            return
+        if time.monotonic() - self._last_change > HEALTHY_PERIOD:
+            self._shrink()
+
+    def _grow(self):
+        new = {k: min(v * 2, ADAPTIVE_MAX[k]) for k, v in self.settings.items()}
+        self._update(new, "Growing")
+
+    def _shrink(self):
+        floor = BUFFER_PROFILES[ADAPTIVE_START]
+        new = {k: max(v / 2, floor[k]) for k, v in self.settings.items()}
+        self._update(new, "Shrinking")
+
+    def _update(self, new, verb):
+        self._last_change = time.monotonic()
+        if new == self.settings:
+            return
+        self.settings = new
+        logger.info(f"{verb} buffer: {new['readahead']}s readahead, {new['max_mb']} MiB")
+        if self._instance is not None:
+            try:
+                apply_settings(self._instance, new)
+            except Exception as e:
+                logger.warning(f"Failed to apply buffer settings: {e}")
@@ -0,0 +1,165 @@
+import os
+import json
+import atexit
+import logging
+import threading
+
+from src.config import FAVORITES_FILE
+
+logger = logging.getLogger(__name__)
+
+# Edits within this many seconds of each other are written out together
+SAVE_DELAY = 1.0
+
+
+def station_key(station):
+    return station.get('url_resolved') or station.get('url')
+
+
+def write_atomic(path, data):
+    """Writes data (str) to path via a temp file, fsync and rename."""
+    directory = os.path.dirname(path) or "."
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    # Make the rename itself durable
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+class FavoritesStore:
+    """
+    The favorites library, indexed by stream URL. Membership, lookups and
+    edits are dict operations; every edit schedules a save that runs on a
+    background timer, so bursts of edits cost one atomic write.
+    Iterating yields the stations in library order.
+    """
+    def __init__(self, path=FAVORITES_FILE, save_delay=SAVE_DELAY):
+        self.path = path
+        self.save_delay = save_delay
+        self._stations = {}  # key -> station dict, in library order
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._timer = None
+        self._dirty = False
+        self.load()
+        atexit.register(self.flush)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                stations = json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load favorites: {e}")
+            return
+        with self._lock:
+            self._stations = {}
+            for station in stations:
+                key = station_key(station)
+                if key and key not in self._stations:
+                    self._stations[key] = station
+
+    # --- Lookups ---
+    def __contains__(self, url):
+        return url in self._stations
+
+    def __len__(self):
+        return len(self._stations)
+
+    def __iter__(self):
+        return iter(self.stations())
+
+    def get(self, url):
+        return self._stations.get(url)
+
+    def stations(self):
+        """Snapshot of the library as a list."""
+        with self._lock:
+            return list(self._stations.values())
+
+    # --- Edits ---
+    def add(self, station):
+        key = station_key(station)
+        if not key:
+            return False
+        with self._lock:
+            if key in self._stations:
+                return False
+            self._stations[key] = station
+        self._schedule_save()
+        return True
+
+    def remove(self, url):
+        with self._lock:
+            removed = self._stations.pop(url, None)
+        if removed:
+            self._schedule_save()
+        return removed
+
+    def replace(self, url, station):
+        """Swaps the station stored under url for station, keeping its place."""
+        key = station_key(station)
+        with self._lock:
+            if url not in self._stations:
+                return self.add(station)
+            if key == url:
+                self._stations[key] = station
+            else:
+                # The URL itself was edited: rebuild to keep the position
+                self._stations = {
+                    (key if k == url else k): (station if k == url else s)
+                    for k, s in self._stations.items() if k != key or k == url
+                }
+        self._schedule_save()
+        return True
+
+    def update(self, url, **fields):
+        """Sets fields on a stored station. Returns the updated station or None."""
+        with self._lock:
+            station = self._stations.get(url)
+            if station is None:
+                return None
+            # A new dict, so lists built from an earlier snapshot see the change
+            station = self._stations[url] = {**station, **fields}
+        self._schedule_save()
+        return station
+
+    # --- Saving ---
+    def _schedule_save(self):
+        with self._lock:
+            self._dirty = True
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(self.save_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Writes pending edits now."""
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                self._dirty = False
+                data = json.dumps(list(self._stations.values()), indent=2)
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                write_atomic(self.path, data)
+            except Exception as e:
+                logger.error(f"Failed to save favorites: {e}")
+                with self._lock:
+                    self._dirty = True
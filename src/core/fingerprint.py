@@ -0,0 +1,326 @@
+import os
+import sys
+import json
+import logging
+import argparse
+import subprocess
+import numpy as np
+
+from src.config import FINGERPRINT_DB
+
+logger = logging.getLogger(__name__)
+
+# --- Fingerprint parameters ---
+# Audio is decoded to 8 kHz mono; everything interesting for matching sits
+# well below 4 kHz and the smaller spectrogram keeps ingestion fast.
+SAMPLE_RATE = 8000
+WINDOW_SIZE = 1024
+HOP_SIZE = 256
+
+# Frequency bands (rfft bins) in which one peak per frame is picked.
+PEAK_BANDS = (0, 10, 20, 40, 80, 160, 511)
+# Each anchor peak is paired with the next FAN_OUT peaks within MAX_DT frames.
+FAN_OUT = 10
+MAX_DT = 200
+
+# Hashes that appear more often than this in the index carry no information
+# (silence, hum) and are skipped at match time to bound the work per query.
+MAX_HITS_PER_HASH = 2000
+# Minimum number of time-aligned hash hits to accept a match, and the
+# share of the query's hashes they must make up. Chance alignments grow
+# with the query length; a real match stays well above this share even
+# through heavy noise.
+MIN_ALIGNED_HITS = 20
+MIN_ALIGNED_FRACTION = 0.02
+
+AUDIO_EXTENSIONS = (".mp3", ".flac", ".ogg", ".opus", ".m4a", ".aac", ".wav")
+
+_FRAME_CHUNK = 2048
+_HANN = np.hanning(WINDOW_SIZE).astype(np.float32)
+
+
+def decode_audio(path, offset=None, duration=None):
+    """
+    Decodes any ffmpeg-readable file to a float32 mono array at SAMPLE_RATE.
+    Returns None if decoding fails.
+    """
+    cmd = ["ffmpeg", "-v", "quiet"]
+    if offset:
+        cmd += ["-ss", str(offset)]
+    if duration:
+        cmd += ["-t", str(duration)]
+    cmd += ["-i", path, "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "s16le", "-"]
+
+    try:
+        res = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True)
+    except Exception as e:
+        logger.error(f"Failed to decode {path}: {e}")
+        return None
+
+    return np.frombuffer(res.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def _find_peaks(samples):
+    """Returns (frame_index, freq_bin) arrays of the spectrogram constellation."""
+    if len(samples) < WINDOW_SIZE:
+        return np.empty(0, np.int64), np.empty(0, np.int64)
+
+    frames = np.lib.stride_tricks.sliding_window_view(samples, WINDOW_SIZE)[::HOP_SIZE]
+    times, freqs = [], []
+
+    # Work in chunks so a full-length track never materializes its whole
+    # complex spectrogram at once.
+    for start in range(0, len(frames), _FRAME_CHUNK):
+        chunk = frames[start:start + _FRAME_CHUNK]
+        spec = np.log1p(np.abs(np.fft.rfft(chunk * _HANN, axis=1)))
+
+        band_bins = []
+        band_vals = []
+        for lo, hi in zip(PEAK_BANDS[:-1], PEAK_BANDS[1:]):
+            band = spec[:, lo:hi]
+            idx = band.argmax(axis=1)
+            band_bins.append(idx + lo)
+            band_vals.append(band[np.arange(len(band)), idx])
+
+        bins = np.stack(band_bins, axis=1)
+        vals = np.stack(band_vals, axis=1)
+
+        # Keep the band maxima that stand out within their own frame
+        keep = (vals >= vals.mean(axis=1, keepdims=True)) & (vals > 0.05)
+        t, b = np.nonzero(keep)
+        times.append(t + start)
+        freqs.append(bins[t, b])
+
+    return np.concatenate(times), np.concatenate(freqs)
+
+
+def fingerprint(samples):
+    """
+    Computes constellation hashes for the given samples.
+    Returns (hashes, offsets) as uint32 arrays; offsets are anchor frame indices.
+    """
+    t, f = _find_peaks(samples)
+    order = np.lexsort((f, t))
+    t = t[order].astype(np.int64)
+    f = np.minimum(f[order], 511).astype(np.int64)
+
+    hashes, offsets = [], []
+    for k in range(1, FAN_OUT + 1):
+        if len(t) <= k:
+            break
+        dt = t[k:] - t[:-k]
+        ok = (dt > 0) & (dt <= MAX_DT)
+        # 9 bits anchor freq | 9 bits target freq | 14 bits time delta
+        hashes.append((f[:-k][ok] << 23) | (f[k:][ok] << 14) | dt[ok])
+        offsets.append(t[:-k][ok])
+
+    if not hashes:
+        return np.empty(0, np.uint32), np.empty(0, np.uint32)
+    return np.concatenate(hashes).astype(np.uint32), np.concatenate(offsets).astype(np.uint32)
+
+
+def read_tags(path):
+    """Returns {'title', 'artist'} from the file tags, falling back to 'Artist - Title' filenames."""
+    tags = {}
+    try:
+        res = subprocess.run(
+            ["ffprobe", "-v", "quiet", "-print_format", "json", "-show_format", path],
+            capture_output=True, text=True
+        )
+        raw = json.loads(res.stdout).get('format', {}).get('tags', {})
+        tags = {k.lower(): v for k, v in raw.items()}
+    except Exception as e:
+        logger.debug(f"ffprobe failed for {path}: {e}")
+
+    title = tags.get('title')
+    artist = tags.get('artist')
+    if not title:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        if " - " in stem:
+            artist, title = stem.split(" - ", 1)
+        else:
+            title = stem
+
+    return {'title': title, 'artist': artist or 'Unknown'}
+
+
+class FingerprintIndex:
+    """
+    On-disk constellation hash index for a local audio catalog.
+
+    The index directory holds three parallel arrays sorted by hash
+    (hashes.npy, track_ids.npy, offsets.npy) plus tracks.json. The arrays
+    are memory-mapped, so opening even a large catalog is instant and
+    lookups are a vectorized binary search.
+    """
+    def __init__(self, path=FINGERPRINT_DB):
+        self.path = path
+        self.tracks = []
+        self.hashes = np.empty(0, np.uint32)
+        self.track_ids = np.empty(0, np.uint32)
+        self.offsets = np.empty(0, np.uint32)
+        self._pending = []
+        self.load()
+
+    def __len__(self):
+        return len(self.tracks)
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def load(self):
+        if not os.path.exists(self._file("tracks.json")):
+            return
+        # Loaded into locals first, so a failure can't leave a mix of old and new arrays
+        try:
+            with open(self._file("tracks.json")) as f:
+                tracks = json.load(f)
+            hashes = np.load(self._file("hashes.npy"), mmap_mode='r')
+            track_ids = np.load(self._file("track_ids.npy"), mmap_mode='r')
+            offsets = np.load(self._file("offsets.npy"), mmap_mode='r')
+        except Exception as e:
+            logger.error(f"Failed to load fingerprint index from {self.path}: {e}")
+            tracks = []
+            hashes = track_ids = offsets = np.empty(0, np.uint32)
+        else:
+            logger.info(f"Loaded fingerprint index: {len(tracks)} tracks, {len(hashes)} hashes")
+        self.tracks, self.hashes, self.track_ids, self.offsets = tracks, hashes, track_ids, offsets
+
+    def save(self):
+        if not self._pending:
+            return
+
+        hashes = [np.asarray(self.hashes)] + [p[0] for p in self._pending]
+        track_ids = [np.asarray(self.track_ids)] + [p[1] for p in self._pending]
+        offsets = [np.asarray(self.offsets)] + [p[2] for p in self._pending]
+        hashes = np.concatenate(hashes)
+        order = np.argsort(hashes, kind='stable')
+
+        arrays = {
+            "hashes.npy": hashes[order],
+            "track_ids.npy": np.concatenate(track_ids)[order],
+            "offsets.npy": np.concatenate(offsets)[order],
+        }
+
+        os.makedirs(self.path, exist_ok=True)
+        for name, arr in arrays.items():
+            tmp = self._file(name + ".tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, arr)
+            os.replace(tmp, self._file(name))
+
+        tmp = self._file("tracks.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.tracks, f)
+        os.replace(tmp, self._file("tracks.json"))
+
+        self._pending = []
+        self.load()
+
+    def add_file(self, path):
+        """Fingerprints a single file. Call save() to persist."""
+        samples = decode_audio(path)
+        if samples is None or len(samples) == 0:
+            return False
+
+        hashes, offsets = fingerprint(samples)
+        if len(hashes) == 0:
+            logger.warning(f"No fingerprint extracted from {path}")
+            return False
+
+        track_id = len(self.tracks)
+        track = read_tags(path)
+        track.update({'id': track_id, 'path': path})
+        self.tracks.append(track)
+        self._pending.append((hashes, np.full(len(hashes), track_id, np.uint32), offsets))
+        logger.info(f"Indexed '{track['artist']} - {track['title']}' ({len(hashes)} hashes)")
+        return True
+
+    def ingest_directory(self, directory):
+        """Recursively adds every audio file not already in the index. Returns the number added."""
+        known = {t['path'] for t in self.tracks}
+        added = 0
+        for root, _dirs, files in os.walk(directory):
+            for name in sorted(files):
+                if not name.lower().endswith(AUDIO_EXTENSIONS):
+                    continue
+                path = os.path.abspath(os.path.join(root, name))
+                if path in known:
+                    continue
+                if self.add_file(path):
+                    added += 1
+        self.save()
+        return added
+
+    def match_samples(self, samples):
+        """
+        Matches decoded samples against the index.
+        Returns the track dict with an added 'score', or None.
+        """
+        if len(self.hashes) == 0 or samples is None:
+            return None
+
+        q_hashes, q_offsets = fingerprint(samples)
+        if len(q_hashes) == 0:
+            return None
+
+        lo = np.searchsorted(self.hashes, q_hashes, side='left')
+        hi = np.searchsorted(self.hashes, q_hashes, side='right')
+        counts = hi - lo
+        mask = (counts > 0) & (counts <= MAX_HITS_PER_HASH)
+        if not mask.any():
+            return None
+
+        lo, counts, q_offsets = lo[mask], counts[mask], q_offsets[mask]
+        total = int(counts.sum())
+
+        # Expand every [lo, hi) range into flat index positions without a Python loop
+        starts = np.repeat(lo, counts)
+        within = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        idx = starts + within
+
+        tids = np.asarray(self.track_ids[idx], dtype=np.int64)
+        deltas = np.asarray(self.offsets[idx], dtype=np.int64) - np.repeat(q_offsets.astype(np.int64), counts)
+
+        # A true match has many hits sharing the same (track, time offset)
+        keys = (tids << 32) | (deltas & 0xFFFFFFFF)
+        uniq, hits = np.unique(keys, return_counts=True)
+        best = hits.argmax()
+        score = int(hits[best])
+        if score < max(MIN_ALIGNED_HITS, MIN_ALIGNED_FRACTION * len(q_hashes)):
+            return None
+
+        track = dict(self.tracks[int(uniq[best] >> 32)])
+        track['score'] = score
+        return track
+
+    def match_file(self, path):
+        return self.match_samples(decode_audio(path))
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Manage the local Cyber Radio fingerprint index.")
+    parser.add_argument("--index", default=FINGERPRINT_DB, help="Index directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ingest = sub.add_parser("ingest", help="Fingerprint every audio file in a directory")
+    ingest.add_argument("directory")
+    match = sub.add_parser("match", help="Identify an audio file against the index")
+    match.add_argument("file")
+    args = parser.parse_args()
+
+    index = FingerprintIndex(args.index)
+    if args.command == "ingest":
+        added = index.ingest_directory(args.directory)
+        print(f"Added {added} tracks ({len(index)} total).")
+    else:
+        result = index.match_file(args.file)
+        if not result:
+            print("No match.")
+            return 1
+        print(f"{result['artist']} - {result['title']} (score {result['score']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+import time
+import socket
+import logging
+import threading
+import http.client
+import urllib.parse
+
+from src.config import HEALTH_TTL
+from src.core.jobs import get_runner
+from src.core.resolver import PLAYLIST_TYPES, PLAYLIST_EXTENSIONS, MAX_PLAYLIST_BYTES, _parse_playlist, _is_youtube
+
+logger = logging.getLogger(__name__)
+
+PROBE_TIMEOUT = 6
+# Enough audio to recognize the codec; the probe hangs up after this
+PROBE_BYTES = 4096
+MAX_REDIRECTS = 5
+# Stations slower than this to deliver audio are flagged as slow
+SLOW_TTFB_MS = 2000
+# A queued probe that hasn't reported by then (cancelled or stuck) may be retried
+IN_FLIGHT_TIMEOUT = 120
+
+CODECS = {
+    'audio/mpeg': 'mp3', 'audio/mp3': 'mp3',
+    'audio/aac': 'aac', 'audio/aacp': 'aac', 'audio/x-aac': 'aac',
+    'audio/ogg': 'ogg', 'application/ogg': 'ogg', 'audio/opus': 'opus',
+    'audio/flac': 'flac', 'audio/x-flac': 'flac',
+    'application/vnd.apple.mpegurl': 'hls', 'application/x-mpegurl': 'hls',
+}
+
+
+def sniff_codec(data, content_type=None):
+    """Codec from the first bytes of a stream, falling back to its content type."""
+    if data.startswith(b'fLaC'):
+        return 'flac'
+    if data.startswith(b'OggS'):
+        if b'OpusHead' in data[:512]:
+            return 'opus'
+        return 'flac' if b'\x7fFLAC' in data[:512] else 'vorbis'
+    if data.startswith(b'ID3'):
+        return 'mp3'
+    if data.startswith(b'#EXTM3U'):
+        return 'hls'
+    if len(data) > 1 and data[0] == 0xFF:
+        # ADTS (AAC) sets layer bits to 00; MPEG audio frames don't
+        return 'aac' if data[1] & 0xF6 == 0xF0 else 'mp3'
+    return CODECS.get(content_type)
+
+
+def _bitrate(headers):
+    value = headers.get('icy-br') or ''
+    if not value:
+        # Icecast: ice-audio-info: ice-samplerate=44100;ice-bitrate=128;...
+        for part in (headers.get('ice-audio-info') or '').split(';'):
+            key, _, val = part.partition('=')
+            if key.strip() in ('bitrate', 'ice-bitrate'):
+                value = val
+    try:
+        return int(value.split(',')[0])
+    except ValueError:
+        return None
+
+
+def _open(url):
+    """Connects to url. Returns (connection, response, connect seconds)."""
+    parts = urllib.parse.urlsplit(url)
+    conn_cls = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    conn = conn_cls(parts.hostname, parts.port, timeout=PROBE_TIMEOUT)
+    start = time.monotonic()
+    conn.connect()
+    connected = time.monotonic() - start
+
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+    conn.request('GET', path, headers={
+        'User-Agent': 'Mozilla/5.0 (compatible; CyberRadio/1.0)',
+        'Icy-MetaData': '0',
+    })
+    return conn, conn.getresponse(), connected
+
+
+def probe_stream(url):
+    """
+    Opens url the way mpv would, follows redirects and playlists, and reads
+    the first bytes of audio. Returns {'alive', 'connect_ms', 'ttfb_ms',
+    'codec', 'bitrate', 'name', 'error', 'checked_at'}.
+    """
+    result = {'url': url, 'alive': False, 'connect_ms': None, 'ttfb_ms': None,
+              'codec': None, 'bitrate': None, 'name': None, 'error': None, 'checked_at': time.time()}
+    if _is_youtube(url):
+        result['error'] = "not probed"
+        return result
+
+    target = url
+    start = time.monotonic()
+    try:
+        for _ in range(MAX_REDIRECTS + 1):
+            conn, resp, connected = _open(target)
+            try:
+                if resp.status in (301, 302, 303, 307, 308) and resp.getheader('Location'):
+                    target = urllib.parse.urljoin(target, resp.getheader('Location'))
+                    continue
+
+                content_type = (resp.getheader('Content-Type') or '').split(';')[0].strip().lower()
+                if resp.status != 200:
+                    result['error'] = f"HTTP {resp.status}"
+                    return result
+
+                path = urllib.parse.urlsplit(target).path.lower()
+                if content_type in PLAYLIST_TYPES or path.endswith(PLAYLIST_EXTENSIONS):
+                    body = resp.read(MAX_PLAYLIST_BYTES)
+                    entries = [] if b'#EXT-X-' in body else _parse_playlist(body.decode(errors='replace'), target)
+                    if entries:
+                        target = entries[0]
+                        continue
+                    data = body[:PROBE_BYTES]
+                else:
+                    data = resp.read1(PROBE_BYTES) if hasattr(resp, 'read1') else resp.read(PROBE_BYTES)
+
+                result['connect_ms'] = round(connected * 1000)
+                result['ttfb_ms'] = round((time.monotonic() - start) * 1000)
+                result['codec'] = sniff_codec(data, content_type)
+                result['bitrate'] = _bitrate(resp.headers)
+                result['name'] = resp.getheader('icy-name')
+                result['alive'] = bool(data)
+                if not data:
+                    result['error'] = "no data"
+                return result
+            finally:
+                conn.close()
+        result['error'] = "too many redirects"
+    except http.client.BadStatusLine as e:
+        # SHOUTcast v1 answers "ICY 200 OK", which http.client rejects
+        if str(e).startswith('ICY 200'):
+            result['alive'] = True
+            result['ttfb_ms'] = round((time.monotonic() - start) * 1000)
+        else:
+            result['error'] = f"bad response: {e}"
+    except (OSError, socket.timeout, http.client.HTTPException) as e:
+        result['error'] = str(e) or type(e).__name__
+    return result
+
+
+class StationHealth:
+    """
+    Probes station URLs in the background (the job runner's 'health'
+    subsystem bounds how many run at once) and caches the results for
+    HEALTH_TTL seconds. listeners are called with each new result.
+    """
+    def __init__(self, ttl=HEALTH_TTL):
+        self.ttl = ttl
+        self.listeners = []
+        self._cache = {}
+        self._in_flight = {}  # url -> queued at; cancelled probes never report back
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        """The fresh result for url, or None."""
+        with self._lock:
+            result = self._cache.get(url)
+        if result and time.time() - result['checked_at'] < self.ttl:
+            return result
+        return None
+
+    def is_dead(self, url):
+        result = self.get(url)
+        return bool(result) and not result['alive'] and result['error'] != "not probed"
+
+    def is_slow(self, url):
+        result = self.get(url)
+        return bool(result) and result['alive'] and (result['ttfb_ms'] or 0) > SLOW_TTFB_MS
+
+    def forget(self, url):
+        with self._lock:
+            self._cache.pop(url, None)
+
+    def probe(self, urls, scope=None):
+        """Queues a probe for each url without a fresh result."""
+        runner = get_runner()
+        for url in dict.fromkeys(urls):
+            if not url or self.get(url):
+                continue
+            with self._lock:
+                if time.monotonic() - self._in_flight.get(url, float('-inf')) < IN_FLIGHT_TIMEOUT:
+                    continue
+                self._in_flight[url] = time.monotonic()
+            runner.submit(self._probe, url, subsystem='health', scope=scope,
+                          on_done=self._notify)
+
+    def _probe(self, url):
+        try:
+            result = probe_stream(url)
+        finally:
+            with self._lock:
+                self._in_flight.pop(url, None)
+        with self._lock:
+            self._cache[url] = result
+        if not result['alive']:
+            logger.info(f"Station probe failed for {url}: {result['error']}")
+        return result
+
+    def _notify(self, result):
+        for listener in self.listeners:
+            try:
+                listener(result)
+            except Exception as e:
+                logger.error(f"Health listener failed: {e}")
@@ -0,0 +1,156 @@
+import os
+import csv
+import json
+import time
+import sqlite3
+import logging
+import threading
+
+from src.config import HISTORY_DB
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ('id', 'title', 'artist', 'station', 'station_url', 'art_url', 'musicbrainz_url', 'identified_at')
+# Rows fetched per query while iterating/exporting
+EXPORT_BATCH = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS songs (
+    id INTEGER PRIMARY KEY,
+    title TEXT,
+    artist TEXT,
+    station TEXT,
+    station_url TEXT,
+    art_url TEXT,
+    musicbrainz_url TEXT,
+    identified_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS songs_identified_at ON songs(identified_at);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS songs_fts USING fts5(
+    title, artist, station, content='songs', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS songs_ai AFTER INSERT ON songs BEGIN
+    INSERT INTO songs_fts(rowid, title, artist, station) VALUES (new.id, new.title, new.artist, new.station);
+END;
+CREATE TRIGGER IF NOT EXISTS songs_ad AFTER DELETE ON songs BEGIN
+    INSERT INTO songs_fts(songs_fts, rowid, title, artist, station) VALUES ('delete', old.id, old.title, old.artist, old.station);
+END;
+"""
+
+
+def _fts_query(text):
+    # Every word as a quoted prefix term, so user input can't be FTS syntax
+    words = text.replace('"', ' ').split()
+    return " ".join(f'"{w}"*' for w in words)
+
+
+class SongHistory:
+    """
+    Identified songs in an SQLite database, newest first, with full-text
+    search over title, artist and station (FTS5, or LIKE where SQLite was
+    built without it). Pages are fetched on demand, so callers never hold
+    the whole history in memory.
+    """
+    def __init__(self, path=HISTORY_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+            try:
+                self._db.executescript(FTS_SCHEMA)
+                self.fts = True
+            except sqlite3.OperationalError as e:
+                logger.warning(f"SQLite has no FTS5 ({e}); history search falls back to LIKE")
+                self.fts = False
+
+    def add(self, title, artist, station=None, station_url=None, art_url=None, musicbrainz_url=None):
+        with self._lock, self._db:
+            cur = self._db.execute(
+                "INSERT INTO songs (title, artist, station, station_url, art_url, musicbrainz_url, identified_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (title, artist, station, station_url, art_url, musicbrainz_url, time.time())
+            )
+            return cur.lastrowid
+
+    def remove(self, song_id):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM songs WHERE id = ?", (song_id,))
+
+    def _where(self, query):
+        query = (query or "").strip()
+        if not query:
+            return "", ()
+        if self.fts:
+            match = _fts_query(query)
+            if match:
+                return "WHERE id IN (SELECT rowid FROM songs_fts WHERE songs_fts MATCH ?)", (match,)
+            return "", ()
+        like = f"%{query}%"
+        return "WHERE title LIKE ? OR artist LIKE ? OR station LIKE ?", (like, like, like)
+
+    def count(self, query=None):
+        where, args = self._where(query)
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM songs {where}", args).fetchone()[0]
+
+    def page(self, offset, limit, query=None):
+        """Songs offset..offset+limit, newest first, as dicts."""
+        where, args = self._where(query)
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {', '.join(FIELDS)} FROM songs {where} ORDER BY identified_at DESC, id DESC LIMIT ? OFFSET ?",
+                args + (limit, offset)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def iter_songs(self, query=None, batch=EXPORT_BATCH):
+        """Yields matching songs newest first, EXPORT_BATCH rows per query."""
+        where, args = self._where(query)
+        # Keyset pagination: stable while songs are added during an export
+        cursor = (float('inf'), float('inf'))
+        keyset = "(identified_at < ? OR (identified_at = ? AND id < ?))"
+        where = f"{where} AND {keyset}" if where else f"WHERE {keyset}"
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    f"SELECT {', '.join(FIELDS)} FROM songs {where} ORDER BY identified_at DESC, id DESC LIMIT ?",
+                    args + (cursor[0], cursor[0], cursor[1], batch)
+                ).fetchall()
+            for row in rows:
+                yield dict(row)
+            if len(rows) < batch:
+                return
+            cursor = (rows[-1]['identified_at'], rows[-1]['id'])
+
+    def export_csv(self, path, query=None):
+        count = 0
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            for song in self.iter_songs(query):
+                writer.writerow(song)
+                count += 1
+        return count
+
+    def export_json(self, path, query=None):
+        count = 0
+        with open(path, "w") as f:
+            f.write("[")
+            for song in self.iter_songs(query):
+                f.write(",\n  " if count else "\n  ")
+                f.write(json.dumps(song))
+                count += 1
+            f.write("\n]\n" if count else "]\n")
+        return count
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config import JOB_WORKERS
+
+logger = logging.getLogger(__name__)
+
+# How many jobs of each subsystem may run at once; others wait their turn
+LIMITS = {
+    'search': 1,
+    'metadata': 2,
+    'art': 4,
+    'recognition': 1,
+    'musicbrainz': 1,
+    'resolve': 2,
+    'health': 4,
+}
+DEFAULT_LIMIT = 2
+
+
+class JobRunner:
+    """
+    Runs background work as tasks on one asyncio loop in one thread.
+    Blocking calls (urllib, subprocess) go to a fixed pool of JOB_WORKERS
+    threads, so the thread count doesn't grow with user activity.
+
+    Jobs belong to a subsystem, which caps how many run at once, and
+    optionally to a scope. cancel_scope() cancels every job in a scope and
+    guarantees none of their on_done callbacks runs afterwards, e.g. art
+    and metadata lookups for a station that is no longer playing. (A
+    blocking call that already started finishes on its worker; its result
+    is dropped.)
+    on_done/on_error are handed to `dispatch` (GLib.idle_add for the UI).
+    """
+    def __init__(self, dispatch=None, workers=JOB_WORKERS):
+        self.dispatch = dispatch or (lambda fn, *args: fn(*args))
+        self.loop = asyncio.new_event_loop()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cyberradio-job")
+        self.loop.set_default_executor(self._executor)
+        self._limits = {}
+        self._scopes = {}  # scope -> set of tasks
+        self._generations = {}  # scope -> bumped on every cancel
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="cyberradio-jobs", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def _limit(self, subsystem):
+        # Only touched from the loop thread
+        semaphore = self._limits.get(subsystem)
+        if semaphore is None:
+            semaphore = self._limits[subsystem] = asyncio.Semaphore(LIMITS.get(subsystem, DEFAULT_LIMIT))
+        return semaphore
+
+    def _current(self, scope, generation):
+        with self._lock:
+            return self._generations.get(scope, 0) == generation
+
+    def _deliver(self, scope, generation, callback, *args):
+        # Checked again on the receiving loop: the scope may have been
+        # cancelled while the callback sat in its queue
+        @functools.wraps(callback)
+        def deliver():
+            if scope is None or self._current(scope, generation):
+                callback(*args)
+            return False
+        self.dispatch(deliver)
+
+    async def _job(self, work, subsystem, scope, generation, on_done, on_error):
+        if scope is not None:
+            if not self._current(scope, generation):
+                return None
+            tasks = self._scopes.setdefault(scope, set())
+            task = asyncio.current_task()
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        try:
+            async with self._limit(subsystem):
+                result = await work()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if on_error:
+                self._deliver(scope, generation, on_error, e)
+            else:
+                logger.error(f"{subsystem} job failed: {e}")
+            return None
+        if on_done:
+            self._deliver(scope, generation, on_done, result)
+        return result
+
+    def _start(self, work, subsystem, scope, on_done, on_error):
+        with self._lock:
+            generation = self._generations.get(scope, 0)
+        job = self._job(work, subsystem, scope, generation, on_done, on_error)
+        return asyncio.run_coroutine_threadsafe(job, self.loop)
+
+    def submit(self, fn, *args, subsystem='default', scope=None, on_done=None, on_error=None):
+        """
+        Runs the blocking fn(*args) on the worker pool. Returns a
+        concurrent.futures.Future; on_done(result) / on_error(exception)
+        go through dispatch.
+        """
+        async def work():
+            return await self.loop.run_in_executor(None, fn, *args)
+        return self._start(work, subsystem, scope, on_done, on_error)
+
+    def spawn(self, coro_fn, *args, subsystem='default', scope=None, on_done=None, on_error=None):
+        """Like submit, for a coroutine function running on the loop itself."""
+        async def work():
+            return await coro_fn(*args)
+        return self._start(work, subsystem, scope, on_done, on_error)
+
+    def cancel_scope(self, scope):
+        """Cancels all jobs in scope; their callbacks will not run."""
+        with self._lock:
+            self._generations[scope] = self._generations.get(scope, 0) + 1
+
+        def cancel():
+            for task in list(self._scopes.pop(scope, ())):
+                task.cancel()
+        self.loop.call_soon_threadsafe(cancel)
+
+    def shutdown(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_runner(dispatch=None):
+    """The process-wide JobRunner. The first caller chooses its dispatch."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner(dispatch)
+        return _runner
@@ -0,0 +1,255 @@
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+
+from src.config import METRICS_FILE
+
+logger = logging.getLogger(__name__)
+
+# Don't rewrite the metric files more often than this
+FLUSH_INTERVAL = 10
+
+TTFA_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 3, 5, 10, 20)
+REBUFFER_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 30)
+BITRATE_BUCKETS = (32, 64, 96, 128, 192, 256, 320, 500, 1000, 2000)
+RECONNECT_BUCKETS = (0.5, 1, 2, 5, 10, 30, 60, 300)
+
+
+class Histogram:
+    """A Prometheus-style histogram with fixed upper bounds."""
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self):
+        """Returns [(le, count)] including +Inf, as Prometheus expects."""
+        out, running = [], 0
+        for bound, n in zip(self.buckets, self.counts):
+            running += n
+            out.append((str(bound), running))
+        out.append(("+Inf", self.count))
+        return out
+
+    def to_dict(self):
+        return {"buckets": dict(self.cumulative()), "count": self.count, "sum": round(self.sum, 3)}
+
+
+class StationMetrics:
+    def __init__(self, url, name=None):
+        self.url = url
+        self.name = name or url
+        self.plays = 0
+        self.rebuffers = 0
+        self.drops = 0
+        self.reconnects = 0
+        self.codec = None
+        self.time_to_first_audio = Histogram(TTFA_BUCKETS)
+        self.rebuffer_duration = Histogram(REBUFFER_BUCKETS)
+        self.network_kbps = Histogram(BITRATE_BUCKETS)
+        self.reconnect_latency = Histogram(RECONNECT_BUCKETS)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "plays": self.plays,
+            "rebuffers": self.rebuffers,
+            "drops": self.drops,
+            "reconnects": self.reconnects,
+            "codec": self.codec,
+            "time_to_first_audio_seconds": self.time_to_first_audio.to_dict(),
+            "rebuffer_duration_seconds": self.rebuffer_duration.to_dict(),
+            "network_bitrate_kbps": self.network_kbps.to_dict(),
+            "reconnect_latency_seconds": self.reconnect_latency.to_dict(),
+        }
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class PlaybackMetrics:
+    """
+    Collects playback quality per station: time from play() to first audio,
+    rebuffer count and duration, network bitrate, codec and dropped
+    connections. Fed from mpv property observers and written to
+    METRICS_FILE.json / METRICS_FILE.prom.
+    """
+    def __init__(self, path=METRICS_FILE):
+        self.path = path
+        self.stations = {}
+        self._lock = threading.Lock()
+        self._current = None
+        self._play_started = None
+        self._stall_started = None
+        self._awaiting_reset = False
+        self._last_playback_time = None
+        self._last_flush = 0
+        self._dirty = False
+        atexit.register(self.flush)
+
+    def _station(self, url, name=None):
+        station = self.stations.get(url)
+        if station is None:
+            station = self.stations[url] = StationMetrics(url, name)
+        elif name:
+            station.name = name
+        return station
+
+    def on_play(self, url, name=None, warm=False):
+        with self._lock:
+            self._current = self._station(url, name)
+            self._current.plays += 1
+            self._play_started = time.monotonic()
+            self._stall_started = None
+            # A freshly loaded file reports playback-time as unavailable first;
+            # values before that still belong to the previous stream. If mpv
+            # was idle the clock is already unavailable and no reset comes. A
+            # warm standby instance already has a clock and advances at once.
+            self._awaiting_reset = not warm and self._last_playback_time is not None
+            self._dirty = True
+
+    def on_stop(self):
+        with self._lock:
+            self._current = None
+            self._play_started = None
+            self._stall_started = None
+        self.maybe_flush()
+
+    def on_playback_time(self, value):
+        with self._lock:
+            self._last_playback_time = value
+            if value is None:
+                self._awaiting_reset = False
+                return
+            if self._awaiting_reset:
+                return
+            if self._current and self._play_started is not None:
+                elapsed = time.monotonic() - self._play_started
+                self._current.time_to_first_audio.observe(elapsed)
+                self._play_started = None
+                self._dirty = True
+                logger.info(f"Time to first audio for {self._current.name}: {elapsed:.2f}s")
+        self.maybe_flush()
+
+    def on_paused_for_cache(self, paused):
+        with self._lock:
+            # Buffering before the first audio frame is part of TTFA, not a stall
+            if not self._current or self._play_started is not None:
+                return
+            if paused and self._stall_started is None:
+                self._stall_started = time.monotonic()
+                self._current.rebuffers += 1
+            elif not paused and self._stall_started is not None:
+                self._current.rebuffer_duration.observe(time.monotonic() - self._stall_started)
+                self._stall_started = None
+            self._dirty = True
+        self.maybe_flush()
+
+    def on_cache_speed(self, bytes_per_sec):
+        if not bytes_per_sec:
+            return
+        with self._lock:
+            if self._current:
+                self._current.network_kbps.observe(bytes_per_sec * 8 / 1000)
+                self._dirty = True
+
+    def on_codec(self, codec):
+        if not codec:
+            return
+        with self._lock:
+            if self._current:
+                self._current.codec = codec
+                self._dirty = True
+
+    def on_dropped(self):
+        with self._lock:
+            if self._current:
+                self._current.drops += 1
+                self._dirty = True
+                logger.warning(f"Stream dropped: {self._current.name}")
+        self.maybe_flush()
+
+    def on_reconnected(self, latency):
+        with self._lock:
+            if self._current:
+                self._current.reconnects += 1
+                self._current.reconnect_latency.observe(latency)
+                self._dirty = True
+        self.maybe_flush()
+
+    def maybe_flush(self):
+        if time.monotonic() - self._last_flush > FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            self._last_flush = time.monotonic()
+            snapshot = {url: s.to_dict() for url, s in self.stations.items()}
+            prom = self._render_prometheus()
+
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            for suffix, write in ((".json", lambda f: json.dump(snapshot, f, indent=2)),
+                                  (".prom", lambda f: f.write(prom))):
+                tmp = self.path + suffix + ".tmp"
+                with open(tmp, "w") as f:
+                    write(f)
+                os.replace(tmp, self.path + suffix)
+        except Exception as e:
+            logger.warning(f"Failed to write playback metrics: {e}")
+
+    def _render_prometheus(self):
+        lines = []
+
+        def counter(name, help_text, attr):
+            lines.append(f"# HELP cyberradio_{name} {help_text}")
+            lines.append(f"# TYPE cyberradio_{name} counter")
+            for s in self.stations.values():
+                lines.append(f'cyberradio_{name}{{{self._labels(s)}}} {getattr(s, attr)}')
+
+        def histogram(name, help_text, attr):
+            lines.append(f"# HELP cyberradio_{name} {help_text}")
+            lines.append(f"# TYPE cyberradio_{name} histogram")
+            for s in self.stations.values():
+                h = getattr(s, attr)
+                labels = self._labels(s)
+                for le, n in h.cumulative():
+                    lines.append(f'cyberradio_{name}_bucket{{{labels},le="{le}"}} {n}')
+                lines.append(f'cyberradio_{name}_sum{{{labels}}} {h.sum:.3f}')
+                lines.append(f'cyberradio_{name}_count{{{labels}}} {h.count}')
+
+        counter("plays_total", "Number of times the station was tuned in.", "plays")
+        counter("rebuffers_total", "Playback stalls waiting for the cache.", "rebuffers")
+        counter("drops_total", "Connections that ended while playing.", "drops")
+        counter("reconnects_total", "Successful automatic reconnects.", "reconnects")
+        histogram("time_to_first_audio_seconds", "Time from play() to first audio.", "time_to_first_audio")
+        histogram("rebuffer_duration_seconds", "Duration of playback stalls.", "rebuffer_duration")
+        histogram("network_bitrate_kbps", "Sampled network download rate.", "network_kbps")
+        histogram("reconnect_latency_seconds", "Time from a drop until audio resumed.", "reconnect_latency")
+
+        lines.append("# HELP cyberradio_codec_info Audio codec last seen for the station.")
+        lines.append("# TYPE cyberradio_codec_info gauge")
+        for s in self.stations.values():
+            if s.codec:
+                lines.append(f'cyberradio_codec_info{{{self._labels(s)},codec="{_escape(s.codec)}"}} 1')
+
+        return "\n".join(lines) + "\n"
+
+    def _labels(self, station):
+        return f'station="{_escape(station.name)}",url="{_escape(station.url)}"'
@@ -0,0 +1,266 @@
+import os
+import json
+import time
+import queue
+import socket
+import logging
+import itertools
+import threading
+import subprocess
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for mpv to create its IPC socket / answer a command
+CONNECT_TIMEOUT = 5
+COMMAND_TIMEOUT = 5
+# Give up restarting after this many crashes in a row within a minute
+MAX_RESTARTS = 3
+
+_counter = itertools.count()
+
+
+class MpvIpcError(RuntimeError):
+    pass
+
+
+def _option_args(options):
+    args = []
+    for key, value in options.items():
+        if isinstance(value, bool):
+            value = "yes" if value else "no"
+        args.append(f"--{key.replace('_', '-')}={value}")
+    return args
+
+
+class MpvProcess:
+    """
+    Drop-in subset of python-mpv's MPV class that runs mpv as a child process
+    and talks to it over --input-ipc-server JSON IPC. Only observed
+    properties, requested log levels and command replies cross the socket,
+    and a crash of mpv is logged and answered with a restart instead of
+    taking the UI down with it.
+    """
+    def __init__(self, log_handler=None, **options):
+        self._log_handler = log_handler
+        self._options = options
+        self._socket_path = os.path.join(
+            os.getenv("XDG_RUNTIME_DIR") or "/tmp",
+            f"cyberradio-mpv-{os.getpid()}-{next(_counter)}.sock"
+        )
+        self._lock = threading.Lock()
+        self._pending = {}  # request_id -> [Event, response]
+        self._request_ids = itertools.count(1)
+        self._observers = {}  # observe id -> (name, handler)
+        self._settings = {}  # properties to restore after a restart
+        self._log_level = None
+        self._terminated = False
+        self._crashes = []
+        self._events = queue.Queue()
+        self._sock = None
+        self._proc = None
+
+        threading.Thread(target=self._event_loop, daemon=True).start()
+        self._spawn()
+
+    # --- Process ---
+    @property
+    def pid(self):
+        return self._proc.pid if self._proc else None
+
+    def _spawn(self):
+        if os.path.exists(self._socket_path):
+            os.remove(self._socket_path)
+        cmd = ["mpv", "--idle=yes", "--no-config", "--no-terminal",
+               f"--input-ipc-server={self._socket_path}"] + _option_args(self._options)
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL,
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        deadline = time.monotonic() + CONNECT_TIMEOUT
+        while True:
+            if self._proc.poll() is not None:
+                raise MpvIpcError(f"mpv exited with code {self._proc.returncode}")
+            try:
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                sock.connect(self._socket_path)
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                sock.close()
+                if time.monotonic() > deadline:
+                    self._proc.kill()
+                    raise MpvIpcError("Timed out waiting for mpv IPC socket")
+                time.sleep(0.05)
+
+        self._sock = sock
+        threading.Thread(target=self._read_loop, args=(sock, self._proc), daemon=True).start()
+
+    def _read_loop(self, sock, proc):
+        try:
+            for line in sock.makefile('rb'):
+                try:
+                    msg = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if 'request_id' in msg:
+                    with self._lock:
+                        waiter = self._pending.pop(msg['request_id'], None)
+                    if waiter:
+                        waiter[1] = msg
+                        waiter[0].set()
+                elif 'event' in msg:
+                    self._events.put(msg)
+        except OSError:
+            pass
+
+        # Wake anyone still waiting for a reply from this process
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for waiter in pending.values():
+            waiter[0].set()
+
+        if self._terminated or proc is not self._proc:
+            return
+        code = proc.wait()
+        logger.error(f"mpv (pid {proc.pid}) exited unexpectedly with code {code}")
+        self._restart()
+
+    def _restart(self):
+        now = time.monotonic()
+        self._crashes = [t for t in self._crashes if now - t < 60] + [now]
+        if len(self._crashes) > MAX_RESTARTS:
+            logger.critical("mpv keeps crashing; not restarting it again")
+            return
+        try:
+            self._spawn()
+        except Exception as e:
+            logger.critical(f"Failed to restart mpv: {e}")
+            return
+
+        logger.info("mpv restarted")
+        if self._log_level:
+            self._send_async("request_log_messages", self._log_level)
+        for name, value in self._settings.items():
+            self._send_async(*self._set_args(name, value))
+        # Re-observing reports idle-active=yes, which lets the player reconnect
+        for observe_id, (name, _handler) in self._observers.items():
+            self._send_async("observe_property", observe_id, name)
+
+    # --- Events ---
+    def _event_loop(self):
+        # Handlers run here, never on the reader thread, so they may issue
+        # commands of their own without deadlocking.
+        while True:
+            msg = self._events.get()
+            if msg is None:
+                return
+            try:
+                event = msg['event']
+                if event == 'property-change':
+                    observer = self._observers.get(msg.get('id'))
+                    if observer:
+                        observer[1](observer[0], msg.get('data'))
+                elif event == 'log-message' and self._log_handler:
+                    self._log_handler(msg.get('level'), msg.get('prefix'), msg.get('text', '').rstrip('\n'))
+            except Exception as e:
+                logger.error(f"mpv event handler failed: {e}")
+
+    # --- Commands ---
+    def _write(self, payload):
+        data = (json.dumps(payload) + "\n").encode()
+        with self._lock:
+            sock = self._sock
+        try:
+            sock.sendall(data)
+            return True
+        except (OSError, AttributeError) as e:
+            logger.warning(f"mpv IPC write failed: {e}")
+            return False
+
+    def _send_async(self, *args):
+        self._write({'command': list(args)})
+
+    def command(self, *args):
+        """Runs an mpv command and returns its data. None if mpv is unreachable."""
+        request_id = next(self._request_ids)
+        waiter = [threading.Event(), None]
+        with self._lock:
+            self._pending[request_id] = waiter
+        if not self._write({'command': list(args), 'request_id': request_id}):
+            with self._lock:
+                self._pending.pop(request_id, None)
+            return None
+        if not waiter[0].wait(COMMAND_TIMEOUT):
+            with self._lock:
+                self._pending.pop(request_id, None)
+            logger.warning(f"mpv did not answer {args[0]}")
+            return None
+        response = waiter[1]
+        if response is None:
+            return None
+        if response.get('error') != 'success':
+            raise MpvIpcError(f"{args[0]} {args[1:]}: {response.get('error')}")
+        return response.get('data')
+
+    def _set_args(self, name, value):
+        # Strings go through mpv's option parser ("4MiB", "yes"), like libmpv's string API
+        if isinstance(value, str):
+            return ("set", name, value)
+        return ("set_property", name, value)
+
+    def __getitem__(self, name):
+        try:
+            return self.command("get_property", name)
+        except MpvIpcError:
+            # python-mpv also yields None for unavailable properties
+            return None
+
+    def __setitem__(self, name, value):
+        if name != 'pause':
+            self._settings[name] = value
+        self.command(*self._set_args(name, value))
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self[name.replace('_', '-')]
+
+    def __setattr__(self, name, value):
+        if name.startswith('_'):
+            object.__setattr__(self, name, value)
+        else:
+            self[name.replace('_', '-')] = value
+
+    def observe_property(self, name, handler):
+        observe_id = len(self._observers) + 1
+        self._observers[observe_id] = (name, handler)
+        self.command("observe_property", observe_id, name)
+
+    def set_loglevel(self, level):
+        self._log_level = level
+        self.command("request_log_messages", level)
+
+    def play(self, url):
+        self.command("loadfile", url, "replace")
+
+    def stop(self):
+        self.command("stop")
+
+    def cycle(self, name, direction='up'):
+        self.command("cycle", name, direction)
+
+    def seek(self, amount, reference='relative'):
+        self.command("seek", amount, reference)
+
+    def terminate(self):
+        self._terminated = True
+        self._send_async("quit")
+        try:
+            self._proc.wait(2)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+        with self._lock:
+            if self._sock:
+                self._sock.close()
+                self._sock = None
+        self._events.put(None)
+        if os.path.exists(self._socket_path):
+            os.remove(self._socket_path)
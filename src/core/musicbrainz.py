@@ -1,15 +1,30 @@
-import musicbrainzngs
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Set a user-agent for MusicBrainz API requests
-musicbrainzngs.set_useragent("CyberRadio", "1.0", "https://github.com/Zelixo/CyberRadio")
+_client = None
+
+def _musicbrainz():
+    # Imported on first lookup; musicbrainzngs is slow to import and only
+    # needed after a song has been identified
+    global _client
+    if _client is None:
+        import musicbrainzngs
+        # Set a user-agent for MusicBrainz API requests
+        musicbrainzngs.set_useragent("CyberRadio", "1.0", "https://github.com/Zelixo/CyberRadio")
+        _client = musicbrainzngs
+    return _client
 
 def get_musicbrainz_url(artist, title):
     """
     Searches for a recording on MusicBrainz and returns its URL if found.
     """
+    try:
+        musicbrainzngs = _musicbrainz()
+    except ImportError as e:
+        logger.error(f"MusicBrainz lookups unavailable: {e}")
+        return None
+
     try:
         # Search for recordings that match the artist and title
         result = musicbrainzngs.search_recordings(artist=artist, recording=title, limit=1)
@@ -1,37 +1,155 @@
-import sys
+import os
+import time
 import logging
-import mpv
-from gi.repository import GLib
+
+from src.config import STANDBY_SLOTS, STANDBY_CACHE_MB, STANDBY_MAX_AGE, BUFFER_PROFILE, TIMESHIFT_MB, TIMESHIFT_FILE, RECORDINGS_DIR, MPV_BACKEND, AUTO_BITRATE, MAX_BITRATE
+from src.core.bitrate import BitrateSelector
+from src.core.buffering import BufferController
+from src.core.metrics import PlaybackMetrics
+from src.core.reconnect import Reconnector
+from src.core.resolver import StreamResolver
+from src.core.timeshift import TimeshiftBuffer
+from src.core.recorder import StreamRecorder
 
 logger = logging.getLogger(__name__)
 
+# Standby streams older than half STANDBY_MAX_AGE are reconnected on this
+# interval, so none has expired by the time the user switches to it
+STANDBY_REFRESH_SECONDS = max(1, STANDBY_MAX_AGE // 4)
+
 class AudioPlayer:
     """Handles MPV logic independently."""
-    def __init__(self, on_metadata_change, on_discontinuity=None):
+    def __init__(self, on_metadata_change, on_discontinuity=None, dispatch=None):
+        self.on_metadata_change = on_metadata_change
+        self.on_discontinuity = on_discontinuity
+        # Callbacks fire on mpv's event thread; dispatch hands them to the
+        # caller's loop. GLib is only imported when no other loop is given.
+        if dispatch is None:
+            from gi.repository import GLib
+            dispatch = GLib.idle_add
+        self.dispatch = dispatch
+        self._volume = 100
+        self.current_url = None
+        self.current_stream = None
+        # Mirrors mpv's pause property, so reading it never waits on mpv
+        self._paused = False
+        # Called (through dispatch) with the new value when pause changes
+        self.pause_listeners = []
+        self.buffer = BufferController(BUFFER_PROFILE)
+        self.bitrate = BitrateSelector(self._switch_mount, MAX_BITRATE) if AUTO_BITRATE else None
+        self.metrics = PlaybackMetrics()
+        self.reconnector = Reconnector(self._reconnect)
+        self.resolver = StreamResolver()
+        self.timeshift = None
+        if TIMESHIFT_MB > 0:
+            self.timeshift = TimeshiftBuffer(TIMESHIFT_FILE, TIMESHIFT_MB * 1024 * 1024,
+                                             on_title=lambda title: self._handle_metadata('icy-title', title))
+        self._via_timeshift = False
+        self.recorder = None
+
         try:
-            self.mpv = mpv.MPV(
-                video=False,
-                ytdl=True,
-                log_handler=self._mpv_log,
-                cache='yes'
-            )
+            self.mpv = self._create_mpv()
         except Exception as e:
             logger.critical(f"Failed to initialize MPV: {e}")
             raise e
+        self.buffer.attach(self.mpv)
 
-        self.mpv.set_loglevel('info')
-        self.on_metadata_change = on_metadata_change
-        self.on_discontinuity = on_discontinuity
+        self.standby = StandbyPool(self, STANDBY_SLOTS) if STANDBY_SLOTS > 0 else None
+
+    def _create_mpv(self, **options):
+        if MPV_BACKEND == "ipc":
+            from src.core.mpv_ipc import MpvProcess as factory
+        else:
+            import mpv
+            factory = mpv.MPV
+
+        # The log handler may fire before the constructor returns
+        created = []
+        instance = factory(
+            video=False,
+            ytdl=True,
+            log_handler=lambda level, prefix, text: self._mpv_log(created[0] if created else None, level, prefix, text),
+            cache='yes',
+            **options
+        )
+        created.append(instance)
+        # Out of process only warnings cross over; that still includes the
+        # discontinuity notice, without streaming every info line to Python
+        instance.set_loglevel('warn' if MPV_BACKEND == "ipc" else 'info')
+
+        # Every instance is observed, but only the active one reaches the UI
+        def handle_metadata(_name, value):
+            # Through the timeshift proxy mpv only sees a local URL; titles
+            # come from the ring's ICY index instead
+            if instance is self.mpv and not self._via_timeshift:
+                self._handle_metadata(_name, value)
+
+        def handle_cache_pause(_name, value):
+            if instance is self.mpv:
+                self.buffer.on_paused_for_cache(value)
+                self.metrics.on_paused_for_cache(value)
+                if self.bitrate:
+                    self.bitrate.on_paused_for_cache(value)
+
+        def handle_cache_state(_name, value):
+            if instance is self.mpv:
+                self.buffer.on_cache_state(value)
+
+        def handle_playback_time(_name, value):
+            if instance is self.mpv:
+                self.metrics.on_playback_time(value)
+                if value is not None:
+                    latency = self.reconnector.on_recovered()
+                    if latency is not None:
+                        self.metrics.on_reconnected(latency)
+
+        def handle_cache_speed(_name, value):
+            if instance is self.mpv:
+                self.metrics.on_cache_speed(value)
+                if self.bitrate:
+                    self.bitrate.on_cache_speed(value)
+
+        def handle_codec(_name, value):
+            if instance is self.mpv:
+                self.metrics.on_codec(value)
+
+        def handle_pause(_name, value):
+            if instance is self.mpv and bool(value) != self._paused:
+                self._paused = bool(value)
+                for listener in self.pause_listeners:
+                    self.dispatch(listener, self._paused)
 
-        self.mpv.observe_property('media-title', self._handle_metadata)
-        self.mpv.observe_property('icy-title', self._handle_metadata)
+        def handle_idle(_name, value):
+            # Going idle while we still expect audio means the stream ended
+            if instance is self.mpv and value and self.current_url:
+                self.metrics.on_dropped()
+                # The cached target may be stale; re-resolve on the next tune-in
+                self.resolver.invalidate(self.current_url)
+                self.reconnector.on_dropped()
+
+        instance.observe_property('media-title', handle_metadata)
+        instance.observe_property('icy-title', handle_metadata)
+        instance.observe_property('paused-for-cache', handle_cache_pause)
+        if self.buffer.adaptive:
+            # Reported on every cache change; only the adaptive mode needs it
+            instance.observe_property('demuxer-cache-state', handle_cache_state)
+        instance.observe_property('playback-time', handle_playback_time)
+        instance.observe_property('cache-speed', handle_cache_speed)
+        instance.observe_property('audio-codec-name', handle_codec)
+        instance.observe_property('idle-active', handle_idle)
+        instance.observe_property('pause', handle_pause)
+        return instance
+
+    def _mpv_log(self, instance, level, prefix, text):
+        if instance is not getattr(self, 'mpv', None):
+            logger.debug(f"[MPV standby] {prefix}: {text}")
+            return
 
-    def _mpv_log(self, level, prefix, text):
         if "Linearizing discontinuity" in text:
             if self.on_discontinuity:
-                GLib.idle_add(self.on_discontinuity)
+                self.dispatch(self.on_discontinuity)
             return
-        
+
         # Map MPV levels to Python logging levels
         if level == 'fatal':
             logger.critical(f"[MPV] {prefix}: {text}")
@@ -44,28 +162,319 @@ class AudioPlayer:
         else:
             logger.debug(f"[MPV] {prefix}: {text}")
 
-    def play(self, url):
+    def play(self, url, name=None, alternates=None, stream=None):
+        """
+        Plays url. `alternates` are other URLs/mounts of the same station that
+        are tried if the stream drops and cannot be reconnected. `stream` is a
+        stream url resolved to earlier, used if the resolver has none cached.
+        """
+        if self.recorder and url != self.current_url:
+            self.stop_recording()
+        warm = self.standby.take(url) if self.standby else None
+        # A warm standby is connected to the station URL itself
+        start = self.bitrate.reset(url, remembered=warm is None) if self.bitrate else url
+
+        entry = self.resolver.cached(start)
+        target = self._target_for(start, stream if start == url else None)
+        self.current_stream = target
+        sources = [target, start, url] + (entry['alternates'] if entry else []) + (alternates or [])
+        self.reconnector.reset(sources)
+
+        self.metrics.on_play(url, name, warm=warm is not None)
+        if warm:
+            self._promote(warm, url)
+            return
+
         try:
-            logger.info(f"Playing URL: {url}")
-            self.mpv.play(url)
+            logger.info(f"Playing URL: {target}")
+            self.current_url = url
+            self.buffer.attach(self.mpv)
+            self.mpv.play(self._source_for(target))
             self.mpv.pause = False
         except Exception as e:
             logger.error(f"MPV Play failed: {e}")
 
+    def _promote(self, warm, url):
+        """Swaps a pre-buffered standby instance in as the active player."""
+        logger.info(f"Playing URL from warm standby: {url}")
+        previous = self.mpv
+        self.mpv = warm
+        self.current_url = url
+        # The warm instance is already connected upstream; no timeshift for it
+        if self.timeshift:
+            self.timeshift.stop()
+        self._via_timeshift = False
+        try:
+            self.buffer.attach(warm)
+            warm.volume = self._volume
+            warm.mute = False
+            warm.pause = False
+            self._paused = False
+            # The observers ignored this instance while it was warming up
+            self._handle_metadata('media-title', warm.media_title)
+        except Exception as e:
+            logger.error(f"Failed to activate standby stream: {e}")
+
+        self.standby.release(previous)
+
+    def _target_for(self, url, fallback=None):
+        """
+        Returns the pre-resolved stream behind url (skipping playlist and
+        redirect round trips), or fallback/url itself while resolution runs
+        in the background.
+        """
+        entry = self.resolver.cached(url)
+        if entry:
+            return entry['url']
+        self.resolver.prefetch(url)
+        return fallback or url
+
+    def _source_for(self, target):
+        """
+        Routes target through the timeshift ring when enabled and target is
+        resolved to a plain audio stream. Unresolved URLs, playlists and HLS
+        go to mpv directly; the ring would record playlist text as audio.
+        """
+        use_ring = self.timeshift is not None and self.resolver.is_direct(target)
+        self._via_timeshift = use_ring
+        return self.timeshift.start(target) if use_ring else target
+
+    def rewind(self, seconds):
+        """Jumps back in the timeshift window. Returns False if unavailable."""
+        if not self._via_timeshift:
+            return False
+        buffered = 0
+        try:
+            buffered = self.mpv.demuxer_cache_duration or 0
+        except Exception:
+            pass
+        self.mpv.play(self.timeshift.url_at(self.timeshift.rewind_offset(seconds, buffered)))
+        self.mpv.pause = False
+        return True
+
+    def go_live(self):
+        """Catches up to the live edge without reconnecting upstream."""
+        if not self._via_timeshift:
+            return False
+        self.mpv.play(self.timeshift.url_at(self.timeshift.live_offset()))
+        self.mpv.pause = False
+        return True
+
+    def start_recording(self, name, title=None):
+        """
+        Saves the current stream to RECORDINGS_DIR without re-encoding. Taps
+        the timeshift ring when it is active, otherwise opens its own
+        connection. Returns the recorder, or None if nothing can be recorded.
+        """
+        if not self.current_url or "youtube.com" in self.current_url or "youtu.be" in self.current_url:
+            return None
+        self.stop_recording()
+        if self._via_timeshift:
+            # The ring's titles line up with the live bytes the recorder gets;
+            # what is playing may be time-shifted behind them
+            live_title = self.timeshift.title_at(self.timeshift.written)
+            recorder = StreamRecorder(RECORDINGS_DIR, name or self.current_url, live_title or title)
+            recorder.start()
+            self.timeshift.listeners.append(recorder.feed)
+            self.timeshift.title_listeners.append(recorder.on_stream_title)
+        else:
+            recorder = StreamRecorder(RECORDINGS_DIR, name or self.current_url, title)
+            recorder.start(url=self._target_for(self.current_url))
+        self.recorder = recorder
+        return recorder
+
+    def stop_recording(self):
+        if not self.recorder:
+            return
+        if self.timeshift and self.recorder.feed in self.timeshift.listeners:
+            self.timeshift.listeners.remove(self.recorder.feed)
+            self.timeshift.title_listeners.remove(self.recorder.on_stream_title)
+        self.recorder.stop()
+        self.recorder = None
+
+    def set_track_title(self, title):
+        """
+        Starts a new recorded file when the (cleaned) track title changes,
+        for streams without titles of their own. Not used while recording
+        from the timeshift ring, whose playback may lag the recorded bytes.
+        """
+        if self.recorder and not self._via_timeshift:
+            self.recorder.on_title(title)
+
+    def set_mounts(self, url, mounts):
+        """
+        Registers the mounts of station url ([{'url', 'bitrate', 'format'}])
+        for failover and bandwidth-based selection.
+        """
+        if url != self.current_url:
+            return
+        self.reconnector.add_alternates([m['url'] for m in mounts])
+        if self.bitrate:
+            self.bitrate.set_mounts(url, mounts)
+
+    def _switch_mount(self, mount_url):
+        """Moves the current station to another mount. Returns False if it can't right now."""
+        # Recordings keep the format they started with, and a paused
+        # stream must not resume by itself
+        if not self.current_url or self.recorder or self.get_is_paused():
+            return False
+        try:
+            self.reconnector.prefer(mount_url)
+            self.buffer.attach(self.mpv)
+            self.mpv.play(self._source_for(self._target_for(mount_url)))
+            self.mpv.pause = False
+            return True
+        except Exception as e:
+            logger.error(f"Mount switch failed: {e}")
+            return False
+
+    def _reconnect(self, url):
+        # Runs on the reconnector's timer thread
+        if not self.current_url:
+            return
+        try:
+            logger.info(f"Reconnecting: {url}")
+            if self.timeshift and self.timeshift.failed:
+                # The ring couldn't read this upstream; let mpv connect itself
+                self.timeshift.stop()
+                self._via_timeshift = False
+                self.mpv.play(url)
+            else:
+                self.mpv.play(self._source_for(url))
+        except Exception as e:
+            logger.error(f"Reconnect failed: {e}")
+            self.reconnector.on_dropped()
+
+    def prewarm(self, urls):
+        """Keeps the given stream URLs (most likely next first) pre-buffered."""
+        if self.standby:
+            self.standby.warm([u for u in urls if u and u != self.current_url])
+
+    def refresh_standby(self):
+        """Reconnects aging standby streams; call every STANDBY_REFRESH_SECONDS while playing."""
+        if self.standby and self.current_url:
+            self.standby.refresh()
+
     def pause(self):
         logger.debug("Toggling pause")
         self.mpv.cycle('pause')
 
     def stop(self):
         logger.info("Stopping playback")
+        self.current_url = None
+        self.stop_recording()
+        self.reconnector.cancel()
+        self.metrics.on_stop()
+        if self.timeshift:
+            self.timeshift.stop()
+        self._via_timeshift = False
         self.mpv.stop()
 
     def set_volume(self, volume):
+        self._volume = volume
         self.mpv.volume = volume
 
+    def audio_pid(self):
+        """Process whose audio stream is playing (mpv's child process with the ipc backend)."""
+        return getattr(self.mpv, 'pid', None) or os.getpid()
+
     def get_is_paused(self):
-        return self.mpv.pause if hasattr(self.mpv, 'pause') else False
+        return self._paused
 
     def _handle_metadata(self, _name, value):
         if value:
-            GLib.idle_add(self.on_metadata_change, value)
+            self.dispatch(self.on_metadata_change, value)
+
+
+class StandbyPool:
+    """
+    Pre-connected, pre-buffered mpv instances for the stations the user is
+    likely to pick next. Warm streams are loaded paused and muted with a
+    small demuxer cache, so each one costs at most STANDBY_CACHE_MB of memory
+    and stops downloading once that cache is full.
+    """
+    def __init__(self, player, slots):
+        self.player = player
+        self.slots = slots
+        self.warm_streams = {}  # url -> (mpv instance, warmed_at)
+        self.spares = []
+
+    def _acquire(self):
+        if self.spares:
+            return self.spares.pop()
+        return self.player._create_mpv(demuxer_max_bytes=f"{STANDBY_CACHE_MB}MiB")
+
+    def _load(self, instance, url):
+        instance['demuxer-max-bytes'] = f"{STANDBY_CACHE_MB}MiB"
+        instance.mute = True
+        instance.pause = True
+        instance.play(self.player._target_for(url))
+        self.warm_streams[url] = (instance, time.monotonic())
+
+    def warm(self, urls):
+        wanted = urls[:self.slots]
+
+        for url in list(self.warm_streams):
+            if url not in wanted:
+                instance, _ = self.warm_streams.pop(url)
+                self.release(instance)
+
+        self.refresh(STANDBY_MAX_AGE)
+        for url in wanted:
+            if url in self.warm_streams:
+                continue
+            try:
+                logger.debug(f"Warming standby stream: {url}")
+                self._load(self._acquire(), url)
+            except Exception as e:
+                logger.warning(f"Failed to warm {url}: {e}")
+
+    def refresh(self, max_age=STANDBY_MAX_AGE / 2):
+        """
+        Reconnects warm streams older than max_age. A long-paused live
+        stream drifts behind and the server may drop it; refreshing well
+        before STANDBY_MAX_AGE keeps them usable however long one station plays.
+        """
+        now = time.monotonic()
+        for url, (instance, warmed_at) in list(self.warm_streams.items()):
+            if now - warmed_at > max_age:
+                try:
+                    logger.debug(f"Refreshing standby stream: {url}")
+                    self._load(instance, url)
+                except Exception as e:
+                    logger.warning(f"Failed to refresh standby stream {url}: {e}")
+
+    def take(self, url):
+        """Returns the warm instance for url (removing it from the pool), or None."""
+        entry = self.warm_streams.pop(url, None)
+        if not entry:
+            return None
+        instance, warmed_at = entry
+        if time.monotonic() - warmed_at > STANDBY_MAX_AGE:
+            self.release(instance)
+            return None
+        self._skip_to_live(instance)
+        return instance
+
+    def _skip_to_live(self, instance):
+        # Jump close to the newest buffered audio instead of replaying
+        # everything that arrived while the stream sat paused.
+        try:
+            state = instance.demuxer_cache_state or {}
+            ranges = state.get('seekable-ranges') or []
+            if ranges:
+                end = ranges[-1]['end']
+                instance.seek(max(ranges[-1]['start'], end - 2), reference='absolute')
+        except Exception as e:
+            logger.debug(f"Could not skip standby stream to live: {e}")
+
+    def release(self, instance):
+        try:
+            instance.mute = True
+            instance.stop()
+        except Exception as e:
+            logger.debug(f"Failed to stop standby instance: {e}")
+        if len(self.spares) < self.slots:
+            self.spares.append(instance)
+        else:
+            instance.terminate()
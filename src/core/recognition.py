@@ -5,19 +5,32 @@ import subprocess
 import json
 import shutil
 
+try:
+    from src.core.fingerprint import FingerprintIndex
+except ImportError:
+    # numpy is optional; without it only remote identification is available
+    FingerprintIndex = None
+
 logger = logging.getLogger(__name__)
 
 class SongRecognizer:
     def __init__(self):
         self.has_songrec = shutil.which("songrec") is not None
         if not self.has_songrec:
-            logger.warning("'songrec' not found. Identification will be disabled.")
+            logger.warning("'songrec' not found. Remote identification will be disabled.")
+
+        self.local_index = None
+        if FingerprintIndex is not None:
+            index = FingerprintIndex()
+            if len(index):
+                self.local_index = index
 
     def identify(self, stream_url, duration=10):
         """
-        Captures a snippet and identifies it using 'songrec'.
+        Captures a snippet and identifies it, trying the local fingerprint
+        index first and 'songrec' second.
         """
-        if not self.has_songrec:
+        if not self.has_songrec and not self.local_index:
             logger.error("Cannot identify: 'songrec' is not installed.")
             return {"error": "Install 'songrec' package"}
 
@@ -59,38 +72,8 @@ class SongRecognizer:
             ]
             
             subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
-            logger.info("FFmpeg capture complete. Running songrec...")
-
-            # 4. Call songrec
-            # Command: songrec audio-file-to-recognized-song <file>
-            res = subprocess.run(
-                ["songrec", "audio-file-to-recognized-song", temp_file],
-                capture_output=True,
-                text=True
-            )
-
-            if res.returncode != 0:
-                logger.error(f"songrec failed: {res.stderr}")
-                return None
-
-            # Output is JSON
-            try:
-                result = json.loads(res.stdout)
-            except json.JSONDecodeError:
-                logger.error(f"Failed to parse songrec output: {res.stdout}")
-                return None
-
-            # 4. Parse Result
-            track = result.get('track', {})
-            if not track:
-                return None
-
-            return {
-                'title': track.get('title'),
-                'artist': track.get('subtitle'),
-                'art_url': track.get('images', {}).get('coverart'),
-                'shazam_url': track.get('url')
-            }
+            logger.info("FFmpeg capture complete.")
+            return self.identify_file(temp_file)
 
         except subprocess.CalledProcessError as e:
             logger.error(f"FFmpeg capture failed: {e.stderr.decode()}")
@@ -103,4 +86,52 @@ class SongRecognizer:
                 try:
                     os.remove(temp_file)
                 except Exception as e:
-                    pass
\ No newline at end of file
+                    pass
+
+    def identify_file(self, path):
+        """
+        Identifies an audio file. The local fingerprint index is consulted
+        before falling back to 'songrec' (Shazam).
+        """
+        if self.local_index:
+            match = self.local_index.match_file(path)
+            if match:
+                logger.info(f"Local match: {match['artist']} - {match['title']} (score {match['score']})")
+                return {
+                    'title': match.get('title'),
+                    'artist': match.get('artist'),
+                    'art_url': None,
+                    'shazam_url': None
+                }
+
+        if not self.has_songrec:
+            return None
+
+        # Command: songrec audio-file-to-recognized-song <file>
+        res = subprocess.run(
+            ["songrec", "audio-file-to-recognized-song", path],
+            capture_output=True,
+            text=True
+        )
+
+        if res.returncode != 0:
+            logger.error(f"songrec failed: {res.stderr}")
+            return None
+
+        # Output is JSON
+        try:
+            result = json.loads(res.stdout)
+        except json.JSONDecodeError:
+            logger.error(f"Failed to parse songrec output: {res.stdout}")
+            return None
+
+        track = result.get('track', {})
+        if not track:
+            return None
+
+        return {
+            'title': track.get('title'),
+            'artist': track.get('subtitle'),
+            'art_url': track.get('images', {}).get('coverart'),
+            'shazam_url': track.get('url')
+        }
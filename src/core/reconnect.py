@@ -0,0 +1,100 @@
+import time
+import random
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Exponential backoff: BASE_DELAY, 2x, 4x ... capped at MAX_DELAY, with jitter
+BASE_DELAY = 0.5
+MAX_DELAY = 30.0
+
+
+class Reconnector:
+    """
+    Schedules reconnects of a dropped live stream. Every attempt waits
+    longer (exponential backoff with jitter so many players don't hammer a
+    recovering server in lockstep) and rotates through the station's
+    alternate mounts, starting with the one that was playing.
+    """
+    def __init__(self, on_reconnect):
+        self.on_reconnect = on_reconnect
+        self.sources = []
+        self.index = 0
+        self.attempt = 0
+        self.dropped_at = None
+        self._trying = 0
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def reset(self, sources):
+        """Starts over with a new station's sources (primary URL first)."""
+        with self._lock:
+            self._cancel()
+            self.sources = list(dict.fromkeys(s for s in sources if s))
+            self.index = 0
+            self.attempt = 0
+            self.dropped_at = None
+            self._trying = 0
+
+    def add_alternates(self, alternates):
+        """Appends newly discovered mounts of the current station."""
+        with self._lock:
+            if self.sources:
+                self.sources = list(dict.fromkeys(self.sources + [s for s in alternates if s]))
+
+    def prefer(self, source):
+        """Makes source (e.g. a newly selected mount) the first one retried."""
+        with self._lock:
+            if source in self.sources:
+                self.index = self.sources.index(source)
+
+    def cancel(self):
+        with self._lock:
+            self._cancel()
+            self.sources = []
+            self.dropped_at = None
+
+    def _cancel(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+    def on_dropped(self):
+        with self._lock:
+            if not self.sources or self._timer:
+                return
+            if self.dropped_at is None:
+                self.dropped_at = time.monotonic()
+
+            delay = min(MAX_DELAY, BASE_DELAY * 2 ** self.attempt)
+            delay *= random.uniform(0.5, 1.0)
+            index = (self.index + self.attempt) % len(self.sources)
+            url = self.sources[index]
+            self.attempt += 1
+
+            logger.warning(f"Stream dropped, reconnect #{self.attempt} to {url} in {delay:.1f}s")
+            self._timer = threading.Timer(delay, self._fire, args=(index, url))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _fire(self, index, url):
+        with self._lock:
+            if self._timer is None or not self.sources:
+                return
+            self._timer = None
+            self._trying = index
+        self.on_reconnect(url)
+
+    def on_recovered(self):
+        """Call when audio flows again. Returns the reconnect latency in seconds, or None."""
+        with self._lock:
+            if self.dropped_at is None:
+                return None
+            latency = time.monotonic() - self.dropped_at
+            self.dropped_at = None
+            self.attempt = 0
+            # Stay on whichever mount worked
+            self.index = self._trying
+        logger.info(f"Stream recovered after {latency:.1f}s")
+        return latency
@@ -0,0 +1,222 @@
+import os
+import re
+import queue
+import struct
+import logging
+import datetime
+import threading
+import urllib.request
+
+from src.core.timeshift import parse_stream_title, _read_exact
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+# Large buffered writes: the disk sees a few syscalls per second at most
+WRITE_BUFFER = 1024 * 1024
+
+# Formats that can be cut at any byte and tagged with a prepended ID3v2 tag
+SPLITTABLE_TYPES = {
+    'audio/mpeg': '.mp3',
+    'audio/mp3': '.mp3',
+    'audio/aac': '.aac',
+    'audio/aacp': '.aac',
+}
+# Formats whose headers only appear at the stream start; recorded as one
+# file with a .cue sheet marking the track boundaries instead.
+CONTINUOUS_TYPES = {
+    'audio/ogg': '.ogg',
+    'application/ogg': '.ogg',
+    'audio/flac': '.flac',
+    'audio/x-flac': '.flac',
+}
+
+_STOP = object()
+
+
+def _safe_name(text):
+    return re.sub(r'[\\/:*?"<>|\x00-\x1f]', '_', text).strip()[:120] or "Unknown"
+
+
+def _split_title(text):
+    if text and " - " in text:
+        artist, title = text.split(" - ", 1)
+        return artist.strip(), title.strip()
+    return None, text
+
+
+def id3_tag(title, artist=None, album=None):
+    """Builds a minimal ID3v2.3 tag (UTF-16 text frames)."""
+    frames = b''
+    for frame_id, text in (('TIT2', title), ('TPE1', artist), ('TALB', album)):
+        if text:
+            payload = b'\x01' + text.encode('utf-16')
+            frames += frame_id.encode() + struct.pack('>I', len(payload)) + b'\x00\x00' + payload
+    size = len(frames)
+    syncsafe = bytes([(size >> 21) & 0x7f, (size >> 14) & 0x7f, (size >> 7) & 0x7f, size & 0x7f])
+    return b'ID3\x03\x00\x00' + syncsafe + frames
+
+
+class StreamRecorder:
+    """
+    Saves the raw compressed stream to disk without transcoding. MP3/AAC
+    streams are split into one ID3-tagged file per track at each title
+    change; other formats go to a single file plus a .cue sheet. All disk
+    I/O happens on the recorder's own thread; feed() and the title calls
+    only enqueue.
+
+    Titles carried by the recorded stream itself (ICY metadata) arrive in
+    order with its bytes, so tracks are cut where they actually change.
+    Once the stream has supplied one, titles from the player, which may be
+    time-shifted behind the bytes being saved, are ignored.
+    """
+    def __init__(self, directory, station, title=None):
+        self.directory = os.path.join(directory, _safe_name(station))
+        self.station = station
+        self.title = title
+        self._queue = queue.Queue()
+        self._queued_title = title
+        self._in_band = False
+        self._stop = threading.Event()
+        self._writer = None
+        self._file = None
+        self._started = None
+        self._cue = []  # (seconds, title)
+        self._bytes = 0
+        self.path = None
+        self.content_type = None
+
+    def start(self, url=None):
+        """Records from url, or from feed() calls when url is None."""
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+        if url:
+            threading.Thread(target=self._download, args=(url,), daemon=True).start()
+
+    def feed(self, data, content_type=None):
+        if self._stop.is_set():
+            return
+        if content_type and not self.content_type:
+            self.content_type = content_type.split(';')[0].strip().lower()
+        self._queue.put(data)
+
+    def on_title(self, title):
+        """A title from the player; ignored once the stream carries its own."""
+        if not self._in_band:
+            self._put_title(title)
+
+    def on_stream_title(self, title):
+        """A title from the recorded stream, in order with the bytes fed so far."""
+        if title:
+            self._in_band = True
+            self._put_title(title)
+
+    def _put_title(self, title):
+        if title and title != self._queued_title and not self._stop.is_set():
+            self._queued_title = title
+            self._queue.put(('title', title))
+
+    def stop(self):
+        if not self._stop.is_set():
+            self._stop.set()
+            self._queue.put(_STOP)
+
+    def _download(self, url):
+        req = urllib.request.Request(url, headers={
+            'User-Agent': 'Mozilla/5.0 (compatible; CyberRadio/1.0)',
+            'Icy-MetaData': '1'
+        })
+        try:
+            with urllib.request.urlopen(req, timeout=10) as r:
+                content_type = r.headers.get('Content-Type')
+                metaint = int(r.headers.get('icy-metaint') or 0)
+                while not self._stop.is_set():
+                    data = _read_exact(r, metaint) if metaint else r.read(CHUNK_SIZE)
+                    if not data:
+                        break
+                    self.feed(data, content_type)
+                    if metaint:
+                        # ICY: a length byte (x16) of metadata after every metaint audio bytes
+                        length = r.read(1)
+                        if not length:
+                            break
+                        self.on_stream_title(parse_stream_title(_read_exact(r, length[0] * 16)))
+        except Exception as e:
+            logger.error(f"Recording download failed: {e}")
+        self.stop()
+
+    # --- Writer thread ---
+    @property
+    def splittable(self):
+        return self.content_type in SPLITTABLE_TYPES
+
+    def _extension(self):
+        return SPLITTABLE_TYPES.get(self.content_type) or CONTINUOUS_TYPES.get(self.content_type) or ".stream"
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        label = self.title if self.splittable and self.title else self.station
+        self.path = os.path.join(self.directory, f"{stamp} - {_safe_name(label)}{self._extension()}")
+        self._file = open(self.path, "wb", buffering=WRITE_BUFFER)
+        self._bytes = 0
+        if self.splittable:
+            artist, title = _split_title(self.title or self.station)
+            self._file.write(id3_tag(title, artist, self.station))
+        logger.info(f"Recording to {self.path}")
+
+    def _close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+            if self._bytes == 0:
+                # Nothing but a tag; don't leave empty tracks behind
+                os.remove(self.path)
+
+    def _write_loop(self):
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                if isinstance(item, tuple):
+                    self._on_title(item[1])
+                    continue
+                if self._file is None:
+                    self._open()
+                    self._started = datetime.datetime.now()
+                    if self.title:
+                        self._cue.append((0, self.title))
+                self._file.write(item)
+                self._bytes += len(item)
+        except Exception as e:
+            logger.error(f"Recording failed: {e}")
+        finally:
+            self._close()
+            self._write_cue()
+
+    def _on_title(self, title):
+        self.title = title
+        if self._file is None:
+            return
+        if self.splittable:
+            self._close()
+            self._open()
+        else:
+            elapsed = (datetime.datetime.now() - self._started).total_seconds()
+            self._cue.append((elapsed, title))
+
+    def _write_cue(self):
+        if self.splittable or not self._cue or not self.path or not os.path.exists(self.path):
+            return
+        lines = [f'TITLE "{self.station}"', f'FILE "{os.path.basename(self.path)}" WAVE']
+        for n, (seconds, text) in enumerate(self._cue, 1):
+            artist, title = _split_title(text)
+            frames = int(seconds * 75)
+            lines.append(f"  TRACK {n:02d} AUDIO")
+            lines.append(f'    TITLE "{(title or "").replace(chr(34), chr(39))}"')
+            if artist:
+                lines.append(f'    PERFORMER "{artist.replace(chr(34), chr(39))}"')
+            lines.append(f"    INDEX 01 {frames // 4500:02d}:{frames // 75 % 60:02d}:{frames % 75:02d}")
+        with open(os.path.splitext(self.path)[0] + ".cue", "w") as f:
+            f.write("\n".join(lines) + "\n")
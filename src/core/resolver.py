@@ -0,0 +1,170 @@
+import os
+import json
+import time
+import logging
+import threading
+import urllib.request
+import urllib.parse
+
+from src.config import RESOLVE_CACHE_FILE, RESOLVE_TTL
+from src.core.jobs import get_runner
+
+logger = logging.getLogger(__name__)
+
+PLAYLIST_TYPES = ('audio/x-scpls', 'application/pls+xml', 'audio/x-mpegurl', 'audio/mpegurl')
+PLAYLIST_EXTENSIONS = ('.pls', '.m3u')
+# HLS manifests go to mpv as they are; there is no single audio stream to proxy
+HLS_TYPES = ('application/vnd.apple.mpegurl', 'application/x-mpegurl')
+# Playlists are tiny; never read more than this from a response
+MAX_PLAYLIST_BYTES = 64 * 1024
+MAX_DEPTH = 3
+
+
+def _is_youtube(url):
+    return "youtube.com" in url or "youtu.be" in url
+
+
+def _parse_playlist(text, base_url):
+    """Returns the stream URLs listed in a .pls or .m3u body."""
+    urls = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith(('#', '[')):
+            continue
+        if '=' in line and line.lower().startswith('file'):
+            line = line.split('=', 1)[1].strip()
+        elif '=' in line:
+            # Other .pls keys (Title1=, Length1=, NumberOfEntries=, Version=)
+            continue
+        urls.append(urllib.parse.urljoin(base_url, line))
+    return urls
+
+
+def resolve_stream(url, depth=0):
+    """
+    Follows redirects and expands .pls/.m3u playlists until it reaches the
+    actual stream. Returns {'url', 'content_type', 'alternates'}.
+    """
+    req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0 (compatible; CyberRadio/1.0)'})
+    with urllib.request.urlopen(req, timeout=5) as r:
+        final_url = r.geturl()
+        content_type = (r.headers.get('Content-Type') or '').split(';')[0].strip().lower()
+        path = urllib.parse.urlparse(final_url).path.lower()
+        is_playlist = content_type in PLAYLIST_TYPES or path.endswith(PLAYLIST_EXTENSIONS)
+        # Don't read from an audio stream; the headers are all we need
+        body = r.read(MAX_PLAYLIST_BYTES).decode(errors='replace') if is_playlist else ''
+
+    # HLS uses the same MIME types as .m3u but mpv must get the manifest itself
+    if not is_playlist or '#EXT-X-' in body:
+        return {'url': final_url, 'content_type': content_type, 'alternates': []}
+
+    entries = _parse_playlist(body, final_url)
+    if not entries:
+        raise ValueError(f"Empty playlist: {final_url}")
+    if depth >= MAX_DEPTH:
+        return {'url': entries[0], 'content_type': None, 'alternates': entries[1:]}
+
+    result = resolve_stream(entries[0], depth + 1)
+    result['alternates'] = result['alternates'] + [e for e in entries[1:] if e != result['url']]
+    return result
+
+
+class StreamResolver:
+    """
+    Caches playlist/redirect resolution per station URL so mpv can open the
+    final stream directly. Entries expire after RESOLVE_TTL seconds and are
+    dropped as soon as playback of the resolved URL fails.
+    """
+    def __init__(self, path=RESOLVE_CACHE_FILE, ttl=RESOLVE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._cache = {}
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path) as f:
+                    self._cache = json.load(f)
+            except Exception as e:
+                logger.warning(f"Failed to load resolver cache: {e}")
+
+    def _save(self):
+        with self._lock:
+            data = json.dumps(self._cache)
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            logger.warning(f"Failed to save resolver cache: {e}")
+
+    def cached(self, url):
+        """Returns the fresh cache entry for url, or None."""
+        with self._lock:
+            entry = self._cache.get(url)
+        if entry and time.time() - entry['resolved_at'] < self.ttl:
+            return entry
+        return None
+
+    def is_direct(self, url):
+        """
+        True if url is a station URL or resolved target that is known to be
+        a plain audio stream, not a playlist or HLS manifest.
+        """
+        now = time.time()
+        with self._lock:
+            entries = [e for e in self._cache.values() if e['url'] == url and now - e['resolved_at'] < self.ttl]
+        path = urllib.parse.urlparse(url).path.lower()
+        if not entries or path.endswith(PLAYLIST_EXTENSIONS + ('.m3u8',)):
+            return False
+        content_type = entries[0]['content_type']
+        # None: the playlist nesting limit was hit before reaching a stream
+        return content_type is not None and content_type not in PLAYLIST_TYPES + HLS_TYPES
+
+    def resolve(self, url):
+        """Resolves url over the network (blocking) and caches the result."""
+        if _is_youtube(url):
+            return None
+        try:
+            entry = resolve_stream(url)
+        except Exception as e:
+            logger.debug(f"Could not pre-resolve {url}: {e}")
+            return None
+
+        entry['resolved_at'] = time.time()
+        with self._lock:
+            self._cache[url] = entry
+        if entry['url'] != url:
+            logger.info(f"Resolved {url} -> {entry['url']} ({entry['content_type']})")
+        self._save()
+        return entry
+
+    def prefetch(self, url):
+        """Resolves url in the background unless a fresh entry exists."""
+        if not url or _is_youtube(url) or self.cached(url):
+            return
+        with self._lock:
+            if url in self._in_flight:
+                return
+            self._in_flight.add(url)
+
+        def worker():
+            try:
+                self.resolve(url)
+            finally:
+                with self._lock:
+                    self._in_flight.discard(url)
+
+        get_runner().submit(worker, subsystem='resolve')
+
+    def invalidate(self, url):
+        with self._lock:
+            removed = self._cache.pop(url, None)
+        if removed:
+            logger.info(f"Invalidated resolved stream for {url}")
+            self._save()
@@ -0,0 +1,36 @@
+import os
+import json
+import time
+import logging
+
+from src.config import LAST_STATION_FILE
+from src.core.favorites import write_atomic
+
+logger = logging.getLogger(__name__)
+
+
+def save_last_station(station, stream_url=None, path=LAST_STATION_FILE):
+    """Remembers station (and the stream it resolved to) for CYBER_RESUME."""
+    data = json.dumps({'station': station, 'stream_url': stream_url, 'saved_at': time.time()})
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        write_atomic(path, data)
+    except Exception as e:
+        logger.warning(f"Failed to save last station: {e}")
+
+
+def load_last_station(path=LAST_STATION_FILE):
+    """Returns {'station', 'stream_url', 'saved_at'} or None."""
+    try:
+        with open(path) as f:
+            last = json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Failed to load last station: {e}")
+        return None
+    station = last.get('station') if isinstance(last, dict) else None
+    if not station or not (station.get('url_resolved') or station.get('url')):
+        return None
+    return last
+
@@ -0,0 +1,369 @@
+import os
+import re
+import mmap
+import time
+import bisect
+import logging
+import threading
+import urllib.request
+import urllib.parse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from src.core.resolver import PLAYLIST_TYPES, HLS_TYPES
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 16 * 1024
+# Ogg and FLAC decoders can't open a rewound position without the codec
+# headers from the start of the session, so those are kept and re-sent.
+# Longer headers (e.g. embedded cover art) are not kept.
+HEADER_BYTES = 64 * 1024
+# One timestamp index entry per this many seconds of received audio
+INDEX_INTERVAL = 0.5
+# Seconds a local reader waits for new data before sending nothing
+READ_TIMEOUT = 15
+
+
+def parse_stream_title(meta):
+    """The StreamTitle from an ICY metadata block, or None."""
+    match = re.search(rb"StreamTitle='(.*?)';", meta, re.DOTALL)
+    if not match:
+        return None
+    return match.group(1).decode(errors='replace') or None
+
+
+def stream_header(data):
+    """
+    The codec headers at the start of an Ogg or FLAC stream: b'' for
+    codecs that need none, None if `data` ends before the header does.
+    """
+    if data.startswith(b'fLaC'):
+        # Metadata blocks: flags/type byte, 24-bit length; the high bit marks the last
+        pos = 4
+        while len(data) >= pos + 4:
+            last = data[pos] & 0x80
+            pos += 4 + int.from_bytes(data[pos + 1:pos + 4], 'big')
+            if last:
+                return data[:pos] if len(data) >= pos else None
+        return None
+    if data.startswith(b'OggS'):
+        # Header pages carry no audio: their granule position is 0 (or -1
+        # on a page no packet ends on)
+        pos = 0
+        while len(data) >= pos + 27:
+            if data[pos:pos + 4] != b'OggS' or data[pos + 6:pos + 14] not in (b'\0' * 8, b'\xff' * 8):
+                return data[:pos]
+            segments = data[pos + 26]
+            if len(data) < pos + 27 + segments:
+                return None
+            pos += 27 + segments + sum(data[pos + 27:pos + 27 + segments])
+        return None
+    return b'' if len(data) >= 4 else None
+
+
+def _read_exact(resp, n):
+    data = b''
+    while len(data) < n:
+        chunk = resp.read(n - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+class TimeshiftBuffer:
+    """
+    Writes the incoming compressed stream into a fixed-size, memory-mapped
+    ring file indexed by arrival time, and serves it back to mpv over a
+    local HTTP endpoint. Pausing, rewinding and catching up to live only
+    change where mpv reads from the ring; the upstream connection keeps
+    running, and the whole window costs disk space rather than RAM.
+    """
+    def __init__(self, path, size, on_title=None):
+        self.path = path
+        self.size = size
+        self.on_title = on_title
+        self._cond = threading.Condition()
+        self._mm = None
+        self._server = None
+
+        self.session = 0
+        self.written = 0
+        self.served = 0
+        self.header = b''
+        self._head = b''  # start of the session until the header is known
+        self.content_type = 'application/octet-stream'
+        self.ended = True
+        self.failed = False
+        # Called with (data, content_type) for every chunk received upstream
+        self.listeners = []
+        # Called with each new ICY title, in order with the chunks around it
+        self.title_listeners = []
+        self._times = []
+        self._offsets = []
+        self._titles = []  # (offset, title)
+
+    # --- Setup ---
+    def _ensure_open(self):
+        if self._mm is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                os.ftruncate(fd, self.size)
+                self._mm = mmap.mmap(fd, self.size)
+            finally:
+                os.close(fd)
+
+        if self._server is None:
+            buffer = self
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    buffer._serve(self)
+
+                def log_message(self, fmt, *args):
+                    logger.debug(f"[timeshift] {fmt % args}")
+
+            self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+            self._server.daemon_threads = True
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def oldest(self):
+        return max(0, self.written - self.size)
+
+    def url_at(self, offset):
+        """Local URL that streams this session from the given absolute offset."""
+        port = self._server.server_address[1]
+        return f"http://127.0.0.1:{port}/stream?session={self.session}&from={int(offset)}"
+
+    # --- Upstream ---
+    def start(self, url):
+        """Begins recording url into the ring and returns the local URL for live playback."""
+        self._ensure_open()
+        with self._cond:
+            self.session += 1
+            session = self.session
+            self.written = 0
+            self.served = 0
+            self.header = None
+            self._head = b''
+            self.ended = False
+            self.failed = False
+            self._times = []
+            self._offsets = []
+            self._titles = []
+            self._cond.notify_all()
+
+        threading.Thread(target=self._download, args=(url, session), daemon=True).start()
+        return self.url_at(0)
+
+    def stop(self):
+        with self._cond:
+            self.session += 1
+            self.ended = True
+            self._cond.notify_all()
+
+    def _download(self, url, session):
+        req = urllib.request.Request(url, headers={
+            'User-Agent': 'Mozilla/5.0 (compatible; CyberRadio/1.0)',
+            'Icy-MetaData': '1'
+        })
+        try:
+            resp = urllib.request.urlopen(req, timeout=10)
+        except Exception as e:
+            logger.error(f"Timeshift could not connect to {url}: {e}")
+            self._fail(session)
+            return
+
+        content_type = (resp.headers.get('Content-Type') or '').split(';')[0].strip().lower()
+        if content_type in PLAYLIST_TYPES + HLS_TYPES:
+            # Not audio: fail so the player hands the URL to mpv directly
+            logger.warning(f"Timeshift got a playlist from {url} ({content_type})")
+            resp.close()
+            self._fail(session)
+            return
+
+        metaint = int(resp.headers.get('icy-metaint') or 0)
+        self.content_type = resp.headers.get('Content-Type') or 'application/octet-stream'
+        logger.info(f"Timeshift recording {url} ({self.content_type})")
+
+        try:
+            with resp:
+                while session == self.session:
+                    if metaint:
+                        # ICY: metaint audio bytes, then a length byte (x16) of metadata
+                        audio = _read_exact(resp, metaint)
+                        if not audio or not self._append(session, audio):
+                            break
+                        length = resp.read(1)
+                        if not length:
+                            break
+                        title = parse_stream_title(_read_exact(resp, length[0] * 16))
+                        if title:
+                            self._add_title(session, title)
+                    else:
+                        audio = resp.read(CHUNK_SIZE)
+                        if not audio or not self._append(session, audio):
+                            break
+        except Exception as e:
+            logger.warning(f"Timeshift upstream error: {e}")
+
+        with self._cond:
+            if session == self.session:
+                self.ended = True
+                self._cond.notify_all()
+
+    def _fail(self, session):
+        with self._cond:
+            if session == self.session:
+                self.failed = True
+                self.ended = True
+                self._cond.notify_all()
+
+    def _append(self, session, data):
+        with self._cond:
+            if session != self.session:
+                return False
+
+            pos = self.written % self.size
+            first = min(len(data), self.size - pos)
+            self._mm[pos:pos + first] = data[:first]
+            if first < len(data):
+                self._mm[0:len(data) - first] = data[first:]
+
+            if self.header is None:
+                self._head += data[:HEADER_BYTES + 1 - len(self._head)]
+                self.header = stream_header(self._head)
+                if self.header is None and len(self._head) > HEADER_BYTES:
+                    logger.warning("Timeshift stream header too long; rewinding may not decode")
+                    self.header = b''
+                if self.header is not None:
+                    self._head = b''
+            self.written += len(data)
+            for listener in self.listeners:
+                listener(data, self.content_type)
+
+            now = time.monotonic()
+            if not self._times or now - self._times[-1] >= INDEX_INTERVAL:
+                self._times.append(now)
+                self._offsets.append(self.written)
+                # Forget index entries that point at overwritten data
+                stale = bisect.bisect_left(self._offsets, self.oldest)
+                if stale > 256:
+                    del self._times[:stale]
+                    del self._offsets[:stale]
+                    self._titles = [t for t in self._titles if t[0] >= self.oldest] or self._titles[-1:]
+
+            self._cond.notify_all()
+            return True
+
+    def _add_title(self, session, title):
+        with self._cond:
+            if session == self.session and title and (not self._titles or self._titles[-1][1] != title):
+                self._titles.append((self.written, title))
+                for listener in self.title_listeners:
+                    listener(title)
+
+    # --- Time index ---
+    def offset_at(self, timestamp):
+        """Absolute offset of the audio that arrived at the given monotonic time."""
+        with self._cond:
+            if not self._times:
+                return self.oldest
+            i = bisect.bisect_left(self._times, timestamp)
+            i = min(i, len(self._times) - 1)
+            return max(self.oldest, self._offsets[i])
+
+    def time_at(self, offset):
+        with self._cond:
+            if not self._offsets:
+                return time.monotonic()
+            i = min(bisect.bisect_left(self._offsets, offset), len(self._offsets) - 1)
+            return self._times[i]
+
+    def title_at(self, offset):
+        with self._cond:
+            i = bisect.bisect_right([t[0] for t in self._titles], offset) - 1
+            return self._titles[i][1] if i >= 0 else None
+
+    # --- Local server ---
+    def _read(self, session, pos, max_bytes):
+        """Returns (data, new_pos); data is None once the session is over."""
+        with self._cond:
+            while session == self.session and pos >= self.written and not self.ended:
+                if not self._cond.wait(READ_TIMEOUT):
+                    return b'', pos
+            if session != self.session or pos >= self.written:
+                return None, pos
+
+            pos = max(pos, self.oldest)
+            n = min(max_bytes, self.written - pos)
+            start = pos % self.size
+            first = min(n, self.size - start)
+            data = self._mm[start:start + first]
+            if first < n:
+                data += self._mm[0:n - first]
+            return data, pos + n
+
+    def _serve(self, handler):
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(handler.path).query)
+        try:
+            session = int(query.get('session', ['0'])[0])
+            pos = int(query.get('from', ['0'])[0])
+        except ValueError:
+            handler.send_error(400)
+            return
+
+        if session != self.session:
+            handler.send_error(410)
+            return
+        # Wait for the upstream to connect so the content type is known
+        data, _ = self._read(session, 0, 0)
+        if data is None:
+            handler.send_error(502)
+            return
+
+        handler.send_response(200)
+        handler.send_header('Content-Type', self.content_type)
+        handler.send_header('Cache-Control', 'no-cache')
+        handler.end_headers()
+
+        try:
+            header = self.header
+            if header and pos > 0:
+                # The header holds no audio: starting inside it is starting at 0
+                if pos <= len(header):
+                    pos = 0
+                else:
+                    handler.wfile.write(header)
+            announced = None
+            while True:
+                data, pos = self._read(session, pos, CHUNK_SIZE)
+                if data is None:
+                    break
+                if data:
+                    handler.wfile.write(data)
+                    self.served = pos
+                    title = self.title_at(pos)
+                    if title and title != announced and self.on_title:
+                        announced = title
+                        self.on_title(title)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    # --- Playback positions ---
+    def rewind_offset(self, seconds, buffered=0):
+        """
+        Offset `seconds` before what is currently heard. `buffered` is how
+        much already-served audio is still waiting in mpv's cache.
+        """
+        heard = self.time_at(self.served) - buffered
+        return self.offset_at(heard - seconds)
+
+    def live_offset(self, margin=2):
+        return self.offset_at(time.monotonic() - margin)
+
+    def window_seconds(self):
+        with self._cond:
+            return (self._times[-1] - self._times[0]) if self._times else 0
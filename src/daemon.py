@@ -0,0 +1,267 @@
+import os
+import sys
+import json
+import signal
+import asyncio
+import socket
+import logging
+import threading
+import socketserver
+
+from src.config import DEFAULT_STATIONS, CONTROL_SOCKET
+from src.core.favorites import FavoritesStore, station_key
+from src.core.history import SongHistory
+from src.core.jobs import get_runner
+from src.core.player import AudioPlayer
+from src.core.api import fetch_azuracast_nowplaying, find_azuracast_station, get_azuracast_mounts
+from src.core.recognition import SongRecognizer
+from src.core.metadata import clean_metadata_title
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 5
+
+
+class RadioDaemon:
+    """
+    Runs playback, metadata polling and recognition without GTK/Adw.
+    Controlled through JSON lines on a Unix socket (see send_command).
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self.stations = self._load_stations()
+        self.current = None
+        self.track = None
+        self.identified = None
+        self.volume = 50
+
+        # No main loop to hop to: job callbacks run on the job loop, player
+        # callbacks directly on mpv's thread
+        self.jobs = get_runner()
+        self.player = AudioPlayer(self._on_metadata, self._on_discontinuity,
+                                  dispatch=lambda fn, *args: fn(*args))
+        self.player.set_volume(self.volume)
+        self.recognizer = SongRecognizer()
+        self.history = SongHistory()
+
+    def _load_stations(self):
+        return FavoritesStore().stations() or [dict(s) for s in DEFAULT_STATIONS]
+
+    # --- Player callbacks ---
+    def _on_metadata(self, title):
+        with self._lock:
+            if self.current and not self._is_azuracast():
+                track = clean_metadata_title(title)
+                if track != self.track:
+                    self.track = track
+                    self.player.set_track_title(track)
+                    logger.info(f"Now playing: {track}")
+
+    def _on_discontinuity(self):
+        self.jobs.submit(self._poll_azuracast, subsystem='metadata')
+
+    # --- Metadata polling ---
+    def _is_azuracast(self):
+        return self.current and "radio.zelixo.net" in station_key(self.current) and self.current.get('id')
+
+    async def _poll_loop(self):
+        while not self._stop.is_set():
+            await asyncio.sleep(POLL_INTERVAL)
+            await asyncio.get_running_loop().run_in_executor(None, self._poll_azuracast)
+
+    def _poll_azuracast(self):
+        with self._lock:
+            if not self._is_azuracast():
+                return
+            station = self.current
+        entry = find_azuracast_station(fetch_azuracast_nowplaying(), station.get('id'))
+        if not entry:
+            return
+
+        url = station_key(station)
+        self.player.set_mounts(url, get_azuracast_mounts(entry))
+
+        text = entry.get('now_playing', {}).get('song', {}).get('text')
+        with self._lock:
+            if self.current is station and text and text != self.track:
+                self.track = text
+                self.player.set_track_title(text)
+                logger.info(f"Now playing: {text}")
+
+    # --- Commands ---
+    def _find_station(self, key):
+        if isinstance(key, int) or (isinstance(key, str) and key.isdigit()):
+            index = int(key)
+            return self.stations[index] if 0 <= index < len(self.stations) else None
+        for s in self.stations:
+            if key in (s.get('name'), station_key(s)):
+                return s
+        # Allow playing arbitrary URLs that aren't in the library
+        if isinstance(key, str) and "://" in key:
+            return {'name': key, 'url_resolved': key}
+        return None
+
+    def cmd_status(self):
+        with self._lock:
+            return {
+                'station': self.current.get('name') if self.current else None,
+                'url': station_key(self.current) if self.current else None,
+                'track': self.track,
+                'paused': bool(self.current) and self.player.get_is_paused(),
+                'volume': self.volume,
+                'identified': self.identified,
+                'recording': self.player.recorder.directory if self.player.recorder else None,
+            }
+
+    def cmd_list(self):
+        return {'stations': [
+            {'index': i, 'name': s.get('name'), 'url': station_key(s)} for i, s in enumerate(self.stations)
+        ]}
+
+    def cmd_play(self, station=None):
+        target = self._find_station(station) if station is not None else (self.current or (self.stations or [None])[0])
+        if not target:
+            return {'error': f"Unknown station: {station}"}
+        url = station_key(target)
+        with self._lock:
+            self.current = target
+            self.track = None
+        alternates = [u for u in (target.get('url'), target.get('url_resolved')) if u and u != url]
+        self.player.play(url, target.get('name'), alternates)
+        self.jobs.submit(self._poll_azuracast, subsystem='metadata')
+        return self.cmd_status()
+
+    def cmd_pause(self):
+        if self.current:
+            self.player.pause()
+        return self.cmd_status()
+
+    def cmd_stop(self):
+        with self._lock:
+            self.current = None
+            self.track = None
+        self.player.stop()
+        return self.cmd_status()
+
+    def cmd_volume(self, level):
+        self.volume = max(0, min(100, int(level)))
+        self.player.set_volume(self.volume)
+        return self.cmd_status()
+
+    def cmd_rewind(self, seconds=30):
+        if not self.player.rewind(float(seconds)):
+            return {'error': "Timeshift is not active"}
+        return self.cmd_status()
+
+    def cmd_live(self):
+        if not self.player.go_live():
+            return {'error': "Timeshift is not active"}
+        return self.cmd_status()
+
+    def cmd_record(self, state='on'):
+        if state == 'off':
+            self.player.stop_recording()
+        elif not self.current or not self.player.start_recording(self.current.get('name'), self.track):
+            return {'error': "Nothing to record"}
+        return self.cmd_status()
+
+    def cmd_identify(self):
+        station = self.current
+        if not station:
+            return {'error': "Nothing is playing"}
+        result = self.recognizer.identify(station_key(station))
+        if not result:
+            return {'error': "Could not identify song"}
+        if 'error' not in result:
+            with self._lock:
+                self.identified = result
+            self.history.add(result.get('title'), result.get('artist'), station.get('name'),
+                             station_key(station), result.get('art_url'))
+        return result
+
+    def cmd_quit(self):
+        self._stop.set()
+        return {'ok': True}
+
+    def handle(self, request):
+        name = request.get('cmd')
+        handler = getattr(self, f"cmd_{name}", None) if name else None
+        if not handler:
+            return {'error': f"Unknown command: {name}"}
+        try:
+            return handler(*request.get('args', []))
+        except Exception as e:
+            logger.error(f"Command {name} failed: {e}")
+            return {'error': str(e)}
+
+    # --- Server ---
+    def serve(self, path=CONTROL_SOCKET):
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        request = json.loads(line)
+                    except json.JSONDecodeError:
+                        response = {'error': "Invalid JSON"}
+                    else:
+                        response = daemon.handle(request)
+                    self.wfile.write((json.dumps(response) + "\n").encode())
+                    self.wfile.flush()
+
+        if os.path.exists(path):
+            os.remove(path)
+        server = socketserver.ThreadingUnixStreamServer(path, Handler)
+        server.daemon_threads = True
+        os.chmod(path, 0o600)
+
+        def shutdown(*_args):
+            self._stop.set()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.jobs.spawn(self._poll_loop, subsystem='poll')
+        logger.info(f"Cyber Radio daemon listening on {path}")
+
+        try:
+            while not self._stop.wait(1):
+                pass
+        finally:
+            server.shutdown()
+            server.server_close()
+            if os.path.exists(path):
+                os.remove(path)
+            self.player.stop()
+            logger.info("Daemon stopped")
+
+
+def send_command(cmd, *args, path=CONTROL_SOCKET):
+    """Sends one command to a running daemon and returns its JSON response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        sock.sendall((json.dumps({'cmd': cmd, 'args': list(args)}) + "\n").encode())
+        with sock.makefile() as f:
+            return json.loads(f.readline())
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    RadioDaemon().serve()
+
+
+def ctl(argv):
+    """Entry point for `native_radio.py --ctl <command> [args...]`."""
+    if not argv:
+        print("Commands: status, list, play [index|name|url], pause, stop, volume <0-100>, rewind [seconds], live, record [on|off], identify, quit")
+        return 1
+    try:
+        response = send_command(*argv)
+    except OSError as e:
+        print(f"Cannot reach daemon at {CONTROL_SOCKET}: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(response, indent=2))
+    return 1 if 'error' in response else 0
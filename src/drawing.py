@@ -0,0 +1,397 @@
+"""
+Animation and cairo drawing for the visual widgets, without GTK. The
+widgets in src/ui/visuals.py add the frame clock on top; benchmarks/ drives
+these classes directly against offscreen surfaces.
+"""
+import math
+import cairo
+
+S = 3 # Pixel scale of the cat
+
+# Colors
+C_CYAN = (0.0, 0.9, 1.0, 1.0)
+C_CYAN_DIM = (0.0, 0.6, 0.7, 1.0)
+C_PINK = (1.0, 0.0, 1.0, 1.0)
+C_WHITE = (1.0, 1.0, 1.0, 1.0)
+C_DARK = (0.1, 0.1, 0.15, 1.0)
+C_BLACK = (0.05, 0.05, 0.1, 1.0)
+
+# The animation speeds below are tuned per tick of this length
+TICK_SECONDS = 0.03
+# Spectrum bars unless the widget asks for more; the cost barely depends on it
+SPECTRUM_BARS = 28
+
+
+class CatDrawing:
+    """
+    The long cat's animation state and drawing. On its own it draws into
+    any cairo context; VectorCat mixes it into a Gtk.DrawingArea, whose
+    queue_draw/get_scale_factor take precedence over the stand-ins here.
+    """
+    def __init__(self):
+        self._init_state()
+
+    def _init_state(self):
+        # Static parts are pre-rendered once per size (see _build_layers)
+        self._layers = None
+        self._layers_size = None
+
+        self.tick_count = 0
+        self.current_state = "idle"
+
+        # Animation vars
+        self.breathe_scale = 0.0
+        self.head_bob = 0.0
+        self.tail_sway = 0.0
+        self.paw_swing = 0.0
+        self.blink_timer = 0
+        self.is_blinking = False
+        self.wall_pulse = 0.0
+
+    def queue_draw(self):
+        pass
+
+    def get_scale_factor(self):
+        return 1
+
+    def update(self, state, bands=None, steps=1):
+        """
+        Advances the animation by `steps` ticks. `bands` are optional real
+        spectrum levels (0..1, low to high); without them the motion is
+        simulated.
+        """
+        # Treat paused as idle for animation purposes
+        anim_state = "idle" if state == "paused" else state
+        self.current_state = state
+        self.tick_count += steps
+
+        # Wall pulse animation
+        self.wall_pulse = (math.sin(self.tick_count * 0.1) + 1) / 2
+
+        if anim_state == "playing" and bands is not None and len(bands):
+            bass = sum(bands[:4]) / min(4, len(bands))
+            level = sum(bands) / len(bands)
+
+            # Head nods with the kick, the rest sways with overall loudness
+            self.head_bob = -bass * 3.0
+            self.tail_sway = math.sin(self.tick_count * 0.3) * (2 + level * 8)
+            self.paw_swing = math.sin(self.tick_count * 0.25) * level * 4.0
+            self.wall_pulse = bass
+            self.is_blinking = True
+            self.breathe_scale = math.sin(self.tick_count * 0.05) * 1.0
+
+        elif anim_state == "playing":
+            # Fast Bob
+            cycle = (self.tick_count % 8) / 8.0
+            self.head_bob = math.sin(cycle * math.pi * 2) * 1.5
+
+            # Fast Tail
+            self.tail_sway = math.sin(self.tick_count * 0.3) * 6
+
+            # Paws Swing (Alternating)
+            self.paw_swing = math.sin(self.tick_count * 0.25) * 3.0
+
+            # Happy Eyes
+            self.is_blinking = True
+
+            # Normal breathe (relaxed while vibing)
+            self.breathe_scale = math.sin(self.tick_count * 0.05) * 1.0
+
+        else: # Idle (and Paused)
+            # Slow breathe
+            self.breathe_scale = math.sin(self.tick_count * 0.05) * 1.0
+
+            # Slow Tail
+            self.tail_sway = math.sin(self.tick_count * 0.05) * 4
+
+            # Head steady
+            self.head_bob = 0
+
+            # Paws steady
+            self.paw_swing = 0
+
+            # Blink
+            self.blink_timer += steps
+            if self.blink_timer > 200:
+                self.is_blinking = True
+                if self.blink_timer > 205:
+                    self.is_blinking = False
+                    self.blink_timer = 0
+            else:
+                self.is_blinking = False
+
+        self.queue_draw()
+        return True
+
+    def draw_px(self, cr, x, y, w, h, color):
+        """Draws a crisp rectangle."""
+        cr.set_source_rgba(*color)
+        cr.rectangle(x, y, w, h)
+        cr.fill()
+
+    def _invalidate_layers(self, *_args):
+        self._layers = None
+
+    def _geometry(self, w, h):
+        cy = h / 2
+
+        # Wall / Ledge position
+        wall_y = cy + 10 * S
+
+        # --- DYNAMIC BODY CALCULATION ---
+        # Calculate available width minus padding for head(left) and tail(right)
+        # Head takes ~50px, Tail takes ~50px.
+        # We want margin from widget edges.
+        margin = 30
+        max_body_w = max(40 * S, w - (margin * 2) - (50 * S))
+
+        # Center body rect
+        body_x = (w - max_body_w) / 2
+        body_y = wall_y - 12 * S
+
+        # Head pivot
+        head_x = body_x - 5 * S
+        head_y = body_y - 5 * S
+        return wall_y, body_x, body_y, max_body_w, head_x, head_y
+
+    def _render_layer(self, x, y, w, h, draw):
+        """
+        Pre-renders draw(cr) into a surface covering (x, y, w, h). The origin
+        is snapped to whole pixels so painting it back is an exact copy.
+        """
+        ox, oy = math.floor(x), math.floor(y)
+        width, height = max(1, math.ceil(x + w) - ox), max(1, math.ceil(y + h) - oy)
+        # An image surface, not create_similar(): GTK4 draws into a recording
+        # surface, and a similar one would just replay every operation
+        scale = max(1, self.get_scale_factor())
+        surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width * scale, height * scale)
+        surface.set_device_scale(scale, scale)
+        layer_cr = cairo.Context(surface)
+        layer_cr.translate(-ox, -oy)
+        draw(layer_cr)
+        return surface, ox, oy, width, height
+
+    def _paint_layer(self, cr, layer, dy=0):
+        surface, x, y, w, h = layer
+        cr.set_source_surface(surface, x, y + dy)
+        cr.rectangle(x, y + dy, w, h)
+        cr.fill()
+
+    def _build_layers(self, w, h):
+        """The parts that only change on resize; moving parts are drawn per frame."""
+        wall_y, body_x, body_y, max_body_w, head_x, head_y = self._geometry(w, h)
+
+        def ledge(c):
+            self.draw_px(c, 0, wall_y, w, 2*S, C_CYAN)
+            # Ticks on bar
+            c.set_source_rgba(*C_CYAN_DIM)
+            for i in range(0, int(w), int(10*S)):
+                c.rectangle(i, wall_y + 2*S, 1*S, 2*S)
+            c.fill()
+
+        def body(c):
+            # Main Block (Stretched), drawn without breathing lift
+            self.draw_px(c, body_x, body_y, max_body_w, 12*S, C_CYAN)
+            # White Belly (Stretched)
+            self.draw_px(c, body_x + 5*S, body_y + 2*S, max_body_w - 10*S, 6*S, C_WHITE)
+            # Back legs (anchored right)
+            haunch_x = body_x + max_body_w - (8 * S)
+            self.draw_px(c, haunch_x, body_y + 2*S, 6*S, 8*S, C_CYAN)
+            self.draw_px(c, haunch_x + 1*S, body_y + 4*S, 4*S, 4*S, C_WHITE)
+
+        def base(c):
+            # Shading bottom
+            self.draw_px(c, body_x, wall_y - 2*S, max_body_w, 2*S, C_CYAN_DIM)
+            # Back foot resting on wall
+            foot_x = body_x + max_body_w - 6*S
+            foot_y = wall_y - 2*S
+            self.draw_px(c, foot_x, foot_y, 5*S, 3*S, C_WHITE)
+            self.draw_px(c, foot_x + 3*S, foot_y + 1*S, 2*S, 1*S, C_PINK)
+
+        def head(c):
+            # Head Shape (Pixel Blob)
+            self.draw_px(c, head_x, head_y, 24*S, 18*S, C_CYAN)
+
+            # Ears
+            self.draw_px(c, head_x + 2*S, head_y - 6*S, 6*S, 6*S, C_CYAN) # L
+            self.draw_px(c, head_x + 4*S, head_y - 4*S, 2*S, 4*S, C_PINK) # L Inner
+
+            self.draw_px(c, head_x + 16*S, head_y - 6*S, 6*S, 6*S, C_CYAN) # R
+            self.draw_px(c, head_x + 18*S, head_y - 4*S, 2*S, 4*S, C_PINK) # R Inner
+
+            # Headphones Band
+            self.draw_px(c, head_x + 4*S, head_y - 7*S, 16*S, 3*S, C_DARK)
+            # Cans
+            self.draw_px(c, head_x - 2*S, head_y + 2*S, 4*S, 10*S, C_DARK)
+            self.draw_px(c, head_x - 1*S, head_y + 4*S, 1*S, 6*S, C_PINK) # Glow
+            self.draw_px(c, head_x + 22*S, head_y + 2*S, 4*S, 10*S, C_DARK) # R
+            self.draw_px(c, head_x + 24*S, head_y + 4*S, 1*S, 6*S, C_PINK) # Glow
+
+            # Cheeks
+            self.draw_px(c, head_x + 4*S, head_y + 12*S, 3*S, 2*S, C_PINK)
+            self.draw_px(c, head_x + 17*S, head_y + 12*S, 3*S, 2*S, C_PINK)
+
+            # Nose
+            self.draw_px(c, head_x + 11*S, head_y + 11*S, 2*S, 1*S, C_BLACK)
+
+        self._layers = {
+            'ledge': self._render_layer(0, wall_y, w, 4*S, ledge),
+            'body': self._render_layer(body_x, body_y, max_body_w, 12*S, body),
+            'base': self._render_layer(body_x, wall_y - 2*S, max_body_w, 3*S, base),
+            'head': self._render_layer(head_x - 2*S, head_y - 7*S, 28*S, 25*S, head),
+        }
+        self._layers_size = (w, h)
+
+    def draw_cat(self, area, cr, w, h):
+        if self._layers is None or self._layers_size != (w, h):
+            self._build_layers(w, h)
+        layers = self._layers
+        wall_y, body_x, body_y, max_body_w, head_x, head_y = self._geometry(w, h)
+
+        # --- WALL / LEDGE ---
+        # Spans full width now
+        cr.set_source_rgba(0.0, 0.9, 1.0, 0.2 + (self.wall_pulse * 0.2))
+        cr.rectangle(0, wall_y, w, 4*S)
+        cr.fill()
+        self._paint_layer(cr, layers['ledge'])
+
+        # --- TAIL (Behind, Anchored Right) ---
+        tail_root_x = body_x + max_body_w - (5 * S)
+        tail_root_y = wall_y - 8 * S
+
+        # Procedural pixel tail based on angle, filled as one path
+        cr.set_source_rgba(*C_PINK)
+        for i in range(12):
+            tx = tail_root_x + (i * S * 0.8)
+            # Dangle down
+            ty = tail_root_y + (i * S * 1.5)
+            # Sway physics
+            sway = math.sin(i * 0.5 + self.tick_count * 0.1) * (self.tail_sway/4)
+            cr.rectangle(tx + sway, ty, 3*S, 3*S)
+        cr.fill()
+
+        # --- BODY (Elastic Long) ---
+        # Breathe effect (Chest rises/falls), in whole pixels
+        chest_lift = round(self.breathe_scale * S)
+        cr.save()
+        cr.rectangle(0, 0, w, wall_y)
+        cr.clip()
+        self._paint_layer(cr, layers['body'], -chest_lift)
+        cr.restore()
+        # The shading covers the gap a lifted block leaves above the ledge
+        self._paint_layer(cr, layers['base'])
+
+        # --- FRONT PAWS (Anchored Left, Swinging) ---
+        lp_x = body_x + 5 * S + self.paw_swing * S
+        rp_swing = -self.paw_swing if self.current_state == "playing" else 0
+        rp_x = body_x + 15 * S + rp_swing * S
+        cr.set_source_rgba(*C_WHITE) # Dangle
+        cr.rectangle(lp_x, wall_y, 4*S, 6*S)
+        cr.rectangle(rp_x, wall_y, 4*S, 6*S)
+        cr.fill()
+        cr.set_source_rgba(*C_PINK) # Toe beans
+        cr.rectangle(lp_x + 1*S, wall_y + 4*S, 2*S, 2*S)
+        cr.rectangle(rp_x + 1*S, wall_y + 4*S, 2*S, 2*S)
+        cr.fill()
+
+        # --- HEAD (Anchored Left) ---
+        # Apply Head Bob
+        head_bob = round(self.head_bob)
+        self._paint_layer(cr, layers['head'], head_bob)
+
+        # Face
+        eye_y = head_y + 8*S + head_bob
+        eye_x_l = head_x + 6*S
+        eye_x_r = head_x + 16*S
+
+        cr.set_source_rgba(*C_BLACK)
+        # Eyes logic
+        if self.current_state == "playing" or self.is_blinking:
+            # ^ ^  or - -
+            for eye_x in (eye_x_l, eye_x_r):
+                cr.rectangle(eye_x, eye_y, 4*S, 1*S)
+                cr.rectangle(eye_x + 1*S, eye_y - 1*S, 2*S, 1*S)
+        # Paused is now treated like Idle/Normal
+        else:
+            # Normal . .
+            cr.rectangle(eye_x_l + 1*S, eye_y, 2*S, 2*S)
+            cr.rectangle(eye_x_r + 1*S, eye_y, 2*S, 2*S)
+        cr.fill()
+
+
+class SpectrumDrawing:
+    """Spectrum bar physics (NumPy) and drawing; SpectrumVisualizer mixes it into a widget."""
+    def __init__(self, bars=SPECTRUM_BARS):
+        self._init_bars(bars)
+
+    def queue_draw(self):
+        pass
+
+    def _init_bars(self, bars):
+        # numpy is imported here so the cat alone doesn't load it at startup
+        import numpy as np
+        self.values = np.zeros(bars)
+        # velocity for falling effect
+        self.velocities = np.zeros(bars)
+        self.tick_count = 0
+        self._rng = np.random.default_rng()
+
+        # Bars near the middle kick hardest
+        positions = np.arange(bars)
+        self.center_bias = 1.0 - np.abs(positions - bars / 2) / (bars / 2)
+        # Wave phase per bar, spread as it was over the original 28 bars
+        self.phase = positions * 0.5 * 28 / bars
+        # Where each bar samples the (usually coarser) analyzer bands
+        self.sample_at = (positions + 0.5) / bars
+
+    def update(self, is_playing, bands=None):
+        """Advances the bars one tick, following `bands` (0..1) when given."""
+        import numpy as np
+        if not is_playing:
+            # Simple linear decay
+            np.maximum(self.values - 0.05, 0, out=self.values)
+
+        elif bands is not None and len(bands):
+            bands = np.asarray(bands, dtype=float)
+            target = np.interp(self.sample_at, (np.arange(len(bands)) + 0.5) / len(bands), bands)
+            rising = target > self.values
+            # Rise instantly to the measured level, fall with gravity
+            self.velocities = np.where(rising, 0.0, self.velocities - 0.01)
+            self.values = np.where(rising, target, np.maximum(target, self.values + self.velocities))
+
+        else:
+            self.tick_count += 0.25
+            beat_trigger = math.sin(self.tick_count * 3) > 0.8
+
+            self.velocities -= 0.04
+            if beat_trigger:
+                energy = self._rng.random(len(self.values))
+                kick = np.where(energy > 0.6, energy * self.center_bias * 0.6, 0.0)
+                np.maximum(self.velocities, kick, out=self.velocities)
+
+            sustained = (np.sin(self.tick_count + self.phase) + 1) / 2 * 0.1
+            self.velocities += sustained * 0.1
+            self.values += self.velocities
+
+            floor = self.values < 0
+            self.values[floor] = 0
+            self.velocities[floor] = 0
+            ceiling = self.values > 1.0
+            self.values[ceiling] = 1.0
+            self.velocities[ceiling] = -0.1
+
+        self.queue_draw()
+        return True
+
+    def draw_bars(self, area, cr, w, h):
+        n = len(self.values)
+        gap = min(3, w / n * 0.25)
+        bar_w = (w - gap * (n - 1)) / n
+        heights = (self.values * h).tolist()
+
+        # One path, one fill for every bar
+        cr.set_source_rgba(*C_CYAN)
+        for i, bar_h in enumerate(heights):
+            if bar_h > 0.5:
+                cr.rectangle(i * (bar_w + gap), h - bar_h, bar_w, bar_h)
+        cr.fill()
@@ -0,0 +1,51 @@
+"""
+Startup timeline for --profile-startup. Import this first; mark() is a
+no-op unless enable() was called.
+"""
+import os
+import sys
+import time
+
+_origin = time.perf_counter()
+_marks = []
+enabled = False
+
+
+def _process_age():
+    # Seconds since the process was started, so interpreter boot shows up too
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def enable():
+    global enabled
+    enabled = True
+    age = _process_age()
+    if age is not None:
+        _marks.append(("process start", time.perf_counter() - age))
+    # Each mark names the phase that just finished
+    _marks.append(("interpreter", _origin))
+
+
+def mark(phase):
+    if enabled:
+        _marks.append((phase, time.perf_counter()))
+
+
+def report(file=None):
+    """Prints each phase with its own duration and the time since start."""
+    if not enabled or not _marks:
+        return
+    file = file or sys.stderr
+    start = _marks[0][1]
+    print("Startup timeline:", file=file)
+    previous = start
+    for phase, at in _marks:
+        print(f"  {phase:<24} +{(at - previous) * 1000:8.1f} ms  {(at - start) * 1000:8.1f} ms", file=file)
+        previous = at
@@ -1,13 +1,79 @@
 import os
+import time
 import shutil
+import logging
 import webbrowser
+from collections import OrderedDict
 from gi.repository import Gtk, Adw, Gio, GObject
 
+from src.core.jobs import get_runner
+
+logger = logging.getLogger(__name__)
+
+class SongItem(GObject.Object):
+    def __init__(self, song):
+        super().__init__()
+        self.song = song
+
+
+class SongHistoryModel(GObject.Object, Gio.ListModel):
+    """
+    Gio.ListModel over a SongHistory that loads PAGE_SIZE rows at a time as
+    the list view asks for them, keeping only the last few pages around.
+    """
+    PAGE_SIZE = 100
+    MAX_PAGES = 20
+
+    def __init__(self, history):
+        super().__init__()
+        self.history = history
+        self.query = None
+        self._pages = OrderedDict()
+        self._count = history.count()
+
+    def do_get_item_type(self):
+        return SongItem
+
+    def do_get_n_items(self):
+        return self._count
+
+    def do_get_item(self, position):
+        if position >= self._count:
+            return None
+        index, offset = divmod(position, self.PAGE_SIZE)
+        page = self._pages.get(index)
+        if page is None:
+            songs = self.history.page(index * self.PAGE_SIZE, self.PAGE_SIZE, self.query)
+            page = self._pages[index] = [SongItem(song) for song in songs]
+            if len(self._pages) > self.MAX_PAGES:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(index)
+        return page[offset] if offset < len(page) else None
+
+    def set_query(self, query):
+        removed = self._count
+        self.query = query or None
+        self._pages.clear()
+        self._count = self.history.count(self.query)
+        self.items_changed(0, removed, self._count)
+
+
+def _song_subtitle(song):
+    parts = [song.get('artist') or 'Unknown']
+    if song.get('station'):
+        parts.append(song['station'])
+    parts.append(time.strftime("%Y-%m-%d %H:%M", time.localtime(song['identified_at'])))
+    return " · ".join(parts)
+
+
 class IdentifiedSongsDialog(Adw.Window):
-    def __init__(self, parent_window, identified_songs):
+    def __init__(self, parent_window, history):
         super().__init__(modal=True, transient_for=parent_window)
         self.set_title("Identified Songs")
         self.set_default_size(500, 400)
+        self.parent_window = parent_window
+        self.history = history
 
         box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
         box.set_margin_top(20)
@@ -16,42 +82,113 @@ class IdentifiedSongsDialog(Adw.Window):
         box.set_margin_end(20)
         self.set_content(box)
 
+        self.search_entry = Gtk.SearchEntry()
+        self.search_entry.set_placeholder_text("Search title, artist or station...")
+        self.search_entry.connect("search-changed", self.on_search_changed)
+        box.append(self.search_entry)
+
+        self.model = SongHistoryModel(history)
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self._setup_row)
+        factory.connect("bind", self._bind_row)
+        list_view = Gtk.ListView(model=Gtk.NoSelection(model=self.model), factory=factory)
+        list_view.add_css_class("boxed-list")
+
         scrolled = Gtk.ScrolledWindow()
         scrolled.set_vexpand(True)
-        box.append(scrolled)
-
-        self.list_box = Gtk.ListBox()
-        self.list_box.add_css_class("boxed-list")
-        scrolled.set_child(self.list_box)
-
-        if not identified_songs:
-            label = Gtk.Label(label="No songs identified yet.")
-            label.add_css_class("dim-label")
-            label.set_halign(Gtk.Align.CENTER)
-            label.set_valign(Gtk.Align.CENTER)
-            self.list_box.append(label)
-        else:
-            for song in identified_songs:
-                row = self._create_song_row(song)
-                self.list_box.append(row)
+        scrolled.set_child(list_view)
+
+        self.empty_label = Gtk.Label()
+        self.empty_label.add_css_class("dim-label")
+        self.empty_label.set_halign(Gtk.Align.CENTER)
+        self.empty_label.set_valign(Gtk.Align.CENTER)
+
+        self.stack = Gtk.Stack()
+        self.stack.set_vexpand(True)
+        self.stack.add_named(scrolled, "list")
+        self.stack.add_named(self.empty_label, "empty")
+        box.append(self.stack)
+        self._update_empty_state()
+
+        btns_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
+        btns_box.set_halign(Gtk.Align.CENTER)
+        box.append(btns_box)
+
+        for label, fmt in (("Export CSV", "csv"), ("Export JSON", "json")):
+            export_btn = Gtk.Button(label=label)
+            export_btn.connect("clicked", self.on_export_clicked, fmt)
+            btns_box.append(export_btn)
 
         close_btn = Gtk.Button(label="Close")
         close_btn.connect("clicked", lambda x: self.close())
-        close_btn.set_halign(Gtk.Align.CENTER)
         close_btn.add_css_class("pill")
-        box.append(close_btn)
+        btns_box.append(close_btn)
 
-    def _create_song_row(self, song):
-        row = Adw.ActionRow(title=song.get('title', 'Unknown'), subtitle=song.get('artist', 'Unknown'))
-        
-        if song.get('musicbrainz_url'):
-            btn = Gtk.Button(icon_name="info-symbolic")
-            btn.set_tooltip_text("Open in MusicBrainz")
-            btn.add_css_class("flat")
-            btn.connect("clicked", lambda b, url=song.get('musicbrainz_url'): webbrowser.open_new_tab(url))
-            row.add_suffix(btn)
-        
-        return row
+    def _setup_row(self, factory, list_item):
+        row = Adw.ActionRow()
+        row.set_use_markup(False)
+
+        btn = Gtk.Button(icon_name="info-symbolic")
+        btn.set_tooltip_text("Open in MusicBrainz")
+        btn.add_css_class("flat")
+        btn.connect("clicked", lambda b: self._open_musicbrainz(list_item))
+        row.add_suffix(btn)
+        row.musicbrainz_btn = btn
+
+        list_item.set_child(row)
+
+    def _bind_row(self, factory, list_item):
+        song = list_item.get_item().song
+        row = list_item.get_child()
+        row.set_title(song.get('title') or 'Unknown')
+        row.set_subtitle(_song_subtitle(song))
+        row.musicbrainz_btn.set_visible(bool(song.get('musicbrainz_url')))
+
+    def _open_musicbrainz(self, list_item):
+        item = list_item.get_item()
+        if item and item.song.get('musicbrainz_url'):
+            webbrowser.open_new_tab(item.song['musicbrainz_url'])
+
+    def _update_empty_state(self):
+        if self.model.get_n_items():
+            self.stack.set_visible_child_name("list")
+            return
+        self.empty_label.set_label("No matching songs." if self.model.query else "No songs identified yet.")
+        self.stack.set_visible_child_name("empty")
+
+    def on_search_changed(self, entry):
+        self.model.set_query(entry.get_text())
+        self._update_empty_state()
+
+    def on_export_clicked(self, btn, fmt):
+        dialog = Gtk.FileChooserNative(
+            title="Export Identified Songs",
+            transient_for=self,
+            action=Gtk.FileChooserAction.SAVE,
+        )
+        dialog.set_current_name(f"identified-songs.{fmt}")
+        dialog.connect("response", self.on_export_response, fmt)
+        dialog.show()
+        # Keep a reference until the response arrives
+        self._export_dialog = dialog
+
+    def on_export_response(self, dialog, response_id, fmt):
+        path = dialog.get_file().get_path() if response_id == Gtk.ResponseType.ACCEPT else None
+        dialog.destroy()
+        self._export_dialog = None
+        if not path:
+            return
+        export = self.history.export_csv if fmt == "csv" else self.history.export_json
+        query = self.model.query
+        notify = self.parent_window._show_toast
+
+        def failed(e):
+            logger.error(f"History export failed: {e}")
+            notify(f"Export failed: {e}")
+
+        get_runner().submit(export, path, query, subsystem='export',
+                            on_done=lambda count: notify(f"Exported {count} songs to {os.path.basename(path)}"),
+                            on_error=failed)
 
 class AddStationDialog(Adw.Window):
     def __init__(self, parent_window, on_save_callback, station_data=None):
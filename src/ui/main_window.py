@@ -1,23 +1,29 @@
 import logging
 import threading
-import json
-import os
 from gi.repository import Gtk, Adw, GLib, Gio, Gdk
 
-from src.config import FAVORITES_FILE, DEFAULT_STATIONS
-from src.core.player import AudioPlayer
-from src.core.api import search_stations, fetch_azuracast_nowplaying
+from src.config import DEFAULT_STATIONS, TIMESHIFT_MB, RESUME_LAST, HEALTH_CHECKS, HEALTH_TTL, STANDBY_SLOTS
+from src.core.player import AudioPlayer, STANDBY_REFRESH_SECONDS
+from src.core.favorites import FavoritesStore, station_key
+from src.core.history import SongHistory
+from src.core.jobs import get_runner
+from src.core.resume import save_last_station
+from src.core.health import StationHealth
+from src.core.api import search_stations, fetch_azuracast_nowplaying, find_azuracast_station, get_azuracast_mounts
 from src.core.metadata import fetch_album_art
 from src.core.musicbrainz import get_musicbrainz_url
-from src.core.recognition import SongRecognizer
 from src.ui.visuals import VectorCat
-from src.ui.dialogs import AddStationDialog, IdentifiedSongsDialog
+from src.ui.station_list import StationList
 from src.ui.utils import load_image_into, clean_metadata_title
+from src import startup
+
+# Recognition, dialogs, the PCM tap and the mpv core are imported and set up
+# on first use or once the window has painted (see _deferred_init)
 
 logger = logging.getLogger(__name__)
 
 class MainWindow(Adw.ApplicationWindow):
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, resume=None, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.set_title("Cyber Radio")
@@ -26,14 +32,30 @@ class MainWindow(Adw.ApplicationWindow):
         self.add_css_class("cyber-window")
 
         # State
-        self.favorites = self.load_favorites()
+        # Background work runs on one asyncio loop; results come back via GLib
+        self.jobs = get_runner(GLib.idle_add)
+        self.favorites = FavoritesStore()
         self.ensure_defaults()
+        self.health = StationHealth() if HEALTH_CHECKS else None
         self.current_station_data = None
         self.is_azuracast = False
+        self.current_track = None
         self._discontinuity_timer = None
         self._loaded_textures = {}
-        self.recognizer = SongRecognizer()
-        self.identified_songs = []
+        # Recognizer and history may first be touched from a job worker
+        self._recognizer_lock = threading.Lock()
+        self._history_lock = threading.Lock()
+        self._player = None
+        # Pushed by the player, so the per-frame cat state needs no player calls
+        self._player_paused = False
+        # The URL the player actually tuned the current station with
+        self.tuned_url = None
+        # Future of a player already connecting to the last station (CYBER_RESUME)
+        self._resume = resume
+        self._recognizer = None
+        self._history = None
+        self.audio_bands = None
+        self.audio_tap = None
 
         # --- TOAST OVERLAY & ROOT BOX ---
         self.toast_overlay = Adw.ToastOverlay()
@@ -111,16 +133,12 @@ class MainWindow(Adw.ApplicationWindow):
         sidebar_box.append(self.search_entry)
 
         # List
-        scrolled = Gtk.ScrolledWindow()
-        scrolled.set_vexpand(True)
-        self.list_box = Gtk.ListBox()
-        self.list_box.add_css_class("boxed-list")
-        self.list_box.set_selection_mode(Gtk.SelectionMode.SINGLE)
-        self.list_box.set_activate_on_single_click(True)
-        self.list_box.connect("row-activated", self.on_station_selected)
-
-        scrolled.set_child(self.list_box)
-        sidebar_box.append(scrolled)
+        self.station_list = StationList(self._play_station, self.on_edit_clicked,
+                                        self.delete_favorite_direct, self._loaded_textures,
+                                        health=self.health)
+        if self.health:
+            self.health.listeners.append(lambda result: self.station_list.refresh(result['url']))
+        sidebar_box.append(self.station_list)
 
         self.flap.set_flap(sidebar_box)
 
@@ -211,104 +229,294 @@ class MainWindow(Adw.ApplicationWindow):
         self.fav_btn_player.connect("clicked", self.on_favorite_clicked)
 
         btn_row.append(vol_box)
+
+        # Timeshift (only when the ring buffer is enabled)
+        if TIMESHIFT_MB > 0:
+            rewind_btn = Gtk.Button(icon_name="media-seek-backward-symbolic")
+            rewind_btn.add_css_class("circular")
+            rewind_btn.set_valign(Gtk.Align.CENTER)
+            rewind_btn.set_tooltip_text("Rewind 30s")
+            rewind_btn.connect("clicked", self.on_rewind_clicked)
+            btn_row.append(rewind_btn)
+
         btn_row.append(self.play_btn)
+
+        if TIMESHIFT_MB > 0:
+            live_btn = Gtk.Button(icon_name="media-skip-forward-symbolic")
+            live_btn.add_css_class("circular")
+            live_btn.set_valign(Gtk.Align.CENTER)
+            live_btn.set_tooltip_text("Back to Live")
+            live_btn.connect("clicked", self.on_live_clicked)
+            btn_row.append(live_btn)
+
         btn_row.append(self.fav_btn_player)
 
+        # Record
+        self.record_btn = Gtk.ToggleButton(icon_name="media-record-symbolic")
+        self.record_btn.add_css_class("circular")
+        self.record_btn.set_valign(Gtk.Align.CENTER)
+        self.record_btn.set_tooltip_text("Record (one file per track)")
+        self.record_btn.connect("toggled", self.on_record_toggled)
+        btn_row.append(self.record_btn)
+
         content_box.append(btn_row)
 
         main_scroll.set_child(content_box)
         self.flap.set_content(main_scroll)
 
         # --- INIT ---
-        self._populate_list(self.favorites)
-        self.player = AudioPlayer(self.on_mpv_metadata, self.on_mpv_discontinuity)
-        self.player.set_volume(50)
+        self._populate_list(self.favorites.stations())
+        self.connect("map", self._on_first_map)
+        if resume is not None:
+            resume.add_done_callback(lambda future: GLib.idle_add(self._adopt_resumed, future))
 
         GLib.timeout_add_seconds(5, self._poll_tick)
-        GLib.timeout_add(30, self._update_visualizer_loop)
+        if STANDBY_SLOTS > 0:
+            GLib.timeout_add_seconds(STANDBY_REFRESH_SECONDS, self._refresh_standby)
+        self.vector_cat.start_animation(self._visualizer_state)
+        # GTK >= 4.12 reports when the window is minimized or fully hidden
+        if hasattr(self.props, "suspended"):
+            self.connect("notify::suspended", self._on_suspended_changed)
+
+    # --- DEFERRED INIT ---
+    def _on_first_map(self, window):
+        self.disconnect_by_func(self._on_first_map)
+        clock = self.get_frame_clock()
+        handler = None
+
+        def after_paint(clock):
+            clock.disconnect(handler)
+            startup.mark("first frame")
+            GLib.idle_add(self._deferred_init, priority=GLib.PRIORITY_LOW)
+
+        handler = clock.connect("after-paint", after_paint)
+
+    def _deferred_init(self):
+        # Starts the mpv core once the window is on screen
+        if self._resume is None:
+            _ = self.player
+        startup.mark("player ready")
+        startup.report()
+
+        if self.health:
+            self._probe_favorites()
+            GLib.timeout_add_seconds(HEALTH_TTL, self._probe_favorites)
+        return False
 
-    def ensure_defaults(self):
-        if not self.favorites:
-            self.favorites = DEFAULT_STATIONS.copy()
-            self.save_favorites()
-            return
+    def _probe_favorites(self):
+        self.health.probe([station_key(s) for s in self.favorites])
+        return True
+
+    @property
+    def player(self):
+        if self._player is None and self._resume is not None:
+            # Used before the resumed player was handed over: wait for it
+            self._adopt_resumed(self._resume)
+        if self._player is None:
+            self._player = AudioPlayer(self.on_mpv_metadata, self.on_mpv_discontinuity)
+            self._player.pause_listeners.append(self._on_pause_changed)
+            self._player.set_volume(self.vol_scale.get_value())
+        return self._player
+
+    def _adopt_resumed(self, future):
+        """Takes over the player start_resume() began playing the last station with."""
+        if future is not self._resume:
+            return False
+        self._resume = None
+        try:
+            result = future.result()
+        except Exception as e:
+            result = None
+            logger.error(f"Could not resume last station: {e}")
+        if not result:
+            return False
+
+        station, player, (metadata_relay, discontinuity_relay) = result
+        self._player = player
+        player.pause_listeners.append(self._on_pause_changed)
+        self._player_paused = player.get_is_paused()
+        player.set_volume(self.vol_scale.get_value())
+        self._show_station(station)
+        self._on_tuned(station_key(station))
+
+        metadata_relay.target = self.on_mpv_metadata
+        discontinuity_relay.target = self.on_mpv_discontinuity
+        if metadata_relay.pending:
+            self.on_mpv_metadata(*metadata_relay.pending)
+        return False
+
+    @property
+    def recognizer(self):
+        # Looks for songrec and loads the fingerprint index; done on a job worker
+        with self._recognizer_lock:
+            if self._recognizer is None:
+                from src.core.recognition import SongRecognizer
+                self._recognizer = SongRecognizer()
+            return self._recognizer
+
+    @property
+    def history(self):
+        with self._history_lock:
+            if self._history is None:
+                self._history = SongHistory()
+            return self._history
+
+    def _ensure_audio_tap(self):
+        if self.audio_tap is None:
+            try:
+                from src.core.analyzer import PcmTap
+            except ImportError:
+                # numpy is optional; visuals fall back to simulated motion
+                self.audio_tap = False
+                return None
+            self.audio_tap = PcmTap(self._on_audio_bands, dispatch=GLib.idle_add)
+        return self.audio_tap
 
+    def ensure_defaults(self):
         updated = False
-        defaults_map = {s['url_resolved']: s for s in DEFAULT_STATIONS}
-
-        for fav in self.favorites:
-            url = fav.get('url_resolved')
-            if url in defaults_map:
-                default_data = defaults_map[url]
-                # Update existing fields from default data
-                if 'favicon' not in fav or fav['favicon'] != default_data.get('favicon'):
-                    fav['favicon'] = default_data.get('favicon')
-                    updated = True
-                if 'id' not in fav and 'id' in default_data:
-                    fav['id'] = default_data['id']
-                    updated = True
-                if 'shortcode' not in fav and 'shortcode' in default_data:
-                    fav['shortcode'] = default_data['shortcode']
-                    updated = True
-
-        existing_urls = {f.get('url_resolved') for f in self.favorites}
-        for s in DEFAULT_STATIONS:
-            if s['url_resolved'] not in existing_urls:
-                self.favorites.append(s)
+        for default_data in DEFAULT_STATIONS:
+            url = default_data['url_resolved']
+            fav = self.favorites.get(url)
+            if fav is None:
+                self.favorites.add(dict(default_data))
+                updated = True
+                continue
+
+            # Update existing fields from default data
+            fields = {}
+            if fav.get('favicon') != default_data.get('favicon'):
+                fields['favicon'] = default_data.get('favicon')
+            for field in ('id', 'shortcode'):
+                if field not in fav and field in default_data:
+                    fields[field] = default_data[field]
+            if fields:
+                self.favorites.update(url, **fields)
                 updated = True
 
-        if updated:
-            self.save_favorites()
-            if hasattr(self, 'list_box'):
-                self._populate_list(self.favorites)
+        if updated and hasattr(self, 'station_list'):
+            self._populate_list(self.favorites.stations())
 
     def on_toggle_sidebar(self, btn):
         current = self.flap.get_reveal_flap()
         self.flap.set_reveal_flap(not current)
 
     # --- UI UPDATERS ---
-    def _update_visualizer_loop(self):
-        # Determine cat state
-        is_playing = self.player and not self.player.get_is_paused() and self.current_station_data
-        is_paused = self.player and self.player.get_is_paused() and self.current_station_data
-
-        if is_playing:
-            state = "playing"
-        elif is_paused:
-            state = "paused"
-        else:
-            state = "idle"
+    def _visualizer_state(self):
+        # Runs every frame: only reads state the player pushed to us
+        if not self.current_station_data:
+            return "idle", None
+        if self._player_paused:
+            return "paused", None
+        return "playing", self.audio_bands
+
+    def _on_pause_changed(self, paused):
+        self._player_paused = paused
+        self.vector_cat.wake()
+        return False
 
-        self.vector_cat.update(state)
-        return True
+    def _on_suspended_changed(self, window, _pspec):
+        suspended = self.props.suspended
+        self.vector_cat.set_suspended(suspended)
+        # The spectrum only feeds the visuals; don't analyze audio nobody sees
+        if self.audio_tap:
+            if suspended:
+                self.audio_tap.stop()
+            elif self.current_station_data:
+                self.audio_tap.start(self.player.audio_pid())
+
+    def _on_audio_bands(self, bands):
+        self.audio_bands = bands
 
     # --- PLAYER LOGIC ---
     def _play_station(self, station_data):
         url = station_data.get('url_resolved') or station_data.get('url')
         name = station_data.get('name')
-        favicon = station_data.get('favicon')
 
         if not url: return
 
+        # Takes over a still-connecting resumed player before the UI switches
+        player = self.player
         if self.current_station_data and self.current_station_data.get('url_resolved') == url:
              return
 
+        # radio-browser lists both the original and the resolved URL
+        candidates = [url] + [u for u in (station_data.get('url'), station_data.get('url_resolved')) if u and u != url]
+        if self.health:
+            # Don't wait on timeouts for URLs the prober just found dead
+            live = [u for u in candidates if not self.health.is_dead(u)]
+            if not live:
+                self.health.forget(url)
+                self.station_list.refresh(url)
+                self._show_toast(f"{name} was offline when last checked. Select it again to retry.")
+                return
+            candidates = live
+
+        self._show_station(station_data)
+        player.play(candidates[0], name, candidates[1:])
+        self._on_tuned(url)
+        self._record_play(url)
+
+    def _show_station(self, station_data):
+        url = station_key(station_data)
+        # Drop lookups still running for the previous station
+        self.jobs.cancel_scope('station')
+        self.jobs.cancel_scope('track')
+
         self.current_station_data = station_data
+        self.vector_cat.wake()
         self.is_azuracast = "radio.zelixo.net" in url
+        self.current_track = None
+        # The player stops recording when the station changes
+        self.record_btn.set_active(False)
 
         logger.info(f"Tuning into: {url}")
-        self.station_label.set_label(name)
+        self.station_label.set_label(station_data.get('name'))
         self.track_label.set_label("Connecting...")
 
-        load_image_into(favicon, self.art_picture, self._loaded_textures)
+        load_image_into(station_data.get('favicon'), self.art_picture, self._loaded_textures)
 
-        self.player.play(url)
+    def _on_tuned(self, url):
+        # url is the station's key; the player may have started on one of its
+        # alternates (e.g. when the primary URL was found dead)
+        self.tuned_url = self.player.current_url
         self.play_btn.set_icon_name("media-playback-pause-symbolic")
 
+        self.audio_bands = None
+        if self._ensure_audio_tap():
+            self.audio_tap.start(self.player.audio_pid())
+
         if self.is_azuracast:
              self.track_label.set_label("Loading metadata...")
 
         self.check_is_favorite(url)
+        self._prewarm_likely_next()
+
+        if RESUME_LAST:
+            self.jobs.submit(save_last_station, self.current_station_data, self.player.current_stream,
+                             subsystem='resume')
+
+    def _record_play(self, url):
+        # Play counts drive which favorites are kept warm for instant switching
+        fav = self.favorites.get(url)
+        if fav:
+            self.favorites.update(url, play_count=fav.get('play_count', 0) + 1)
+
+    def _prewarm_likely_next(self):
+        if not self.player.standby:
+            return
+
+        candidates = []
+        if self.current_station_data:
+            for station in self.station_list.neighbours(station_key(self.current_station_data)):
+                candidates.append(station_key(station))
+
+        most_played = sorted(self.favorites, key=lambda f: f.get('play_count', 0), reverse=True)
+        for fav in most_played:
+            if fav.get('play_count'):
+                candidates.append(fav.get('url_resolved'))
+
+        # Drop duplicates while keeping priority order
+        self.player.prewarm(list(dict.fromkeys(candidates)))
 
     def apply_azuracast_update(self, song_text, art_url, stream_url):
         if song_text:
@@ -321,48 +529,7 @@ class MainWindow(Adw.ApplicationWindow):
 
     # --- LIST LOGIC ---
     def _populate_list(self, stations):
-        while True:
-            row = self.list_box.get_row_at_index(0)
-            if row is None: break
-            self.list_box.remove(row)
-
-        for station in stations:
-            row_content = Adw.ActionRow()
-            name = station.get("name")
-            country = station.get("countrycode") or "??"
-            url = station.get("url_resolved") or station.get("url")
-            favicon = station.get("favicon")
-
-            if not url: continue
-
-            row_content.set_title(name)
-            if len(name) > 15:
-                row_content.set_tooltip_text(name)
-
-            icon = Gtk.Image()
-            icon.set_pixel_size(24)
-            icon.set_from_icon_name("audio-x-generic-symbolic")
-
-            if favicon:
-                load_image_into(favicon, icon, self._loaded_textures, size=24)
-
-            row_content.add_prefix(icon)
-            row_content.station_data = station
-
-            del_btn = Gtk.Button(icon_name="user-trash-symbolic")
-            del_btn.add_css_class("flat")
-            del_btn.connect("clicked", lambda b, s=station: self.delete_favorite_direct(s))
-            
-            edit_btn = Gtk.Button(icon_name="document-edit-symbolic")
-            edit_btn.add_css_class("flat")
-            edit_btn.connect("clicked", lambda b, s=station: self.on_edit_clicked(s))
-
-            row_content.add_suffix(edit_btn)
-            row_content.add_suffix(del_btn)
-
-            list_row = Gtk.ListBoxRow()
-            list_row.set_child(row_content)
-            self.list_box.append(list_row)
+        self.station_list.set_stations(stations)
 
     # --- RECOGNITION LOGIC ---
     def on_recognize_clicked(self, btn):
@@ -374,14 +541,11 @@ class MainWindow(Adw.ApplicationWindow):
         # Visual feedback
         self.track_label.set_label("Scanning...")
         
-        url = self.current_station_data.get('url_resolved') or self.current_station_data.get('url')
-        threading.Thread(target=self._perform_recognition, args=(url,), daemon=True).start()
-
-    def _perform_recognition(self, stream_url):
-        result = self.recognizer.identify(stream_url)
-        GLib.idle_add(self._on_recognition_complete, result)
+        station = self.current_station_data
+        self.jobs.submit(lambda url: self.recognizer.identify(url), station_key(station), subsystem='recognition',
+                         on_done=lambda result: self._on_recognition_complete(result, station))
 
-    def _on_recognition_complete(self, result):
+    def _on_recognition_complete(self, result, station=None):
         if not result:
             self._show_toast("Could not identify song.")
             # Restore unknown state or previous
@@ -402,7 +566,10 @@ class MainWindow(Adw.ApplicationWindow):
         self._show_toast(f"Found: {artist} - {title}")
 
         # Get MusicBrainz URL in a separate thread to not block the UI
-        threading.Thread(target=self._add_identified_song, args=(title, artist, art_url), daemon=True).start()
+        station = station or {}
+        self.jobs.submit(self._add_identified_song, title, artist, art_url,
+                         station.get('name'), station_key(station) if station else None,
+                         subsystem='musicbrainz', on_done=self._show_toast)
 
         # --- Temporary UI Update ---
         # Store original state
@@ -432,25 +599,23 @@ class MainWindow(Adw.ApplicationWindow):
 
 
 
-    def _add_identified_song(self, title, artist, art_url):
+    def _add_identified_song(self, title, artist, art_url, station_name=None, station_url=None):
+        # Runs on a job worker; the returned message is shown as a toast
         musicbrainz_url = get_musicbrainz_url(artist, title)
-        
-        song_data = {
-            "title": title,
-            "artist": artist,
-            "art_url": art_url,
-            "musicbrainz_url": musicbrainz_url
-        }
-        
-        self.identified_songs.append(song_data)
-        
-        # Also show a toast that the song has been identified and added
-        GLib.idle_add(self._show_toast, f"Identified & Added: {artist} - {title}")
+
+        try:
+            self.history.add(title, artist, station_name, station_url, art_url, musicbrainz_url)
+        except Exception as e:
+            logger.error(f"Failed to save identified song: {e}")
+            return f"Could not save {artist} - {title} to history"
+
+        return f"Identified & Added: {artist} - {title}"
 
 
 
     def on_show_identified_songs(self, btn):
-        dialog = IdentifiedSongsDialog(self, self.identified_songs)
+        from src.ui.dialogs import IdentifiedSongsDialog
+        dialog = IdentifiedSongsDialog(self, self.history)
         dialog.present()
 
     def _show_toast(self, message):
@@ -463,96 +628,113 @@ class MainWindow(Adw.ApplicationWindow):
         if not self.is_azuracast:
             cleaned_name = clean_metadata_title(track_name)
             self.track_label.set_label(cleaned_name)
-            # Trigger dynamic art lookup
-            threading.Thread(target=self._update_dynamic_art, args=(cleaned_name,), daemon=True).start()
+            self._set_current_track(cleaned_name)
+            # Trigger dynamic art lookup; only the latest track's result counts
+            self.jobs.cancel_scope('track')
+            self.jobs.submit(fetch_album_art, cleaned_name, subsystem='art', scope='track',
+                             on_done=self._update_dynamic_art)
 
-    def _update_dynamic_art(self, track_name):
-        art_url = fetch_album_art(track_name)
+    def _update_dynamic_art(self, art_url):
         if art_url:
-             GLib.idle_add(load_image_into, art_url, self.art_picture, self._loaded_textures)
+             load_image_into(art_url, self.art_picture, self._loaded_textures)
         else:
              # Fallback to station logo if no art found for this track
              if self.current_station_data:
                  logo = self.current_station_data.get('favicon')
-                 GLib.idle_add(load_image_into, logo, self.art_picture, self._loaded_textures)
-
-    def on_station_selected(self, box, row):
-        if row and row.get_child().station_data:
-            self._play_station(row.get_child().station_data)
+                 load_image_into(logo, self.art_picture, self._loaded_textures)
 
     def on_favorite_clicked(self, btn):
         if not self.current_station_data: return
-        url = self.current_station_data.get('url_resolved')
-        exists = any(f.get('url_resolved') == url for f in self.favorites)
-        if exists:
-            self.favorites = [f for f in self.favorites if f.get('url_resolved') != url]
+        url = station_key(self.current_station_data)
+        if url in self.favorites:
+            self.favorites.remove(url)
             self.fav_btn_player.set_icon_name("non-starred-symbolic")
         else:
-            self.favorites.append(self.current_station_data)
+            self.favorites.add(self.current_station_data)
             self.fav_btn_player.set_icon_name("starred-symbolic")
-        self.save_favorites()
         if not self.search_entry.get_text():
-            self._populate_list(self.favorites)
+            self._populate_list(self.favorites.stations())
 
     def check_is_favorite(self, url):
-        exists = any(f.get('url_resolved') == url for f in self.favorites)
-        icon = "starred-symbolic" if exists else "non-starred-symbolic"
+        icon = "starred-symbolic" if url in self.favorites else "non-starred-symbolic"
         self.fav_btn_player.set_icon_name(icon)
 
     def on_search_activate(self, entry):
         query = entry.get_text()
         if query:
-            threading.Thread(target=self._perform_search, args=(query,), daemon=True).start()
+            # A newer search replaces any still in flight
+            self.jobs.cancel_scope('search')
+            self.jobs.submit(search_stations, query, subsystem='search', scope='search',
+                             on_done=self._show_search_results)
 
-    def _perform_search(self, query):
-        data = search_stations(query)
-        GLib.idle_add(self._populate_list, data)
+    def _show_search_results(self, stations):
+        self._populate_list(stations)
+        if self.health:
+            # Cancelled with the search if another one starts
+            self.health.probe([station_key(s) for s in stations], scope='search')
 
     def on_search_changed(self, entry):
         if not entry.get_text():
-            self._populate_list(self.favorites)
-
-    def load_favorites(self):
-        if os.path.exists(FAVORITES_FILE):
-             try: return json.load(open(FAVORITES_FILE))
-             except: pass
-        return []
-
-    def save_favorites(self):
-        json.dump(self.favorites, open(FAVORITES_FILE, "w"), indent=2)
+            self.jobs.cancel_scope('search')
+            self._populate_list(self.favorites.stations())
 
     def delete_favorite_direct(self, s):
-        self.favorites = [f for f in self.favorites if f['url_resolved'] != s['url_resolved']]
-        self.save_favorites()
+        url = station_key(s)
+        self.favorites.remove(url)
 
         if not self.search_entry.get_text():
-            self._populate_list(self.favorites)
+            self._populate_list(self.favorites.stations())
 
-        if self.current_station_data and self.current_station_data['url_resolved'] == s['url_resolved']:
-             self.check_is_favorite(s['url_resolved'])
+        if self.current_station_data and station_key(self.current_station_data) == url:
+             self.check_is_favorite(url)
 
     def on_volume_changed(self, scale):
         self.player.set_volume(scale.get_value())
 
+    def _set_current_track(self, text):
+        if text != self.current_track:
+            self.current_track = text
+            self.player.set_track_title(text)
+
+    def on_record_toggled(self, btn):
+        if not btn.get_active():
+            self.player.stop_recording()
+            return
+        name = self.current_station_data.get('name') if self.current_station_data else None
+        recorder = self.player.start_recording(name, self.current_track) if name else None
+        if recorder:
+            self._show_toast(f"Recording to {recorder.directory}")
+        else:
+            self._show_toast("This station can't be recorded")
+            btn.set_active(False)
+
+    def on_rewind_clicked(self, btn):
+        if self.current_station_data and self.player.rewind(30):
+            self.play_btn.set_icon_name("media-playback-pause-symbolic")
+
+    def on_live_clicked(self, btn):
+        if self.current_station_data and self.player.go_live():
+            self.play_btn.set_icon_name("media-playback-pause-symbolic")
+
     def on_add_custom_clicked(self, btn):
+        from src.ui.dialogs import AddStationDialog
         AddStationDialog(self, self.add_custom_station).present()
 
     def on_edit_clicked(self, station_data):
+        from src.ui.dialogs import AddStationDialog
         AddStationDialog(self, self.add_custom_station, station_data=station_data).present()
 
     def add_custom_station(self, data, old_data=None):
         if old_data:
-            # Update existing
-            for i, fav in enumerate(self.favorites):
-                if fav.get('url_resolved') == old_data.get('url_resolved'):
-                    self.favorites[i] = data
-                    break
+            self.favorites.replace(station_key(old_data), data)
         else:
-            self.favorites.append(data)
-            
-        self.save_favorites()
+            self.favorites.add(data)
+
+        # Expand playlists/redirects now so the first tune-in is direct
+        self.player.resolver.prefetch(data.get('url_resolved'))
+
         if not self.search_entry.get_text():
-            self._populate_list(self.favorites)
+            self._populate_list(self.favorites.stations())
         
         # If we updated the currently playing station, update the UI
         if self.current_station_data and old_data and self.current_station_data.get('url_resolved') == old_data.get('url_resolved'):
@@ -570,7 +752,13 @@ class MainWindow(Adw.ApplicationWindow):
     # Polling logic
     def _poll_tick(self):
         if self.current_station_data and self.is_azuracast:
-            threading.Thread(target=self._fetch_azuracast, args=(self.current_station_data['url_resolved'],), daemon=True).start()
+            self._request_azuracast()
+        return True
+
+    def _refresh_standby(self):
+        # The pool is otherwise only warmed on station changes
+        if self._player is not None:
+            self._player.refresh_standby()
         return True
 
     def on_mpv_discontinuity(self):
@@ -581,29 +769,41 @@ class MainWindow(Adw.ApplicationWindow):
     def _force_api_update(self):
         self._discontinuity_timer = None
         if self.current_station_data:
-             threading.Thread(target=self._fetch_azuracast, args=(self.current_station_data['url_resolved'],), daemon=True).start()
+             self._request_azuracast()
         return False
 
-    def _fetch_azuracast(self, url):
-        data = fetch_azuracast_nowplaying()
-        station_id = self.current_station_data.get('id')
+    def _request_azuracast(self):
+        self.jobs.submit(self._fetch_azuracast, self.current_station_data, self.tuned_url,
+                         subsystem='metadata', scope='station', on_done=self._on_azuracast_fetched)
+
+    def _fetch_azuracast(self, station, tuned_url):
+        # Runs on a job worker: works on the station it was started for
+        url = station['url_resolved']
+        station_id = station.get('id')
         if not station_id:
-            logger.warning(f"No Azuracast ID found for current station: {self.current_station_data.get('name')}")
-            return
+            logger.warning(f"No Azuracast ID found for current station: {station.get('name')}")
+            return None
 
-        for s in data:
-            if s.get('station', {}).get('id') == station_id:
-                np_song = s.get('now_playing', {}).get('song', {})
-                song_text = np_song.get('text')
-                art_url = np_song.get('art')
-                logger.debug(f"[_fetch_azuracast] Calling apply_azuracast_update with text='{song_text}', art='{art_url}'")
-                GLib.idle_add(self.apply_azuracast_update, song_text, art_url, url)
-                return
+        s = find_azuracast_station(fetch_azuracast_nowplaying(), station_id)
+        if not s:
+            return None
+
+        np_song = s.get('now_playing', {}).get('song', {})
+        return np_song.get('text'), np_song.get('art'), url, tuned_url, get_azuracast_mounts(s)
+
+    def _on_azuracast_fetched(self, update):
+        if update:
+            song_text, art_url, url, tuned_url, mounts = update
+            # May switch mounts, so it runs here on the main loop like every other player change
+            self.player.set_mounts(tuned_url, mounts)
+            logger.debug(f"[_on_azuracast_fetched] Calling apply_azuracast_update with text='{song_text}', art='{art_url}'")
+            self.apply_azuracast_update(song_text, art_url, url)
 
     def apply_azuracast_update(self, song_text, art_url, stream_url):
         logger.debug(f"[apply_azuracast_update] Received text='{song_text}', art='{art_url}' for stream='{stream_url}'")
         if song_text:
              self.track_label.set_label(song_text)
+             self._set_current_track(song_text)
         if self.current_station_data and self.current_station_data.get('url_resolved') == stream_url:
             target_art = art_url
             if not target_art:
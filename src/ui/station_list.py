@@ -0,0 +1,192 @@
+import logging
+from gi.repository import Gtk, Gio, GObject, Adw
+
+from src.core.favorites import station_key
+from src.ui.utils import load_image_into
+
+logger = logging.getLogger(__name__)
+
+ROW_ICON_SIZE = 24
+
+
+def _display(station):
+    # The fields a row shows; a change in any of them rebinds that row
+    return station.get('name'), station.get('favicon')
+
+
+class StationItem(GObject.Object):
+    """One sidebar entry. `station` is the favorites/search dict itself."""
+    def __init__(self, station):
+        super().__init__()
+        self.station = station
+        self.key = station_key(station)
+        self.shown = _display(station)
+
+
+class StationList(Gtk.ScrolledWindow):
+    """
+    Virtualized sidebar: a Gio.ListStore of StationItems shown through a
+    Gtk.ListView, which only creates rows for what is on screen and
+    recycles them while scrolling. set_stations() applies the difference
+    to what is already listed, keyed by station URL, so unchanged rows are
+    never rebuilt or rebound. With a StationHealth, dead and slow stations
+    are flagged and refresh() rebinds a row when its probe result arrives.
+    """
+    def __init__(self, on_activate, on_edit, on_delete, textures, health=None):
+        super().__init__()
+        self.health = health
+        self.set_vexpand(True)
+        self.on_activate = on_activate
+        self.on_edit = on_edit
+        self.on_delete = on_delete
+        self.textures = textures
+
+        self.store = Gio.ListStore(item_type=StationItem)
+        self._items = []  # mirrors the store, so diffs don't go through GObject
+        self._positions = {}
+
+        self.selection = Gtk.SingleSelection(model=self.store)
+        self.selection.set_autoselect(False)
+        self.selection.set_can_unselect(True)
+
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self._setup_row)
+        factory.connect("bind", self._bind_row)
+
+        self.view = Gtk.ListView(model=self.selection, factory=factory)
+        self.view.add_css_class("navigation-sidebar")
+        self.view.set_single_click_activate(True)
+        self.view.connect("activate", self._on_row_activated)
+        self.set_child(self.view)
+
+    # --- Rows ---
+    def _setup_row(self, factory, list_item):
+        row = Adw.ActionRow()
+        row.set_use_markup(False)
+
+        icon = Gtk.Image()
+        icon.set_pixel_size(ROW_ICON_SIZE)
+        row.add_prefix(icon)
+        row.icon = icon
+
+        edit_btn = Gtk.Button(icon_name="document-edit-symbolic")
+        edit_btn.add_css_class("flat")
+        edit_btn.connect("clicked", lambda b: self._call_with_station(list_item, self.on_edit))
+
+        del_btn = Gtk.Button(icon_name="user-trash-symbolic")
+        del_btn.add_css_class("flat")
+        del_btn.connect("clicked", lambda b: self._call_with_station(list_item, self.on_delete))
+
+        row.add_suffix(edit_btn)
+        row.add_suffix(del_btn)
+        list_item.set_child(row)
+
+    def _bind_row(self, factory, list_item):
+        item = list_item.get_item()
+        row = list_item.get_child()
+        name, favicon = item.shown
+        name = name or item.key
+
+        row.set_title(name)
+        subtitle, details = self._health_text(item.key)
+        row.set_subtitle(subtitle or "")
+        if subtitle and not details:
+            row.add_css_class("dim-label")
+        else:
+            row.remove_css_class("dim-label")
+        tooltip = "\n".join(t for t in (name if len(name) > 15 else None, details) if t)
+        row.set_tooltip_text(tooltip or None)
+
+        icon = row.icon
+        icon.favicon = favicon
+        icon.set_from_icon_name("audio-x-generic-symbolic")
+        if favicon:
+            # The row may be recycled for another station before this loads
+            load_image_into(favicon, icon, self.textures, size=ROW_ICON_SIZE,
+                            still_wanted=lambda: icon.favicon == favicon)
+
+    def _health_text(self, key):
+        """(subtitle flagging a problem, tooltip details of a healthy stream)"""
+        result = self.health.get(key) if self.health else None
+        if not result:
+            return None, None
+        if self.health.is_dead(key):
+            return f"Offline: {result['error']}", None
+        details = " · ".join(str(p) for p in (
+            (result['codec'] or '').upper() or None,
+            f"{result['bitrate']} kbps" if result['bitrate'] else None,
+            f"{result['ttfb_ms']} ms" if result['ttfb_ms'] is not None else None,
+        ) if p)
+        if self.health.is_slow(key):
+            return f"Slow to start ({result['ttfb_ms'] / 1000:.1f} s)", details
+        return None, details or None
+
+    def _call_with_station(self, list_item, callback):
+        item = list_item.get_item()
+        if item:
+            callback(item.station)
+
+    def _on_row_activated(self, view, position):
+        item = self.store.get_item(position)
+        if item:
+            self.on_activate(item.station)
+
+    # --- Model ---
+    def _splice(self, position, n_removals, items):
+        self.store.splice(position, n_removals, items)
+        self._items[position:position + n_removals] = items
+
+    def set_stations(self, stations):
+        """Makes the list show `stations`, touching only rows that differ."""
+        wanted = {}
+        for station in stations:
+            key = station_key(station)
+            if key and key not in wanted:
+                wanted[key] = station
+        order = list(wanted)
+
+        listed = {item.key for item in self._items}
+        kept = sum(1 for key in order if key in listed)
+        if kept * 2 < len(order) or kept * 2 < len(self._items):
+            # Mostly different (e.g. search results): swap the lot in one splice
+            self._splice(0, len(self._items), [StationItem(wanted[key]) for key in order])
+        else:
+            for i in range(len(self._items) - 1, -1, -1):
+                if self._items[i].key not in wanted:
+                    self._splice(i, 1, [])
+
+            for i, key in enumerate(order):
+                station = wanted[key]
+                current = self._items[i] if i < len(self._items) else None
+                if current is not None and current.key == key:
+                    if current.shown != _display(station):
+                        self._splice(i, 1, [StationItem(station)])
+                    else:
+                        current.station = station
+                    continue
+
+                moved = next((j for j in range(i + 1, len(self._items)) if self._items[j].key == key), None)
+                if moved is None:
+                    self._splice(i, 0, [StationItem(station)])
+                else:
+                    item = self._items[moved]
+                    self._splice(moved, 1, [])
+                    if item.shown != _display(station):
+                        item = StationItem(station)
+                    item.station = station
+                    self._splice(i, 0, [item])
+
+        self._positions = {item.key: i for i, item in enumerate(self._items)}
+
+    def refresh(self, key):
+        """Rebinds the row of key, e.g. after its health changed."""
+        position = self._positions.get(key)
+        if position is not None:
+            self.store.items_changed(position, 1, 1)
+
+    def neighbours(self, key):
+        """Stations listed right after and before key (most likely next picks)."""
+        position = self._positions.get(key)
+        if position is None:
+            return []
+        return [self._items[p].station for p in (position + 1, position - 1) if 0 <= p < len(self._items)]
@@ -1,38 +1,17 @@
 import urllib.request
-import threading
-import re
 import os
 from gi.repository import GdkPixbuf, Gdk, GLib, Gtk
 import logging
 
-logger = logging.getLogger(__name__)
+# Kept importable from here for the UI; the parser itself has no GTK dependency
+from src.core.metadata import clean_metadata_title
+from src.core.jobs import get_runner
 
-def clean_metadata_title(title_str):
-    """
-    Cleans up metadata strings that contain structured key-value pairs.
-    Example Input: 'Eagle-Eye Cherry - text="Save Tonight" song_spot="M" ...'
-    Example Output: 'Eagle-Eye Cherry - Save Tonight'
-    """
-    if not title_str:
-        return ""
+logger = logging.getLogger(__name__)
 
-    # Check for 'text="Title"' pattern
-    match = re.search(r'text="([^"]+)"', title_str)
-    if match:
-        extracted_title = match.group(1)
-        
-        # Check if there is an artist prefix before ' - text='
-        # We assume the separator is " - " before the structured part
-        parts = title_str.split(' - text=')
-        if len(parts) > 1:
-            artist = parts[0].strip()
-            return f"{artist} - {extracted_title}"
-        
-        # If no artist prefix, just return the title
-        return extracted_title
-        
-    return title_str
-def load_image_into(url, widget, loaded_textures_cache, size=None):
+def load_image_into(url, widget, loaded_textures_cache, size=None, still_wanted=None):
+    # still_wanted: optional callable; when it returns False by the time the
+    # image arrives (e.g. a recycled list row), the texture is only cached
     if not url:
         if isinstance(widget, Gtk.Picture):
             widget.set_paintable(None)
@@ -50,7 +29,7 @@ def load_image_into(url, widget, loaded_textures_cache, size=None):
                 if size:
                     pixbuf = pixbuf.scale_simple(size, size, GdkPixbuf.InterpType.BILINEAR)
                 texture = Gdk.Texture.new_for_pixbuf(pixbuf)
-                GLib.idle_add(_cache_and_set_generic, url, texture, widget, loaded_textures_cache)
+                GLib.idle_add(_cache_and_set_generic, url, texture, widget, loaded_textures_cache, still_wanted)
                 return
 
             # Handle remote URLs
@@ -76,15 +55,17 @@ def load_image_into(url, widget, loaded_textures_cache, size=None):
                 pixbuf = pixbuf.scale_simple(size, size, GdkPixbuf.InterpType.BILINEAR)
 
             texture = Gdk.Texture.new_for_pixbuf(pixbuf)
-            GLib.idle_add(_cache_and_set_generic, url, texture, widget, loaded_textures_cache)
+            GLib.idle_add(_cache_and_set_generic, url, texture, widget, loaded_textures_cache, still_wanted)
         except Exception as e:
             logger.warning(f"Failed to load image {url}: {e}")
             pass
 
-    threading.Thread(target=worker, daemon=True).start()
+    get_runner().submit(worker, subsystem='art')
 
-def _cache_and_set_generic(url, texture, widget, cache):
+def _cache_and_set_generic(url, texture, widget, cache, still_wanted=None):
     cache[url] = texture
+    if still_wanted and not still_wanted():
+        return
     try:
         _set_texture(widget, texture)
     except:
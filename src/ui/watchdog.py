@@ -0,0 +1,247 @@
+"""
+Main-loop stall watchdog for CYBER_MAINLOOP_PROFILE=1 / --profile-mainloop.
+
+install() wraps GLib.idle_add, timeout_add, timeout_add_seconds, widget
+tick callbacks and GObject signal handlers, so every callback the main
+loop runs is timed. A callback over the frame budget is logged with the
+main thread's stack as sampled by a watchdog thread while it was still
+running (so the stack shows where the time went, not just who was
+called). Per-callback histograms are written to MAINLOOP_PROFILE_FILE
+and summarized in the log at exit.
+"""
+import os
+import sys
+import json
+import time
+import atexit
+import inspect
+import logging
+import functools
+import threading
+import traceback
+
+from src.config import FRAME_BUDGET_MS, MAINLOOP_PROFILE_FILE
+from src.core.metrics import Histogram
+from src.core.favorites import write_atomic
+
+logger = logging.getLogger(__name__)
+
+BUCKETS_MS = (1, 2, 4, 8, 16, 33, 50, 100, 250, 500, 1000, 5000)
+# A stall still going on after this long is logged right away, in case it never ends
+HANG_SECONDS = 1.0
+# Callbacks listed in the exit summary
+REPORT_TOP = 15
+
+
+def _describe(fn):
+    while isinstance(fn, functools.partial):
+        fn = fn.func
+    try:
+        # JobRunner's dispatch closures are functools.wraps'd around the real callback
+        fn = inspect.unwrap(fn)
+    except ValueError:
+        pass
+    name = getattr(fn, '__qualname__', None) or type(fn).__qualname__
+    if '<locals>' in name or '<lambda>' in name:
+        code = getattr(fn, '__code__', None)
+        if code is not None:
+            name += f":{code.co_firstlineno}"
+    module = getattr(fn, '__module__', None)
+    return f"{module}.{name}" if module else name
+
+
+class _Timed:
+    """A callback that reports its run time. Compares equal to the callback, so disconnect_by_func still works."""
+    __slots__ = ('watchdog', 'name', 'fn')
+
+    def __init__(self, watchdog, name, fn):
+        self.watchdog = watchdog
+        self.name = name
+        self.fn = fn
+
+    def __call__(self, *args):
+        return self.watchdog.run(self.name, self.fn, args)
+
+    def __eq__(self, other):
+        return self.fn == (other.fn if isinstance(other, _Timed) else other)
+
+    def __hash__(self):
+        return hash(self.fn)
+
+
+class Watchdog:
+    def __init__(self, budget_ms=FRAME_BUDGET_MS, path=MAINLOOP_PROFILE_FILE):
+        self.budget = budget_ms / 1000
+        self.path = path
+        self.timings = {}  # callback name -> Histogram (ms)
+        self.worst = {}  # callback name -> longest run (ms)
+        self.over_budget = {}  # callback name -> runs over budget
+        self._lock = threading.Lock()
+        # install() runs on the main thread
+        self._main = threading.get_ident()
+        self._depth = 0
+        self._token = 0
+        self._current = None  # (name, started, token) of the outermost running callback
+        self._sampled = (None, None)  # (token, stack) taken by the watchdog thread
+        self._hang_logged = None
+        self._last_stack = {}  # callback name -> last logged stack
+        self._busy = threading.Event()
+        threading.Thread(target=self._watch, name="cyberradio-watchdog", daemon=True).start()
+        atexit.register(self.flush)
+        atexit.register(self.report)
+
+    def wrap(self, kind, fn):
+        if not callable(fn) or isinstance(fn, _Timed):
+            return fn
+        return _Timed(self, f"{kind} {_describe(fn)}", fn)
+
+    def run(self, name, fn, args):
+        if threading.get_ident() != self._main:
+            return fn(*args)
+        outermost = self._depth == 0
+        self._depth += 1
+        started = time.perf_counter()
+        if outermost:
+            self._token += 1
+            token = self._token
+            self._current = (name, started, token)
+            self._busy.set()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            self._depth -= 1
+            if outermost:
+                self._current = None
+                self._busy.clear()
+            self._record(name, elapsed)
+            # Nested handlers (a signal emitted from a callback) are counted
+            # but only the outermost is logged; its stack shows the nesting
+            if outermost and elapsed > self.budget:
+                self._log_slow(name, elapsed, token)
+
+    def _record(self, name, elapsed):
+        ms = elapsed * 1000
+        with self._lock:
+            histogram = self.timings.get(name)
+            if histogram is None:
+                histogram = self.timings[name] = Histogram(BUCKETS_MS)
+            histogram.observe(ms)
+            if ms > self.worst.get(name, 0):
+                self.worst[name] = ms
+            if elapsed > self.budget:
+                self.over_budget[name] = self.over_budget.get(name, 0) + 1
+
+    def _log_slow(self, name, elapsed, token):
+        sampled_token, stack = self._sampled
+        if sampled_token != token:
+            stack = None
+        if stack is None:
+            detail = "  (finished before a stack was sampled)"
+        elif stack == self._last_stack.get(name):
+            detail = "  (same stack as last time)"
+        else:
+            self._last_stack[name] = stack
+            detail = stack
+        logger.warning(f"Main loop callback over budget: {name} took {elapsed * 1000:.1f} ms\n{detail}")
+
+    # --- Watchdog thread ---
+    def _stack(self):
+        frame = sys._current_frames().get(self._main)
+        if frame is None:
+            return None
+        frames = [f for f in traceback.extract_stack(frame) if f.filename != __file__]
+        return "".join(traceback.format_list(frames)).rstrip()
+
+    def _watch(self):
+        while True:
+            self._busy.wait()
+            time.sleep(self.budget / 2)
+            current = self._current
+            if current is None:
+                continue
+            name, started, token = current
+            running = time.perf_counter() - started
+            if running >= self.budget and self._sampled[0] != token:
+                stack = self._stack()
+                # Only keep it if the same callback is still the one running
+                if self._current is current:
+                    self._sampled = (token, stack)
+            if running >= HANG_SECONDS and self._hang_logged != token:
+                self._hang_logged = token
+                logger.warning(f"Main loop blocked for {running:.1f}s in {name}\n{self._stack() or ''}")
+
+    # --- Export ---
+    def snapshot(self):
+        with self._lock:
+            callbacks = {
+                name: {**h.to_dict(), "max_ms": round(self.worst[name], 3),
+                       "over_budget": self.over_budget.get(name, 0)}
+                for name, h in self.timings.items()
+            }
+        ordered = sorted(callbacks.items(), key=lambda item: item[1]["sum"], reverse=True)
+        return {"budget_ms": self.budget * 1000, "callbacks": dict(ordered)}
+
+    def flush(self):
+        try:
+            write_atomic(self.path, json.dumps(self.snapshot(), indent=2))
+        except Exception as e:
+            logger.warning(f"Failed to write main loop profile: {e}")
+
+    def report(self):
+        """Logs the callbacks with the most main-loop time."""
+        callbacks = list(self.snapshot()["callbacks"].items())[:REPORT_TOP]
+        if not callbacks:
+            return
+        lines = [f"  {'total ms':>10} {'calls':>7} {'max ms':>8} {'slow':>5}  callback"]
+        for name, stats in callbacks:
+            lines.append(f"  {stats['sum']:10.1f} {stats['count']:7} {stats['max_ms']:8.1f} {stats['over_budget']:5}  {name}")
+        logger.info("Main loop time by callback:\n" + "\n".join(lines) + f"\nFull histograms: {self.path}")
+
+
+_watchdog = None
+
+
+def install(budget_ms=FRAME_BUDGET_MS, path=MAINLOOP_PROFILE_FILE):
+    """Starts timing main loop callbacks. Call on the main thread before the UI is built."""
+    global _watchdog
+    if _watchdog is not None:
+        return _watchdog
+    from gi.repository import GLib, GObject, Gtk
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    watchdog = _watchdog = Watchdog(budget_ms, path)
+
+    idle_add = GLib.idle_add
+    timeout_add = GLib.timeout_add
+    timeout_add_seconds = GLib.timeout_add_seconds
+    connect = GObject.Object.connect
+    connect_after = GObject.Object.connect_after
+    add_tick_callback = Gtk.Widget.add_tick_callback
+
+    def timed_idle_add(function, *args, **kwargs):
+        return idle_add(watchdog.wrap("idle", function), *args, **kwargs)
+
+    def timed_timeout_add(interval, function, *args, **kwargs):
+        return timeout_add(interval, watchdog.wrap("timeout", function), *args, **kwargs)
+
+    def timed_timeout_add_seconds(interval, function, *args, **kwargs):
+        return timeout_add_seconds(interval, watchdog.wrap("timeout", function), *args, **kwargs)
+
+    def timed_connect(obj, signal, handler, *args):
+        return connect(obj, signal, watchdog.wrap(f"{type(obj).__name__}::{signal}", handler), *args)
+
+    def timed_connect_after(obj, signal, handler, *args):
+        return connect_after(obj, signal, watchdog.wrap(f"{type(obj).__name__}::{signal}", handler), *args)
+
+    def timed_add_tick_callback(widget, callback, *args):
+        return add_tick_callback(widget, watchdog.wrap("tick", callback), *args)
+
+    GLib.idle_add = timed_idle_add
+    GLib.timeout_add = timed_timeout_add
+    GLib.timeout_add_seconds = timed_timeout_add_seconds
+    GObject.Object.connect = timed_connect
+    GObject.Object.connect_after = timed_connect_after
+    Gtk.Widget.add_tick_callback = timed_add_tick_callback
+    logger.info(f"Main loop profiling on: callbacks over {budget_ms:g} ms are logged")
+    return watchdog
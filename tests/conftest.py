@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+# Run from anywhere: the tests import the app as `src`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Seconds a test waits on a background thread before failing
+TIMEOUT = 5
+# The real clock, for waiting while a test has time.monotonic faked
+_monotonic = time.monotonic
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replaces time.monotonic with a clock that only moves when the test sets `now`."""
+    clock = FakeClock()
+    monkeypatch.setattr(time, "monotonic", clock)
+    return clock
+
+
+def wait_for(condition, timeout=TIMEOUT):
+    deadline = _monotonic() + timeout
+    while not condition():
+        assert _monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+class Upstream(BaseHTTPRequestHandler):
+    """An ICY stream: 16 audio bytes, then a metadata block, three times."""
+    content_type = "audio/mpeg"
+    metaint = 16
+    blocks = [(b"A" * 16, b"StreamTitle='One';"), (b"B" * 16, b""), (b"C" * 16, b"StreamTitle='Two';")]
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", self.content_type)
+        self.send_header("icy-metaint", str(self.metaint))
+        self.end_headers()
+        for audio, meta in self.blocks:
+            meta += b"\0" * (-len(meta) % 16)
+            self.wfile.write(audio + bytes([len(meta) // 16]) + meta)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    """Starts a local server for an Upstream handler class and returns its URL."""
+    # Servers run on daemon threads until the session ends; shutdown() would
+    # wait out the serve_forever poll interval for every test
+    def serve(handler=Upstream):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{server.server_address[1]}/live"
+
+    return serve
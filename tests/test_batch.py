@@ -0,0 +1,70 @@
+import pytest
+
+from src.core.batch import merge_matches, format_timestamp
+
+WINDOW = 12
+STEP = 30
+
+
+def song(title, artist="Artist"):
+    return {'artist': artist, 'title': title, 'shazam_url': f"https://shazam.example/{title}"}
+
+
+def windows(*results):
+    """(offset, result) pairs for windows every STEP seconds."""
+    return [(n * STEP, result) for n, result in enumerate(results)]
+
+
+def summary(tracklist):
+    return [(t['title'], t['start'], t['end'], t['windows']) for t in tracklist]
+
+
+@pytest.mark.parametrize("seconds, text", [(0, "00:00:00"), (59.9, "00:00:59"), (3725, "01:02:05")])
+def test_format_timestamp(seconds, text):
+    assert format_timestamp(seconds) == text
+
+
+def test_adjacent_windows_of_one_song_merge():
+    tracklist = merge_matches(windows(song("A"), song("A"), song("A"), song("B")), WINDOW, max_gap=STEP)
+    assert summary(tracklist) == [("A", 0, 72, 3), ("B", 90, 102, 1)]
+    first = tracklist[0]
+    assert first['timestamp'] == "00:00:00"
+    assert first['shazam_url'] == "https://shazam.example/A"
+    assert 'key' not in first
+
+
+def test_results_are_merged_in_time_order():
+    shuffled = windows(song("A"), song("A"), song("B"))[::-1]
+    assert summary(merge_matches(shuffled, WINDOW, max_gap=STEP)) == [("A", 0, 42, 2), ("B", 60, 72, 1)]
+
+
+def test_short_gaps_are_bridged():
+    results = windows(song("A"), None, song("A"))
+    assert summary(merge_matches(results, WINDOW, max_gap=2 * STEP)) == [("A", 0, 72, 2)]
+
+
+def test_long_gaps_split_the_song():
+    results = windows(song("A"), None, None, song("A"))
+    assert summary(merge_matches(results, WINDOW, max_gap=2 * STEP)) == [("A", 0, 12, 1), ("A", 90, 102, 1)]
+
+
+def test_gap_is_measured_from_the_end_of_the_last_match():
+    results = windows(song("A"), song("A"))
+    # 30 - 12 = 18 seconds apart
+    assert len(merge_matches(results, WINDOW, max_gap=18)) == 1
+    assert len(merge_matches(results, WINDOW, max_gap=17)) == 2
+
+
+def test_alternating_matches_stay_separate():
+    results = windows(song("A"), song("B"), song("A"), song("B"))
+    assert [t['title'] for t in merge_matches(results, WINDOW, max_gap=10 * STEP)] == ["A", "B", "A", "B"]
+
+
+def test_same_title_by_another_artist_is_another_song():
+    results = windows(song("Intro", "One"), song("Intro", "Two"))
+    assert [t['artist'] for t in merge_matches(results, WINDOW, max_gap=STEP)] == ["One", "Two"]
+
+
+def test_nothing_identified():
+    assert merge_matches(windows(None, {}, None), WINDOW, max_gap=STEP) == []
+    assert merge_matches([], WINDOW, max_gap=STEP) == []
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("cairo")
+
+from src.drawing import SpectrumDrawing
+
+
+def test_bars_follow_bands_of_the_same_count():
+    spectrum = SpectrumDrawing(4)
+    spectrum.update(True, [0.1, 0.5, 0.9, 0.3])
+    assert np.allclose(spectrum.values, [0.1, 0.5, 0.9, 0.3])
+
+
+def test_coarse_bands_are_interpolated_onto_more_bars():
+    spectrum = SpectrumDrawing(128)
+    bands = np.linspace(0.1, 0.8, 28)
+    spectrum.update(True, bands)
+    values = spectrum.values
+    assert len(values) == 128
+    assert np.all(np.diff(values) >= 0)
+    # Bars outside the first/last band centre hold that band's level
+    assert values[0] == pytest.approx(0.1)
+    assert values[-1] == pytest.approx(0.8)
+
+
+def test_bars_between_band_centres_blend_them():
+    spectrum = SpectrumDrawing(4)
+    spectrum.update(True, [0.0, 1.0])
+    assert spectrum.values == pytest.approx([0.0, 0.25, 0.75, 1.0])
+
+
+def test_more_bands_than_bars_still_track_the_spectrum():
+    spectrum = SpectrumDrawing(7)
+    spectrum.update(True, np.repeat([0.2, 0.9], 14))
+    assert spectrum.values[0] == pytest.approx(0.2)
+    assert spectrum.values[-1] == pytest.approx(0.9)
+
+
+def test_bars_fall_with_gravity_but_not_below_the_band():
+    spectrum = SpectrumDrawing(2)
+    spectrum.update(True, [1.0, 1.0])
+    spectrum.update(True, [0.0, 0.995])
+    assert spectrum.values == pytest.approx([0.99, 0.995])
+    spectrum.update(True, [0.0, 0.0])
+    # Velocity builds up tick by tick
+    assert spectrum.values[0] == pytest.approx(0.99 - 0.02)
+
+
+def test_bars_decay_when_stopped():
+    spectrum = SpectrumDrawing(3)
+    spectrum.update(True, [0.1, 0.5, 1.0])
+    for _ in range(3):
+        spectrum.update(False)
+    assert spectrum.values == pytest.approx([0.0, 0.35, 0.85])
+
+
+def test_idle_animation_stays_in_range():
+    spectrum = SpectrumDrawing(64)
+    for _ in range(500):
+        spectrum.update(True)
+        assert np.all((spectrum.values >= 0) & (spectrum.values <= 1))
@@ -0,0 +1,118 @@
+import json
+import os
+
+import pytest
+
+from src.core.favorites import FavoritesStore, station_key, write_atomic
+
+
+def station(n, **fields):
+    return {'name': f"Station {n}", 'url': f"http://s{n}.example/pls", 'url_resolved': f"http://s{n}.example/live", **fields}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "favorites.json")
+
+
+@pytest.fixture
+def store(path):
+    # A long delay: saves only happen on flush() in these tests
+    return FavoritesStore(path, save_delay=60)
+
+
+def saved(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def test_station_key_prefers_the_resolved_url():
+    assert station_key(station(1)) == "http://s1.example/live"
+    assert station_key({'url': "http://a"}) == "http://a"
+    assert station_key({}) is None
+
+
+def test_write_atomic_replaces_without_leftovers(tmp_path):
+    target = tmp_path / "data.json"
+    write_atomic(str(target), "one")
+    write_atomic(str(target), "two")
+    assert target.read_text() == "two"
+    assert os.listdir(tmp_path) == ["data.json"]
+
+
+def test_add_remove_and_lookup(store):
+    assert store.add(station(1))
+    assert not store.add(station(1))
+    assert not store.add({'name': "No URL"})
+    assert store.add(station(2))
+    assert "http://s1.example/live" in store
+    assert len(store) == 2
+    assert [s['name'] for s in store] == ["Station 1", "Station 2"]
+    assert store.remove("http://s1.example/live")['name'] == "Station 1"
+    assert store.remove("http://s1.example/live") is None
+    assert store.get("http://s2.example/live")['name'] == "Station 2"
+
+
+def test_edits_are_saved_together_on_flush(store, path):
+    store.add(station(1))
+    store.add(station(2))
+    assert not os.path.exists(path)
+    store.flush()
+    assert [s['name'] for s in saved(path)] == ["Station 1", "Station 2"]
+
+
+def test_debounced_save(path):
+    store = FavoritesStore(path, save_delay=0.05)
+    store.add(station(1))
+    store._timer.join(1)
+    assert len(saved(path)) == 1
+    assert store._timer is None
+
+
+def test_replace_keeps_the_position(store):
+    for n in range(3):
+        store.add(station(n))
+    moved = {'name': "Renamed", 'url': "http://new.example/live"}
+    store.replace("http://s1.example/live", moved)
+    assert [s['name'] for s in store] == ["Station 0", "Renamed", "Station 2"]
+    assert "http://s1.example/live" not in store
+    assert store.get("http://new.example/live") is moved
+
+
+def test_replace_onto_an_existing_url_drops_the_duplicate(store):
+    for n in range(3):
+        store.add(station(n))
+    store.replace("http://s0.example/live", station(2, name="Merged"))
+    assert [s['name'] for s in store] == ["Merged", "Station 1"]
+
+
+def test_update_returns_a_new_dict(store):
+    store.add(station(1))
+    snapshot = store.stations()
+    updated = store.update("http://s1.example/live", play_count=3)
+    assert updated['play_count'] == 3
+    assert 'play_count' not in snapshot[0]
+    assert store.update("http://missing", play_count=1) is None
+
+
+def test_load_skips_duplicates_and_keyless_entries(path):
+    with open(path, "w") as f:
+        json.dump([station(1), station(1, name="Dup"), {'name': "Broken"}, station(2)], f)
+    store = FavoritesStore(path)
+    assert [s['name'] for s in store] == ["Station 1", "Station 2"]
+
+
+def test_corrupt_file_loads_empty(path):
+    with open(path, "w") as f:
+        f.write("{not json")
+    assert len(FavoritesStore(path)) == 0
+
+
+def test_failed_save_stays_dirty(store, path, monkeypatch):
+    store.add(station(1))
+    monkeypatch.setattr("src.core.favorites.write_atomic", lambda *args: (_ for _ in ()).throw(OSError("disk full")))
+    store.flush()
+    assert store._dirty
+    monkeypatch.undo()
+    store.flush()
+    assert len(saved(path)) == 1
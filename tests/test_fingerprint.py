@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from src.core import fingerprint
+from src.core.fingerprint import FingerprintIndex, SAMPLE_RATE
+
+
+def synthetic_song(seed, seconds=30):
+    """A melody of random three-tone chords, changing every 100 ms."""
+    rng = np.random.default_rng(seed)
+    step = SAMPLE_RATE // 10
+    t = np.arange(step) / SAMPLE_RATE
+    notes = []
+    for _ in range(seconds * 10):
+        freqs = rng.uniform(100, 3500, 3)
+        notes.append(sum(np.sin(2 * np.pi * f * t) for f in freqs) / 3)
+    return np.concatenate(notes).astype(np.float32)
+
+
+@pytest.fixture
+def songs(monkeypatch):
+    audio = {f"/music/Artist {i} - Song {i}.mp3": synthetic_song(i) for i in range(3)}
+    monkeypatch.setattr(fingerprint, "decode_audio", lambda path, *args: audio.get(path))
+    monkeypatch.setattr(fingerprint, "read_tags", lambda path: {'title': path.split(" - ")[1][:-4],
+                                                                'artist': path.split(" - ")[0][7:]})
+    return audio
+
+
+@pytest.fixture
+def index(tmp_path, songs):
+    index = FingerprintIndex(str(tmp_path))
+    for path in songs:
+        assert index.add_file(path)
+    index.save()
+    return index
+
+
+def test_matches_a_noisy_excerpt(index, songs):
+    song = songs["/music/Artist 1 - Song 1.mp3"]
+    clip = song[12 * SAMPLE_RATE:22 * SAMPLE_RATE]
+    clip = clip + np.random.default_rng(9).normal(0, 0.1, len(clip)).astype(np.float32)
+
+    match = index.match_samples(clip)
+    assert match is not None
+    assert (match['artist'], match['title']) == ("Artist 1", "Song 1")
+    assert match['score'] >= fingerprint.MIN_ALIGNED_HITS
+
+
+def test_unknown_audio_does_not_match(index):
+    assert index.match_samples(synthetic_song(99, seconds=10)) is None
+
+
+def test_silence_and_short_input_do_not_match(index):
+    assert index.match_samples(np.zeros(10 * SAMPLE_RATE, np.float32)) is None
+    assert index.match_samples(np.zeros(100, np.float32)) is None
+    assert index.match_samples(None) is None
+
+
+def test_empty_index_matches_nothing(tmp_path, songs):
+    index = FingerprintIndex(str(tmp_path))
+    assert len(index) == 0
+    assert index.match_samples(songs["/music/Artist 0 - Song 0.mp3"]) is None
+
+
+def test_saved_index_reloads_sorted(tmp_path, index, songs):
+    reloaded = FingerprintIndex(str(tmp_path))
+    assert len(reloaded) == 3
+    assert np.all(np.diff(np.asarray(reloaded.hashes, dtype=np.int64)) >= 0)
+    assert len(reloaded.hashes) == len(reloaded.track_ids) == len(reloaded.offsets)
+    match = reloaded.match_samples(songs["/music/Artist 2 - Song 2.mp3"][:10 * SAMPLE_RATE])
+    assert match['title'] == "Song 2"
+
+
+def test_ingest_skips_known_files(tmp_path, monkeypatch):
+    music = tmp_path / "music"
+    (music / "album").mkdir(parents=True)
+    for name in ("one.mp3", "album/two.flac", "cover.jpg"):
+        (music / name).write_bytes(b"")
+    decoded = []
+
+    def decode(path, *args):
+        decoded.append(path)
+        return synthetic_song(len(decoded), seconds=5)
+
+    monkeypatch.setattr(fingerprint, "decode_audio", decode)
+    monkeypatch.setattr(fingerprint, "read_tags", lambda path: {'title': path, 'artist': "Unknown"})
+    index = FingerprintIndex(str(tmp_path / "index"))
+    assert index.ingest_directory(str(music)) == 2
+    assert sorted(decoded) == sorted(str(music / name) for name in ("one.mp3", "album/two.flac"))
+
+    # Reloaded from disk, as on the next run: nothing is fingerprinted twice
+    decoded.clear()
+    index = FingerprintIndex(str(tmp_path / "index"))
+    (music / "three.ogg").write_bytes(b"")
+    assert index.ingest_directory(str(music)) == 1
+    assert decoded == [str(music / "three.ogg")]
+    assert len(index) == 3
+
+
+def test_failed_load_resets_every_array(tmp_path, index):
+    (tmp_path / "offsets.npy").write_bytes(b"not an array")
+    index.load()
+    assert index.tracks == []
+    for name in ('hashes', 'track_ids', 'offsets'):
+        assert len(getattr(index, name)) == 0
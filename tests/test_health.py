@@ -0,0 +1,38 @@
+import pytest
+
+from src.core.health import sniff_codec, _bitrate
+
+
+@pytest.mark.parametrize("data, content_type, codec", [
+    (b'fLaC\x00\x00\x00\x22', None, 'flac'),
+    (b'OggS\x00\x02' + b'\x00' * 20 + b'OpusHead', None, 'opus'),
+    (b'OggS\x00\x02' + b'\x00' * 20 + b'\x7fFLAC', None, 'flac'),
+    (b'OggS\x00\x02' + b'\x00' * 20 + b'\x01vorbis', None, 'vorbis'),
+    (b'ID3\x04\x00', 'audio/aac', 'mp3'),
+    (b'#EXTM3U\n#EXT-X-VERSION:3', None, 'hls'),
+    (b'\xff\xf1\x50\x80', None, 'aac'),  # ADTS, MPEG-4
+    (b'\xff\xf9\x50\x80', None, 'aac'),  # ADTS, MPEG-2
+    (b'\xff\xfb\x90\x64', None, 'mp3'),  # MPEG-1 layer III
+    (b'\xff\xf3\x90\x64', None, 'mp3'),  # MPEG-2 layer III
+    (b'<html>', 'audio/aacp', 'aac'),
+    (b'', 'application/ogg', 'ogg'),
+    (b'\xff', 'audio/mpeg', 'mp3'),
+    (b'<html>', 'text/html', None),
+    (b'', None, None),
+])
+def test_sniff_codec(data, content_type, codec):
+    assert sniff_codec(data, content_type) == codec
+
+
+@pytest.mark.parametrize("headers, kbps", [
+    ({'icy-br': '128'}, 128),
+    ({'icy-br': '128,128'}, 128),
+    ({'ice-audio-info': 'ice-samplerate=44100;ice-bitrate=192;ice-channels=2'}, 192),
+    ({'ice-audio-info': 'channels=2; bitrate=64'}, 64),
+    ({'icy-br': '96', 'ice-audio-info': 'ice-bitrate=192'}, 96),
+    ({'icy-br': 'high'}, None),
+    ({'ice-audio-info': 'ice-samplerate=44100'}, None),
+    ({}, None),
+])
+def test_bitrate(headers, kbps):
+    assert _bitrate(headers) == kbps
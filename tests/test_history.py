@@ -0,0 +1,106 @@
+import csv
+import json
+
+import pytest
+
+from src.core import history
+from src.core.history import SongHistory, FIELDS, _fts_query
+
+
+@pytest.fixture(params=[True, False], ids=["fts", "like"])
+def songs(request, tmp_path, monkeypatch):
+    if not request.param:
+        # As on SQLite builds without FTS5
+        monkeypatch.setattr(history, "FTS_SCHEMA", "CREATE VIRTUAL TABLE songs_fts USING no_such_module(x);")
+    db = SongHistory(str(tmp_path / "history.db"))
+    assert db.fts == request.param
+    yield db
+    db.close()
+
+
+def add(db, n, **fields):
+    fields = {'title': f"Title {n}", 'artist': f"Artist {n}", 'station': "Radio", **fields}
+    return db.add(**fields)
+
+
+def test_fts_query_quotes_every_word():
+    assert _fts_query('daft "punk') == '"daft"* "punk"*'
+    assert _fts_query("  ") == ""
+
+
+def test_pages_are_newest_first(songs):
+    ids = [add(songs, n) for n in range(5)]
+    page = songs.page(0, 3)
+    assert [s['id'] for s in page] == ids[::-1][:3]
+    assert [s['id'] for s in songs.page(3, 3)] == ids[1::-1]
+    assert set(page[0]) == set(FIELDS)
+
+
+def test_search_and_count(songs):
+    add(songs, 1, artist="Daft Punk", title="One More Time")
+    add(songs, 2, artist="Punk Rockers", station="Punk FM")
+    add(songs, 3, title="Quiet Song", station="Chill")
+    assert songs.count() == 3
+    assert songs.count("punk") == 2
+    assert songs.count("daft pu") == 1
+    assert songs.count("chill") == 1
+    assert songs.count("nothing") == 0
+    if songs.fts:
+        # Nothing left to search for once quotes are stripped
+        assert songs.count('"') == 3
+    assert [s['artist'] for s in songs.page(0, 10, "punk")] == ["Punk Rockers", "Daft Punk"]
+
+
+def test_removed_songs_leave_the_search(songs):
+    song = add(songs, 1, artist="Daft Punk")
+    songs.remove(song)
+    assert songs.count() == 0
+    assert songs.count("daft") == 0
+
+
+def test_iter_songs_pages_through_everything(songs):
+    ids = [add(songs, n) for n in range(12)]
+    assert [s['id'] for s in songs.iter_songs(batch=5)] == ids[::-1]
+    assert list(songs.iter_songs("missing", batch=5)) == []
+
+
+def test_iter_songs_is_stable_while_adding(songs):
+    for n in range(10):
+        add(songs, n)
+    seen = []
+    for song in songs.iter_songs(batch=3):
+        seen.append(song['id'])
+        if len(seen) == 4:
+            # Newer than the cursor: not part of this pass
+            add(songs, 99)
+    assert len(seen) == 10 == len(set(seen))
+
+
+def test_exports(songs, tmp_path):
+    for n in range(3):
+        add(songs, n, title=f'Say "{n}", again')
+    csv_path, json_path = tmp_path / "songs.csv", tmp_path / "songs.json"
+
+    assert songs.export_csv(str(csv_path)) == 3
+    with open(csv_path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [r['title'] for r in rows] == ['Say "2", again', 'Say "1", again', 'Say "0", again']
+
+    assert songs.export_json(str(json_path), query="2") == 1
+    assert [s['title'] for s in json.loads(json_path.read_text())] == ['Say "2", again']
+
+
+def test_empty_json_export_is_valid(songs, tmp_path):
+    path = tmp_path / "empty.json"
+    assert songs.export_json(str(path)) == 0
+    assert json.loads(path.read_text()) == []
+
+
+def test_history_survives_reopening(tmp_path):
+    path = str(tmp_path / "history.db")
+    db = SongHistory(path)
+    add(db, 1, artist="Daft Punk")
+    db.close()
+    db = SongHistory(path)
+    assert db.count("daft") == 1
+    db.close()
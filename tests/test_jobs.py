@@ -0,0 +1,131 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+from src.core import jobs
+from src.core.jobs import JobRunner
+from conftest import TIMEOUT, wait_for
+
+
+class Queue:
+    """Holds dispatched callbacks until run() is called, like a busy main loop."""
+    def __init__(self):
+        self.pending = []
+        self._lock = threading.Lock()
+
+    def __call__(self, fn, *args):
+        with self._lock:
+            self.pending.append((fn, args))
+
+    def run(self):
+        with self._lock:
+            pending, self.pending = self.pending, []
+        for fn, args in pending:
+            fn(*args)
+
+
+@pytest.fixture
+def queue():
+    return Queue()
+
+
+@pytest.fixture
+def runner(queue):
+    runner = JobRunner(dispatch=queue, workers=4)
+    yield runner
+    runner.shutdown()
+
+
+def test_submit_returns_a_future_and_dispatches_on_done(runner, queue):
+    done = []
+    future = runner.submit(lambda a, b: a + b, 2, 3, on_done=done.append)
+    assert future.result(TIMEOUT) == 5
+    assert done == []
+    wait_for(lambda: queue.pending)
+    queue.run()
+    assert done == [5]
+
+
+def test_spawn_runs_a_coroutine(runner, queue):
+    async def double(x):
+        await asyncio.sleep(0)
+        return x * 2
+    assert runner.spawn(double, 21).result(TIMEOUT) == 42
+
+
+def test_errors_go_to_on_error(runner, queue):
+    errors = []
+    def fail():
+        raise ValueError("boom")
+    assert runner.submit(fail, on_error=errors.append).result(TIMEOUT) is None
+    wait_for(lambda: queue.pending)
+    queue.run()
+    assert [str(e) for e in errors] == ["boom"]
+
+
+def test_cancel_scope_drops_queued_callbacks(runner, queue):
+    done = []
+    runner.submit(lambda: "old", scope="station", on_done=done.append).result(TIMEOUT)
+    runner.submit(lambda: "other", scope="other", on_done=done.append).result(TIMEOUT)
+    runner.submit(lambda: "free", on_done=done.append).result(TIMEOUT)
+    wait_for(lambda: len(queue.pending) == 3)
+    # Finished, but its callback hasn't reached the main loop yet
+    runner.cancel_scope("station")
+    queue.run()
+    assert sorted(done) == ["free", "other"]
+
+
+def test_cancel_scope_cancels_running_jobs(runner, queue):
+    started, release, done = threading.Event(), threading.Event(), []
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(TIMEOUT)
+        return "late"
+
+    def blocking():
+        started.set()
+        release.wait(TIMEOUT)
+        return "dropped"
+
+    coro_future = runner.spawn(slow, scope="station", on_done=done.append)
+    started.wait(TIMEOUT)
+    started.clear()
+    thread_future = runner.submit(blocking, scope="station", on_done=done.append)
+    started.wait(TIMEOUT)
+    runner.cancel_scope("station")
+    release.set()
+    for future in (coro_future, thread_future):
+        wait_for(future.done)
+        assert future.cancelled()
+    queue.run()
+    assert done == []
+
+
+def test_scope_runs_again_after_cancel(runner, queue):
+    done = []
+    runner.cancel_scope("station")
+    runner.submit(lambda: "new", scope="station", on_done=done.append).result(TIMEOUT)
+    wait_for(lambda: queue.pending)
+    queue.run()
+    assert done == ["new"]
+
+
+def test_subsystem_limit(runner, queue, monkeypatch):
+    monkeypatch.setitem(jobs.LIMITS, 'test', 2)
+    lock, running, peak = threading.Lock(), [0], [0]
+
+    def work():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+
+    futures = [runner.submit(work, subsystem='test') for _ in range(6)]
+    for future in futures:
+        future.result(TIMEOUT)
+    assert peak[0] == 2
@@ -0,0 +1,122 @@
+import json
+
+import pytest
+
+from src.core.metrics import Histogram, PlaybackMetrics
+
+URL = "http://radio.example/live"
+
+
+@pytest.fixture
+def qos(tmp_path, clock):
+    return PlaybackMetrics(str(tmp_path / "metrics"))
+
+
+def ttfa(qos, url=URL):
+    return qos.stations[url].time_to_first_audio
+
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram((1, 5))
+    for value in (0.5, 1, 3, 10):
+        h.observe(value)
+    assert h.cumulative() == [("1", 2), ("5", 3), ("+Inf", 4)]
+    assert h.to_dict() == {"buckets": {"1": 2, "5": 3, "+Inf": 4}, "count": 4, "sum": 14.5}
+
+
+def test_first_play_from_idle_records_ttfa(qos, clock):
+    # mpv starts idle: playback-time is unavailable and never *changes* to None
+    qos.on_play(URL, "Radio")
+    clock.now += 1.5
+    qos.on_playback_time(0.0)
+    assert ttfa(qos).count == 1
+    assert ttfa(qos).sum == pytest.approx(1.5)
+
+
+def test_play_after_stop_records_ttfa(qos, clock):
+    qos.on_play(URL)
+    qos.on_playback_time(0.0)
+    qos.on_playback_time(30.0)
+    qos.on_stop()
+    qos.on_playback_time(None)
+
+    qos.on_play(URL)
+    clock.now += 0.7
+    qos.on_playback_time(0.0)
+    assert ttfa(qos).count == 2
+    assert ttfa(qos).sum == pytest.approx(0.7)
+
+
+def test_switching_streams_waits_for_the_clock_reset(qos, clock):
+    qos.on_play(URL)
+    qos.on_playback_time(0.0)
+    qos.on_playback_time(42.0)
+
+    other = "http://other.example/live"
+    qos.on_play(other)
+    clock.now += 0.2
+    # Still the previous stream's clock
+    qos.on_playback_time(42.5)
+    assert ttfa(qos, other).count == 0
+    qos.on_playback_time(None)
+    clock.now += 0.3
+    qos.on_playback_time(0.0)
+    assert ttfa(qos, other).count == 1
+    assert ttfa(qos, other).sum == pytest.approx(0.5)
+
+
+def test_warm_standby_counts_its_first_tick(qos, clock):
+    qos.on_play(URL)
+    qos.on_playback_time(10.0)
+    qos.on_play(URL, warm=True)
+    clock.now += 0.05
+    qos.on_playback_time(80.0)
+    assert ttfa(qos).count == 2
+
+
+def test_ttfa_is_recorded_once_per_play(qos, clock):
+    qos.on_play(URL)
+    qos.on_playback_time(0.0)
+    qos.on_playback_time(1.0)
+    qos.on_playback_time(2.0)
+    assert ttfa(qos).count == 1
+
+
+def test_initial_fill_is_not_a_rebuffer(qos, clock):
+    qos.on_play(URL)
+    qos.on_paused_for_cache(True)
+    clock.now += 2
+    qos.on_paused_for_cache(False)
+    qos.on_playback_time(0.0)
+    station = qos.stations[URL]
+    assert station.rebuffers == 0
+    assert ttfa(qos).sum == pytest.approx(2)
+
+    qos.on_paused_for_cache(True)
+    clock.now += 3
+    qos.on_paused_for_cache(False)
+    assert station.rebuffers == 1
+    assert station.rebuffer_duration.sum == pytest.approx(3)
+
+
+def test_events_without_a_station_are_ignored(qos):
+    qos.on_dropped()
+    qos.on_codec("mp3")
+    qos.on_cache_speed(16000)
+    qos.on_reconnected(1.0)
+    assert qos.stations == {}
+
+
+def test_flush_writes_json_and_prometheus(qos, tmp_path, clock):
+    qos.on_play(URL, 'Radio "One"')
+    qos.on_codec("aac")
+    qos.on_cache_speed(16000)
+    qos.on_playback_time(0.0)
+    qos.flush()
+
+    data = json.loads((tmp_path / "metrics.json").read_text())
+    assert data[URL]["codec"] == "aac"
+    assert data[URL]["network_bitrate_kbps"]["buckets"]["128"] == 1
+    prom = (tmp_path / "metrics.prom").read_text()
+    assert 'cyberradio_plays_total{station="Radio \\"One\\"",url="http://radio.example/live"} 1' in prom
+    assert "# TYPE cyberradio_time_to_first_audio_seconds histogram" in prom
@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+from src.core.recorder import StreamRecorder
+from src.core.timeshift import TimeshiftBuffer
+from conftest import TIMEOUT, wait_for
+
+
+def finish(recorder):
+    recorder.stop()
+    recorder._writer.join(TIMEOUT)
+    assert not recorder._writer.is_alive()
+
+
+def tracks(recorder):
+    """{label: audio bytes} of the recorded files, ID3 tags stripped."""
+    result = {}
+    for name in sorted(os.listdir(recorder.directory)):
+        with open(os.path.join(recorder.directory, name), "rb") as f:
+            data = f.read()
+        if data.startswith(b"ID3"):
+            size = sum(b << (7 * (3 - i)) for i, b in enumerate(data[6:10]))
+            data = data[10 + size:]
+        result[name.split(" - ", 1)[1].rsplit(".", 1)[0]] = data
+    return result
+
+
+@pytest.fixture
+def recorder(tmp_path):
+    return StreamRecorder(str(tmp_path), "Station", "Artist - First")
+
+
+def test_splits_on_titles_in_stream_order(recorder):
+    recorder.start()
+    recorder.feed(b"1" * 10, "audio/mpeg")
+    recorder.on_stream_title("Artist - Second")
+    recorder.feed(b"2" * 10)
+    # Repeated titles (every ICY block) don't split again
+    recorder.on_stream_title("Artist - Second")
+    recorder.feed(b"3" * 10)
+    finish(recorder)
+    assert tracks(recorder) == {"Artist - First": b"1" * 10, "Artist - Second": b"2" * 10 + b"3" * 10}
+
+
+def test_player_titles_are_ignored_once_the_stream_has_its_own(recorder):
+    recorder.start()
+    recorder.feed(b"1" * 10, "audio/mpeg")
+    recorder.on_title("Artist - Played")
+    recorder.feed(b"2" * 10)
+    recorder.on_stream_title("Artist - Live")
+    recorder.on_title("Artist - Time-shifted")
+    recorder.feed(b"3" * 10)
+    finish(recorder)
+    assert tracks(recorder) == {"Artist - First": b"1" * 10, "Artist - Played": b"2" * 10,
+                                "Artist - Live": b"3" * 10}
+
+
+def test_records_icy_titles_from_its_own_connection(tmp_path, upstream):
+    recorder = StreamRecorder(str(tmp_path), "Station")
+    recorder.start(url=upstream())
+    wait_for(recorder._stop.is_set)
+    recorder._writer.join(TIMEOUT)
+    # Each title applies to the audio after its block; the last one has none
+    assert tracks(recorder) == {"Station": b"A" * 16, "One": b"B" * 16 + b"C" * 16}
+
+
+def test_records_from_the_ring_with_its_titles(tmp_path, upstream):
+    ring = TimeshiftBuffer(str(tmp_path / "ring"), 4096)
+    recorder = StreamRecorder(str(tmp_path / "rec"), "Station")
+    recorder.start()
+    ring.listeners.append(recorder.feed)
+    ring.title_listeners.append(recorder.on_stream_title)
+    ring.start(upstream())
+    wait_for(lambda: ring.ended)
+    finish(recorder)
+    # Cut at the same bytes as the ring's own title index
+    assert tracks(recorder) == {"Station": b"A" * 16, "One": b"B" * 16 + b"C" * 16}
+    assert ring.title_at(16) == "One"
@@ -0,0 +1,122 @@
+import pytest
+
+from src.core.player import StandbyPool, STANDBY_MAX_AGE, STANDBY_REFRESH_SECONDS
+
+
+class FakeMpv(dict):
+    """Records what the pool does to an mpv instance."""
+    def __init__(self):
+        super().__init__()
+        self.mute = False
+        self.pause = False
+        self.loads = []
+        self.stopped = False
+        self.terminated = False
+        self.demuxer_cache_state = {'seekable-ranges': [{'start': 0.0, 'end': 30.0}]}
+        self.seeks = []
+
+    def play(self, url):
+        self.loads.append(url)
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+    def seek(self, position, reference):
+        self.seeks.append((position, reference))
+
+    def terminate(self):
+        self.terminated = True
+
+
+class FakePlayer:
+    def __init__(self):
+        self.created = []
+
+    def _create_mpv(self, **options):
+        instance = FakeMpv()
+        self.created.append(instance)
+        return instance
+
+    def _target_for(self, url):
+        return url + "#resolved"
+
+
+@pytest.fixture
+def pool(clock):
+    return StandbyPool(FakePlayer(), slots=2)
+
+
+def test_warm_loads_paused_and_muted(pool):
+    pool.warm(["a", "b", "c"])
+    assert set(pool.warm_streams) == {"a", "b"}
+    instance, _ = pool.warm_streams["a"]
+    assert instance.loads == ["a#resolved"]
+    assert instance.mute and instance.pause
+
+
+def test_unwanted_streams_become_spares(pool):
+    pool.warm(["a", "b"])
+    old, _ = pool.warm_streams["a"]
+    pool.warm(["b", "c"])
+    assert set(pool.warm_streams) == {"b", "c"}
+    # The freed instance is reused rather than starting another mpv
+    assert pool.warm_streams["c"][0] is old
+    assert len(pool.player.created) == 2
+
+
+def test_take_skips_to_live(pool):
+    pool.warm(["a"])
+    instance = pool.take("a")
+    assert instance.seeks == [(28.0, 'absolute')]
+    assert "a" not in pool.warm_streams
+    assert pool.take("a") is None
+
+
+def test_expired_streams_are_not_taken(pool, clock):
+    pool.warm(["a"])
+    instance, _ = pool.warm_streams["a"]
+    clock.now += STANDBY_MAX_AGE + 1
+    assert pool.take("a") is None
+    assert instance.stopped
+    assert pool.spares == [instance]
+
+
+def test_refresh_reconnects_aging_streams(pool, clock):
+    pool.warm(["a"])
+    clock.now += STANDBY_MAX_AGE / 4
+    pool.warm(["b", "a"])
+    clock.now += STANDBY_MAX_AGE / 4 + 1
+    pool.refresh()
+    # Only the stream past half its lifetime reconnects
+    assert pool.warm_streams["a"][0].loads == ["a#resolved"] * 2
+    assert pool.warm_streams["b"][0].loads == ["b#resolved"]
+    assert pool.warm_streams["a"][1] == clock.now
+
+
+def test_periodic_refresh_keeps_streams_fresh(pool, clock):
+    pool.warm(["a", "b"])
+    # A long stay on one station: the pool is never warmed again
+    for _ in range(20):
+        clock.now += STANDBY_REFRESH_SECONDS
+        pool.refresh()
+    assert pool.take("a") is not None
+    assert pool.take("b") is not None
+
+
+def test_warm_reconnects_expired_streams(pool, clock):
+    pool.warm(["a"])
+    clock.now += STANDBY_MAX_AGE + 1
+    pool.warm(["a"])
+    instance, warmed_at = pool.warm_streams["a"]
+    assert len(instance.loads) == 2
+    assert warmed_at == clock.now
+
+
+def test_failed_refresh_keeps_the_pool(pool, clock):
+    pool.warm(["a", "b"])
+    pool.warm_streams["a"][0].play = lambda url: (_ for _ in ()).throw(RuntimeError("gone"))
+    clock.now += STANDBY_MAX_AGE + 1
+    pool.refresh()
+    assert pool.warm_streams["b"][1] == clock.now
+    assert pool.take("a") is None
@@ -0,0 +1,231 @@
+import urllib.request
+
+import pytest
+
+from src.core import timeshift
+from src.core.timeshift import TimeshiftBuffer, parse_stream_title
+from conftest import Upstream, wait_for
+
+
+@pytest.fixture
+def ring(tmp_path):
+    buffer = TimeshiftBuffer(str(tmp_path / "ring"), 1000)
+    buffer._ensure_open()
+    # A session as start() would open it, without an upstream thread
+    buffer.session = 1
+    buffer.header = None
+    buffer.ended = False
+    yield buffer
+    buffer.stop()
+
+
+def feed(ring, clock, chunks, size=100, seconds=1.0):
+    """Appends `chunks` chunks of `size` bytes, one every `seconds`. Byte values count up."""
+    for _ in range(chunks):
+        start = ring.written
+        ring._append(1, bytes((start + i) % 251 for i in range(size)))
+        clock.now += seconds
+
+
+def expected(start, end):
+    return bytes(i % 251 for i in range(start, end))
+
+
+# --- ICY titles ---
+@pytest.mark.parametrize("meta, title", [
+    (b"StreamTitle='Artist - Song';StreamUrl='';\x00\x00\x00", "Artist - Song"),
+    (b"StreamTitle='It's a Sin';", "It's a Sin"),
+    (b"StreamTitle='';", None),
+    (b"StreamUrl='http://x';", None),
+    (b"", None),
+    (b"StreamTitle='Caf\xe9';", "Caf�"),
+])
+def test_parse_stream_title(meta, title):
+    assert parse_stream_title(meta) == title
+
+
+# --- Ring and time index ---
+def test_ring_wraps_and_keeps_the_newest_bytes(ring, clock):
+    feed(ring, clock, 25)
+    assert ring.written == 2500
+    assert ring.oldest == 1500
+
+    # Reading from before the window starts at the oldest byte still held
+    data, pos = ring._read(1, 0, 5000)
+    assert pos == 2500
+    assert data == expected(1500, 2500)
+
+
+def ogg_page(granule, body):
+    segments = bytes([255] * (len(body) // 255) + [len(body) % 255])
+    return (b"OggS\0\0" + granule.to_bytes(8, "little", signed=True) + b"\0" * 12
+            + bytes([len(segments)]) + segments + body)
+
+
+OGG_HEADER = ogg_page(0, b"OpusHead" + b"\1" * 11) + ogg_page(0, b"OpusTags" + b"\2" * 300)
+OGG_AUDIO = b"".join(ogg_page(960 * n, bytes([n]) * 200) for n in range(1, 6))
+FLAC_HEADER = b"fLaC" + b"\0\0\0\x22" + b"\3" * 34 + b"\x84\0\0\x08" + b"\4" * 8
+
+
+@pytest.mark.parametrize("data, header", [
+    (OGG_HEADER + OGG_AUDIO, OGG_HEADER),
+    (OGG_HEADER, None),
+    (OGG_HEADER[:40], None),
+    (ogg_page(0, b"x" * 600) + ogg_page(-1, b"y") + OGG_AUDIO, ogg_page(0, b"x" * 600) + ogg_page(-1, b"y")),
+    (FLAC_HEADER + b"\xff\xf8audio", FLAC_HEADER),
+    (FLAC_HEADER[:-1], None),
+    (b"\xff\xfb\x90\x64" + b"\0" * 100, b""),
+    (b"ID3", None),
+])
+def test_stream_header(data, header):
+    assert timeshift.stream_header(data) == header
+
+
+def test_header_outlives_the_ring(ring, clock):
+    ring._append(1, OGG_HEADER[:30])
+    assert ring.header is None
+    ring._append(1, OGG_HEADER[30:] + OGG_AUDIO)
+    feed(ring, clock, 25)
+    # Kept for decoders that need it, even once overwritten in the ring
+    assert ring.header == OGG_HEADER
+
+
+def test_long_header_is_dropped(ring, monkeypatch, clock):
+    monkeypatch.setattr(timeshift, "HEADER_BYTES", 500)
+    ring._append(1, ogg_page(0, b"x" * 600) + OGG_AUDIO)
+    assert ring.header == b""
+
+
+def test_mp3_has_no_header(ring, clock):
+    feed(ring, clock, 5)
+    assert ring.header == b""
+
+
+def test_offset_and_time_index(ring, clock):
+    start = clock.now
+    feed(ring, clock, 5)
+    # Entries: offset 100 at start, 200 at start+1, ...
+    assert ring.offset_at(start) == 100
+    assert ring.offset_at(start + 2) == 300
+    assert ring.offset_at(start + 0.5) == 200
+    # Past the newest entry: the newest offset
+    assert ring.offset_at(start + 100) == 500
+    assert ring.time_at(300) == start + 2
+    assert ring.window_seconds() == 4
+
+
+def test_offsets_never_point_at_overwritten_data(ring, clock):
+    start = clock.now
+    feed(ring, clock, 40)
+    assert ring.offset_at(start) == ring.oldest
+    assert ring.offset_at(start + 35) == 3600
+
+
+def test_index_entries_are_at_most_every_interval(ring, clock):
+    feed(ring, clock, 10, seconds=0.1)
+    assert len(ring._times) == 2
+
+
+def test_rewind_and_live_offsets(ring, clock):
+    feed(ring, clock, 10)
+    ring.served = ring.written
+    now = clock.now
+    # What was served at the end, minus what still sits in mpv's cache
+    assert ring.rewind_offset(3) == ring.offset_at(ring.time_at(1000) - 3)
+    assert ring.rewind_offset(3, buffered=2) == ring.offset_at(ring.time_at(1000) - 5)
+    assert ring.live_offset() == ring.offset_at(now - 2)
+
+
+def test_title_at(ring, clock):
+    feed(ring, clock, 2)
+    ring._add_title(1, "First")
+    feed(ring, clock, 2)
+    ring._add_title(1, "First")
+    ring._add_title(1, "Second")
+    assert ring.title_at(100) is None
+    assert ring.title_at(200) == "First"
+    assert ring.title_at(399) == "First"
+    assert ring.title_at(400) == "Second"
+    assert len(ring._titles) == 2
+
+
+def test_stale_session_is_ignored(ring, clock):
+    assert not ring._append(0, b"old")
+    ring._add_title(0, "Old")
+    assert ring.written == 0
+    assert ring._titles == []
+
+
+# --- Upstream ---
+def test_records_icy_stream_without_metadata(tmp_path, upstream):
+    buffer = TimeshiftBuffer(str(tmp_path / "ring"), 4096)
+    local = buffer.start(upstream())
+    wait_for(lambda: buffer.ended)
+
+    assert not buffer.failed
+    assert buffer.written == 48
+    with urllib.request.urlopen(local, timeout=5) as r:
+        assert r.headers["Content-Type"] == "audio/mpeg"
+        assert r.read() == b"A" * 16 + b"B" * 16 + b"C" * 16
+    # Metadata applies to the audio that follows it
+    assert buffer.title_at(15) is None
+    assert buffer.title_at(16) == "One"
+    assert buffer.title_at(47) == "One"
+    assert buffer.title_at(48) == "Two"
+
+
+def raw_upstream(content_type, body):
+    class Raw(Upstream):
+        metaint = 0
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.end_headers()
+            self.wfile.write(body)
+
+    Raw.content_type = content_type
+    return Raw
+
+
+def read_from(buffer, offset):
+    with urllib.request.urlopen(buffer.url_at(offset), timeout=5) as r:
+        return r.read()
+
+
+def test_rewound_mp3_starts_at_the_offset(tmp_path, upstream):
+    body = bytes(i % 251 for i in range(300000))
+    buffer = TimeshiftBuffer(str(tmp_path / "ring"), 1 << 20)
+    buffer.start(upstream(raw_upstream("audio/mpeg", body)))
+    wait_for(lambda: buffer.ended)
+
+    assert buffer.written == len(body)
+    assert read_from(buffer, 150000) == body[150000:]
+
+
+def test_rewound_ogg_resends_only_the_header(tmp_path, upstream):
+    body = OGG_HEADER + OGG_AUDIO
+    buffer = TimeshiftBuffer(str(tmp_path / "ring"), 1 << 20)
+    buffer.start(upstream(raw_upstream("audio/ogg", body)))
+    wait_for(lambda: buffer.ended)
+
+    rewound = len(OGG_HEADER) + 2 * len(OGG_AUDIO) // 5
+    assert read_from(buffer, rewound) == OGG_HEADER + body[rewound:]
+    # Inside the header: the whole stream, the header once
+    assert read_from(buffer, 10) == body
+    assert read_from(buffer, 0) == body
+
+
+def test_playlist_upstream_fails_the_session(tmp_path, upstream):
+    class Playlist(Upstream):
+        content_type = "audio/x-scpls"
+
+    buffer = TimeshiftBuffer(str(tmp_path / "ring"), 4096)
+    local = buffer.start(upstream(Playlist))
+    wait_for(lambda: buffer.ended)
+
+    assert buffer.failed
+    assert buffer.written == 0
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(local, timeout=5)
+    assert error.value.code == 502